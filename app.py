@@ -3,14 +3,34 @@ import time
 import json
 import logging
 import uuid
+import hmac
+import threading
 from datetime import datetime
 from dotenv import load_dotenv
-from flask import Flask, render_template, request, redirect, url_for, session, jsonify, render_template_string, flash
-from supabase import create_client, Client
+from flask import Flask, render_template, request, redirect, url_for, session, jsonify, render_template_string, flash, g
 from functools import wraps
 from datetime import datetime, timedelta
 
 from calculadora.routes import calculadora_bp
+from storage import vacantes_cache
+from storage import perfil_consultas
+from storage.vacantes_cache import obtener_vacante, obtener_vacante_publica, invalidar_vacante
+from storage.identidad import cargar_identidad, IDENTIDAD_TTL
+from storage import proyecciones
+from storage import dashboard as dashboard_datos
+from storage.dashboard import obtener_dashboard, invalidar_dashboard, tarjeta_candidato
+from storage.paginacion import tamano_pagina
+from storage.repositorio import repositorio, Duplicado
+from core.scoring_plan import obtener_plan, invalidar_plan, TIPOS_CERRADOS
+from core.counters import puntuar_respuesta_abierta
+from core.migracion import leer_analisis_ia
+from core import idempotencia
+from core.idempotencia import clave_envio, entrevista_id_de
+from core.bulk_rescoring import recalcular_vacante
+from core import pipeline
+from core.concurrencia import en_paralelo
+from core.pipeline import ErrorPermanente
+from core import metricas
 #from calculadora.epayco_checkout import epayco_bp
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -31,7 +51,70 @@ app.register_blueprint(calculadora_bp, url_prefix='/calculadora')
 logger.info("✅ Módulo de calculadora registrado en /calculadora")
 #logger.info("✅ Módulo de ePayco registrado en /epayco")
 
-supabase: Client = create_client(os.getenv('SUPABASE_URL'), os.getenv('SUPABASE_KEY'))
+# ============================================
+# MÉTRICAS (expuestas en /metrics)
+# ============================================
+
+metricas.registrar_cache('vacantes', vacantes_cache.stats)
+metricas.registrar_cache('dashboard', dashboard_datos.stats)
+metricas.registrar_cache('idempotencia', idempotencia.stats)
+
+
+@app.before_request
+def _metricas_inicio():
+    # La regla (/api/candidato/<id>) y no la URL, para no crear una serie por id
+    g.metricas_ruta = request.url_rule.rule if request.url_rule else 'sin_ruta'
+    g.metricas_inicio = time.perf_counter()
+    metricas.http_en_curso.inc(ruta=g.metricas_ruta)
+
+
+@app.after_request
+def _metricas_status(respuesta):
+    g.metricas_status = respuesta.status_code
+    return respuesta
+
+
+@app.teardown_request
+def _metricas_fin(error=None):
+    inicio = g.pop('metricas_inicio', None)
+    if inicio is None:
+        return
+    metricas.http_en_curso.dec(ruta=g.metricas_ruta)
+    metricas.http_duracion.observar(time.perf_counter() - inicio, ruta=g.metricas_ruta,
+                                    metodo=request.method, status=g.get('metricas_status', 500))
+
+
+
+@app.before_request
+def _arrancar_pipeline():
+    # Los workers se arrancan con el primer request de cada proceso y no al
+    # importar app: ni herramientas ni el master de gunicorn (antes del fork)
+    # levantan hilos ni crean la cola
+    pipeline.asegurar_workers(evaluar_envio)
+
+# Perfil de consultas por request (PERFIL_CONSULTAS=1): headers + log con N+1
+if perfil_consultas.ACTIVO:
+    @app.before_request
+    def _perfil_inicio():
+        g.perfil_consultas = perfil_consultas.iniciar(f"{request.method} {g.metricas_ruta}")
+
+    @app.after_request
+    def _perfil_resumen(respuesta):
+        perfil = g.get('perfil_consultas')
+        if perfil is not None:
+            respuesta.headers['X-Perfil-Consultas'] = perfil.encabezado()
+            respuesta.headers['Server-Timing'] = perfil.server_timing()
+            perfil_consultas.loguear(perfil)
+        return respuesta
+
+    @app.teardown_request
+    def _perfil_fin(error=None):
+        perfil = g.pop('perfil_consultas', None)
+        if perfil is not None:
+            perfil_consultas.terminar(perfil)
+
+    logger.info("🔎 Perfil de consultas activo (X-Perfil-Consultas)")
+
 
 def get_config_modelo(vacante: dict) -> dict:
     config = vacante.get('configuracion_modelo') or {}
@@ -49,8 +132,7 @@ def get_config_modelo(vacante: dict) -> dict:
 
 def get_pesos_fases_por_vacante_id(vacante_id: str) -> dict:
     try:
-        res = supabase.table('vacantes').select('configuracion_modelo').eq('id', vacante_id).single().execute()
-        return get_config_modelo(res.data or {})
+        return get_config_modelo(obtener_vacante(vacante_id) or {})
     except Exception as e:
         logger.warning(f"⚠️ No se pudo leer configuracion_modelo: {e}")
         return {'dist': {}, 'peso_prescreening': 70, 'peso_entrevista': 30}
@@ -159,7 +241,7 @@ def generar_resumen_profesional(cargo, score_final, detalle, hubo_ko, motivo_ko,
         "metodo": "Motor de Competencias Sales AI v2 — Skill Stack",
         "entity_skill_score": {hab: vals['pct'] for hab, vals in entity_skill_score.items()}
     }
-    return json.dumps(resultado, ensure_ascii=False)
+    return resultado
 
 
 # ============================================
@@ -170,6 +252,36 @@ def generar_resumen_profesional(cargo, score_final, detalle, hubo_ko, motivo_ko,
 # MIDDLEWARE ADMIN (CON LOGS DE DEBUG)
 # ============================================
 
+def identidad_actual():
+    """
+    Contexto de identidad del usuario logueado (usuario, empresa, super admin).
+    Se resuelve una vez por request y queda firmado en la sesión durante
+    IDENTIDAD_TTL segundos; pasado ese tiempo se vuelve a consultar.
+    """
+    if 'identidad' in g:
+        return g.identidad
+
+    user_id = session.get('user_id')
+    empresa_id = session.get('empresa_id')
+    identidad = session.get('identidad')
+    vigente = (
+        identidad
+        and identidad.get('user_id') == user_id
+        and identidad.get('empresa_id') == empresa_id
+        and time.time() - identidad.get('verificado', 0) < IDENTIDAD_TTL
+    )
+    if not vigente:
+        identidad = cargar_identidad(user_id, empresa_id)
+        if identidad is None:
+            session.pop('identidad', None)
+        else:
+            identidad['verificado'] = time.time()
+            session['identidad'] = identidad
+
+    g.identidad = identidad
+    return identidad
+
+
 def admin_required(f):
     """Decorador para proteger rutas que requieren acceso de super admin"""
     @wraps(f)
@@ -180,38 +292,26 @@ def admin_required(f):
             flash('Debes iniciar sesión primero', 'error')
             return redirect(url_for('login'))
         
-        user_id = session.get('user_id')
-        logger.info(f"🔍 ADMIN: Verificando acceso para user_id: {user_id}")
-        
         try:
-            # 2. Obtener email del usuario
-            response = supabase.table('usuarios_empresa').select('email').eq('id', user_id).execute()
-            
-            if not response.data:
-                logger.error(f"❌ ADMIN: No se encontró usuario con id: {user_id}")
-                flash('Usuario no encontrado', 'error')
-                return redirect(url_for('dashboard'))
-            
-            user_email = response.data[0]['email']
-            logger.info(f"📧 ADMIN: Email del usuario: {user_email}")
-            
-            # 3. Verificar si es super admin
-            admin_check = supabase.table('super_admins').select('*').eq('email', user_email).eq('activo', True).execute()
-            
-            logger.info(f"🔎 ADMIN: Resultado de búsqueda en super_admins: {admin_check.data}")
-            
-            if not admin_check.data:
-                logger.warning(f"⛔ ADMIN: Email {user_email} NO está en super_admins o no está activo")
-                flash('No tienes permisos de administrador', 'warning')
-                return redirect(url_for('dashboard'))
-            
-            logger.info(f"✅ ADMIN: Acceso concedido a {user_email}")
-            return f(*args, **kwargs)
-            
+            # 2. Identidad cacheada en la sesión (usuario + rol de super admin)
+            identidad = identidad_actual()
         except Exception as e:
             logger.error(f"💥 ADMIN: Error verificando permisos: {e}")
             flash('Error verificando permisos', 'error')
             return redirect(url_for('dashboard'))
+        
+        if identidad is None:
+            logger.error(f"❌ ADMIN: No se encontró usuario con id: {session.get('user_id')}")
+            flash('Usuario no encontrado', 'error')
+            return redirect(url_for('dashboard'))
+        
+        # 3. Verificar si es super admin
+        if not identidad['es_super_admin']:
+            logger.warning(f"⛔ ADMIN: Email {identidad['usuario'].get('email')} NO está en super_admins o no está activo")
+            flash('No tienes permisos de administrador', 'warning')
+            return redirect(url_for('dashboard'))
+        
+        return f(*args, **kwargs)
     
     return decorated_function
 
@@ -246,10 +346,9 @@ def index():
     if not id_seleccionada:
         return "<h1>Link incompleto</h1>", 400
     try:
-        result = supabase.table('vacantes').select('*').eq('id_vacante_publico', id_seleccionada).execute()
-        if not result.data:
+        v = obtener_vacante_publica(id_seleccionada)
+        if not v:
             return "<h1>Vacante no encontrada</h1>", 404
-        v = result.data[0]
         preguntas_finales = v.get('preguntas', [])
         if isinstance(preguntas_finales, dict) and 'preguntas' in preguntas_finales:
             preguntas_finales = preguntas_finales['preguntas']
@@ -363,6 +462,21 @@ def aplicar_boost_skill_stack(score_base, scores_habilidades, max_habilidades, s
     return score_base
 
 
+def lanzar_rescoring_vacante(vacante):
+    """
+    Recalcula en segundo plano los scores guardados de la vacante
+    después de un cambio en configuracion_modelo o skill_stack.
+    """
+    def _run():
+        try:
+            recalcular_vacante(vacante, obtener_plan(vacante))
+            invalidar_dashboard(vacante.get('empresa_id'))
+        except Exception as e:
+            logger.error(f"❌ Error en re-scoring de vacante {vacante.get('id')}: {e}")
+
+    threading.Thread(target=_run, name=f"rescoring-{vacante.get('id')}", daemon=True).start()
+
+
 def calcular_score_final_combinado(score_prescreening, score_entrevista, fases_config):
     """
     Combina el score de pre-screening y entrevista según los pesos configurados.
@@ -387,222 +501,281 @@ def calcular_score_final_combinado(score_prescreening, score_entrevista, fases_c
     return round(score_final, 1)
 
 
+def evaluar_envio(payload):
+    """
+    Motor de evaluación v2.0 con Skill Stack y configuración personalizada.
+    Se ejecuta en los workers del pipeline a partir del envío encolado por /procesar.
+    """
+    id_publico = payload['id_vacante']
+    nombre = payload['nombre']
+    cc = payload['cc']
+    tramos = metricas.scoring_etapa.tramos('etapa')
+    
+    # ============================================
+    # 1. OBTENER VACANTE
+    # ============================================
+    v = obtener_vacante_publica(id_publico)
+    if not v:
+        raise ErrorPermanente(f"Vacante no encontrada: {id_publico}")
+    tramos.marcar('vacante')
+    
+    logger.info(f"🎯 Procesando candidato: {nombre} para cargo: {v['cargo']}")
+    
+    # ============================================
+    # 2. OBTENER PLAN DE SCORING (compilado y cacheado)
+    # ============================================
+    plan = obtener_plan(v)
+    distribucion_categorias = plan['dist']
+    fases_evaluacion = plan['fases']
+    skill_stack = plan['skill_stack']
+    tramos.marcar('plan')
+    
+    logger.info(f"⚙️ Configuración del modelo:")
+    logger.info(f"   - Distribución: T:{distribucion_categorias['Técnica']}% E:{distribucion_categorias['Experiencia']}% B:{distribucion_categorias['Blandas']}% A:{distribucion_categorias['Ajuste']}%")
+    logger.info(f"   - Fases: Pre-screening {fases_evaluacion['pre_screening']['peso']}% / Entrevista {fases_evaluacion['entrevista']['peso']}%")
+    logger.info(f"   - Skill Stack: {len(skill_stack)} habilidades críticas")
+    
+    # ============================================
+    # 3. PROCESAR RESPUESTAS
+    # ============================================
+    ids_q = payload['preguntas']
+    vals_r = payload['respuestas']
+    
+    # Acumuladores por categoría (los máximos vienen precalculados en el plan)
+    scores_categorias = {"Técnica": 0, "Experiencia": 0, "Blandas": 0, "Ajuste": 0}
+    max_categorias = plan['max_categorias']
+    
+    # Acumuladores por habilidad
+    scores_habilidades = dict.fromkeys(plan['max_habilidades'], 0)
+    max_habilidades = plan['max_habilidades']
+    
+    # Control de KO
+    hubo_ko = False
+    motivo_descarte = ""
+    
+    # Detalle para el análisis IA
+    detalle = []
+    
+    for q_id, valor in zip(ids_q, vals_r):
+        p_orig = plan['preguntas'].get(q_id)
+        if not p_orig:
+            continue
+        
+        respuesta_user = valor.strip()
+        peso_pregunta = p_orig['peso']
+        tipo = p_orig['tipo']
+        cat_nombre = p_orig['categoria']
+        hab_nombre = p_orig['habilidad']
+        
+        puntos_obtenidos = 0
+        
+        # Procesar según tipo de pregunta
+        if tipo in TIPOS_CERRADOS:
+            # Verificar si la respuesta es correcta (ideal ya normalizado)
+            if respuesta_user.lower() == p_orig['ideal']:
+                puntos_obtenidos = peso_pregunta
+                
+                # Acumular puntos obtenidos
+                if cat_nombre in scores_categorias:
+                    scores_categorias[cat_nombre] += peso_pregunta
+                scores_habilidades[hab_nombre] += peso_pregunta
+            else:
+                # Revisar si es KO
+                if p_orig['knockout']:
+                    hubo_ko = True
+                    motivo_descarte = f"No cumple requisito crítico: {p_orig['texto']}"
+                    logger.warning(f"🔴 KO activado: {motivo_descarte}")
+        
+        elif p_orig['palabras_clave']:
+            # Pregunta abierta con palabras clave: puntos proporcionales a las encontradas
+            fraccion = puntuar_respuesta_abierta(respuesta_user, p_orig['palabras_clave'])
+            puntos_obtenidos = round(peso_pregunta * fraccion, 2)
+            if cat_nombre in scores_categorias:
+                scores_categorias[cat_nombre] += puntos_obtenidos
+            scores_habilidades[hab_nombre] += puntos_obtenidos
+        
+        elif tipo == 'abierta':
+            # Las preguntas abiertas se guardan para análisis IA
+            logger.info(f"📝 Pregunta abierta {p_orig['id']}: '{respuesta_user}' - Guardada para análisis IA")
+        
+        # Agregar al detalle
+        detalle.append({
+            "pregunta": p_orig['texto'],
+            "respuesta": respuesta_user,
+            "puntos": puntos_obtenidos,
+            "peso": peso_pregunta,
+            "tipo": tipo,
+            "categoria": cat_nombre,
+            "habilidad": hab_nombre,
+            "es_critica": p_orig['es_critica'],
+            "puntuable": p_orig['puntuable']
+        })
+    
+    # ============================================
+    # 4. CALCULAR SCORE CON NUEVA FÓRMULA
+    # ============================================
+    
+    # Score base usando distribución de categorías
+    score_base = calcular_score_prescreening(scores_categorias, max_categorias, distribucion_categorias)
+    
+    logger.info(f"📊 Score base (por categoría): {score_base}%")
+    logger.info(f"   - Técnica: {scores_categorias['Técnica']}/{max_categorias['Técnica']}")
+    logger.info(f"   - Experiencia: {scores_categorias['Experiencia']}/{max_categorias['Experiencia']}")
+    logger.info(f"   - Blandas: {scores_categorias['Blandas']}/{max_categorias['Blandas']}")
+    logger.info(f"   - Ajuste: {scores_categorias['Ajuste']}/{max_categorias['Ajuste']}")
+    
+    # Aplicar boost por skill stack (si aplica)
+    score_con_boost = aplicar_boost_skill_stack(
+        score_base, 
+        scores_habilidades, 
+        max_habilidades, 
+        skill_stack
+    )
+    
+    # Este es el score final de pre-screening
+    score_prescreening = score_con_boost
+    
+    # ============================================
+    # 5. GENERAR MÉTRICAS PARA RADAR
+    # ============================================
+    
+    def calc_pct(obtenido, maximo):
+        return round((obtenido / maximo * 100)) if maximo > 0 else 0
+    
+    metricas_radar = (
+        f"T:{calc_pct(scores_categorias['Técnica'], max_categorias['Técnica'])}% "
+        f"E:{calc_pct(scores_categorias['Experiencia'], max_categorias['Experiencia'])}% "
+        f"B:{calc_pct(scores_categorias['Blandas'], max_categorias['Blandas'])}% "
+        f"A:{calc_pct(scores_categorias['Ajuste'], max_categorias['Ajuste'])}%"
+    )
+    
+    tramos.marcar('respuestas')
+    
+    # ============================================
+    # 6. GENERAR ANÁLISIS IA
+    # ============================================
+    
+    analisis_ia_texto = generar_resumen_profesional(
+        cargo=v['cargo'],
+        score_final=score_prescreening,
+        detalle=detalle,
+        hubo_ko=hubo_ko,
+        motivo_ko=motivo_descarte,
+        metricas_radar=metricas_radar,
+        skill_stack=skill_stack
+    )
+    
+    # ============================================
+    # 7. DETERMINAR VEREDICTO
+    # ============================================
+    
+    if hubo_ko:
+        veredicto, tag = "DESCARTADO (KO)", "🔴"
+    elif score_prescreening >= 75:
+        veredicto, tag = "RECOMENDADO", "🟢"
+    elif score_prescreening >= 40:
+        veredicto, tag = "REVISAR", "🟡"
+    else:
+        veredicto, tag = "NO APTO", "🔴"
+    
+    tramos.marcar('resumen')
+    
+    # ============================================
+    # 8. GUARDAR ENTREVISTA
+    # ============================================
+    
+    nueva_entrevista = {
+        "id": payload['entrevista_id'],
+        "clave_idempotencia": payload.get('clave_idempotencia'),
+        "vacante_id": v['id'],
+        "empresa_id": v['empresa_id'],
+        "nombre_candidato": nombre,
+        "identificacion": cc,
+        "score": score_prescreening,  # Score de pre-screening
+        "veredicto": veredicto,
+        "tag": tag,
+        "comentarios_tecnicos": motivo_descarte,
+        "respuestas_detalle": detalle,
+        "analisis_ia": analisis_ia_texto,
+        "fecha": payload['recibido'],
+        "entity_skill_score": {
+            h: calc_pct(scores_habilidades[h], max_habilidades[h]) 
+            for h in scores_habilidades
+        },
+        "metricas_categorias": {
+            "Técnica": calc_pct(scores_categorias['Técnica'], max_categorias['Técnica']),
+            "Experiencia": calc_pct(scores_categorias['Experiencia'], max_categorias['Experiencia']),
+            "Blandas": calc_pct(scores_categorias['Blandas'], max_categorias['Blandas']),
+            "Ajuste": calc_pct(scores_categorias['Ajuste'], max_categorias['Ajuste'])
+        }
+    }
+    
+    try:
+        repositorio.crear_entrevista(nueva_entrevista)
+        tramos.marcar('guardar')
+        invalidar_dashboard(v['empresa_id'])
+    except Duplicado:
+        # Reintento de un envío cuyo insert ya se había completado
+        logger.info(f"ℹ️ Entrevista {payload['entrevista_id']} ya estaba guardada")
+        return
+    
+    logger.info(f"✅ Candidato procesado: {nombre}")
+    logger.info(f"   - Score final: {score_prescreening}%")
+    logger.info(f"   - Veredicto: {veredicto}")
+
+
 @app.route('/procesar', methods=['POST'])
 def procesar():
     """
-    Motor de evaluación v2.0 con Skill Stack y configuración personalizada
+    Valida la postulación, la guarda en la cola durable y responde de inmediato.
+    El scoring, el resumen y el insert en Supabase los hacen los workers.
     """
     id_publico = request.form.get('id_vacante')
     nombre = request.form.get('nombre')
     cc = request.form.get('cc')
+    ids_q = request.form.getlist('preguntas_custom[]')
+    vals_r = request.form.getlist('respuestas_custom[]')
     
+    if not id_publico or not nombre or not cc:
+        return "Datos incompletos", 400
+    if len(ids_q) != len(vals_r):
+        return "Respuestas incompletas", 400
+    
+    # Con la caché de vacantes es casi siempre un dict lookup; una vacante
+    # inexistente no se encola (el worker solo podría descartarla)
     try:
-        # ============================================
-        # 1. OBTENER VACANTE
-        # ============================================
-        result = supabase.table('vacantes').select('*').eq('id_vacante_publico', id_publico).execute()
-        if not result.data:
+        if not obtener_vacante_publica(id_publico):
             return "Vacante no encontrada", 404
-        
-        v = result.data[0]
-        logger.info(f"🎯 Procesando candidato: {nombre} para cargo: {v['cargo']}")
-        
-        # ============================================
-        # 2. OBTENER CONFIGURACIÓN DEL MODELO
-        # ============================================
-        config = get_config_modelo(v)
-        distribucion_categorias = config['dist']
-        fases_evaluacion = config['fases']
-        skill_stack = v.get('skill_stack', [])
-        
-        logger.info(f"⚙️ Configuración del modelo:")
-        logger.info(f"   - Distribución: T:{distribucion_categorias['Técnica']}% E:{distribucion_categorias['Experiencia']}% B:{distribucion_categorias['Blandas']}% A:{distribucion_categorias['Ajuste']}%")
-        logger.info(f"   - Fases: Pre-screening {fases_evaluacion['pre_screening']['peso']}% / Entrevista {fases_evaluacion['entrevista']['peso']}%")
-        logger.info(f"   - Skill Stack: {len(skill_stack)} habilidades críticas")
-        
-        # ============================================
-        # 3. PROCESAR RESPUESTAS
-        # ============================================
-        ids_q = request.form.getlist('preguntas_custom[]')
-        vals_r = request.form.getlist('respuestas_custom[]')
-        
-        # Acumuladores por categoría
-        scores_categorias = {"Técnica": 0, "Experiencia": 0, "Blandas": 0, "Ajuste": 0}
-        max_categorias = {"Técnica": 0, "Experiencia": 0, "Blandas": 0, "Ajuste": 0}
-        
-        # Acumuladores por habilidad
-        scores_habilidades = {}
-        max_habilidades = {}
-        
-        # Control de KO
-        hubo_ko = False
-        motivo_descarte = ""
-        
-        # Detalle para el análisis IA
-        detalle = []
-        
-        for i in range(len(ids_q)):
-            p_orig = next((p for p in v['preguntas'] if p['id'] == ids_q[i]), None)
-            if not p_orig:
-                continue
-            
-            respuesta_user = vals_r[i].strip()
-            peso_pregunta = float(p_orig.get('peso', 0))
-            tipo = p_orig.get('tipo')
-            es_ko = p_orig.get('knockout', False)
-            reglas = p_orig.get('reglas', {})
-            ideal = str(reglas.get('ideal', '')).strip()
-            cat_nombre = p_orig.get('categoria', 'Ajuste')
-            hab_nombre = p_orig.get('habilidad', 'General')
-            
-            # Inicializar acumuladores de habilidad si no existen
-            if hab_nombre not in scores_habilidades:
-                scores_habilidades[hab_nombre] = 0
-                max_habilidades[hab_nombre] = 0
-            
-            puntos_obtenidos = 0
-            
-            # Procesar según tipo de pregunta
-            if tipo in ['si_no', 'multiple', 'escala_1_5', 'escala_1_10']:
-                # Acumular máximos
-                if cat_nombre in max_categorias:
-                    max_categorias[cat_nombre] += peso_pregunta
-                max_habilidades[hab_nombre] += peso_pregunta
-                
-                # Verificar si la respuesta es correcta
-                if respuesta_user.lower() == ideal.lower():
-                    puntos_obtenidos = peso_pregunta
-                    
-                    # Acumular puntos obtenidos
-                    if cat_nombre in scores_categorias:
-                        scores_categorias[cat_nombre] += peso_pregunta
-                    scores_habilidades[hab_nombre] += peso_pregunta
-                else:
-                    # Revisar si es KO
-                    if es_ko:
-                        hubo_ko = True
-                        motivo_descarte = f"No cumple requisito crítico: {p_orig['texto']}"
-                        logger.warning(f"🔴 KO activado: {motivo_descarte}")
-            
-            elif tipo == 'abierta':
-                # Las preguntas abiertas se guardan para análisis IA
-                logger.info(f"📝 Pregunta abierta {p_orig['id']}: '{respuesta_user}' - Guardada para análisis IA")
-            
-            # Agregar al detalle
-            detalle.append({
-                "pregunta": p_orig['texto'],
-                "respuesta": respuesta_user,
-                "puntos": puntos_obtenidos,
-                "peso": peso_pregunta,
-                "tipo": tipo,
-                "categoria": cat_nombre,
-                "habilidad": hab_nombre,
-                "es_critica": hab_nombre in skill_stack
-            })
-        
-        # ============================================
-        # 4. CALCULAR SCORE CON NUEVA FÓRMULA
-        # ============================================
-        
-        # Score base usando distribución de categorías
-        score_base = calcular_score_prescreening(scores_categorias, max_categorias, distribucion_categorias)
-        
-        logger.info(f"📊 Score base (por categoría): {score_base}%")
-        logger.info(f"   - Técnica: {scores_categorias['Técnica']}/{max_categorias['Técnica']}")
-        logger.info(f"   - Experiencia: {scores_categorias['Experiencia']}/{max_categorias['Experiencia']}")
-        logger.info(f"   - Blandas: {scores_categorias['Blandas']}/{max_categorias['Blandas']}")
-        logger.info(f"   - Ajuste: {scores_categorias['Ajuste']}/{max_categorias['Ajuste']}")
-        
-        # Aplicar boost por skill stack (si aplica)
-        score_con_boost = aplicar_boost_skill_stack(
-            score_base, 
-            scores_habilidades, 
-            max_habilidades, 
-            skill_stack
-        )
-        
-        # Este es el score final de pre-screening
-        score_prescreening = score_con_boost
-        
-        # ============================================
-        # 5. GENERAR MÉTRICAS PARA RADAR
-        # ============================================
-        
-        def calc_pct(obtenido, maximo):
-            return round((obtenido / maximo * 100)) if maximo > 0 else 0
-        
-        metricas_radar = (
-            f"T:{calc_pct(scores_categorias['Técnica'], max_categorias['Técnica'])}% "
-            f"E:{calc_pct(scores_categorias['Experiencia'], max_categorias['Experiencia'])}% "
-            f"B:{calc_pct(scores_categorias['Blandas'], max_categorias['Blandas'])}% "
-            f"A:{calc_pct(scores_categorias['Ajuste'], max_categorias['Ajuste'])}%"
-        )
-        
-        # ============================================
-        # 6. GENERAR ANÁLISIS IA
-        # ============================================
-        
-        analisis_ia_texto = generar_resumen_profesional(
-            cargo=v['cargo'],
-            score_final=score_prescreening,
-            detalle=detalle,
-            hubo_ko=hubo_ko,
-            motivo_ko=motivo_descarte,
-            metricas_radar=metricas_radar,
-            skill_stack=skill_stack
-        )
-        
-        # ============================================
-        # 7. DETERMINAR VEREDICTO
-        # ============================================
-        
-        if hubo_ko:
-            veredicto, tag = "DESCARTADO (KO)", "🔴"
-        elif score_prescreening >= 75:
-            veredicto, tag = "RECOMENDADO", "🟢"
-        elif score_prescreening >= 40:
-            veredicto, tag = "REVISAR", "🟡"
+    except Exception as e:
+        logger.error(f"❌ Error en procesar: {e}")
+        return f"Error: {e}", 500
+    
+    # Doble clic / refresh: el mismo envío produce la misma clave y no se repite
+    clave = clave_envio(id_publico, cc, ids_q, vals_r, request.form.get('token_envio'))
+    if not idempotencia.registrar(clave):
+        logger.info(f"🔁 Postulación duplicada ignorada: {clave[:12]} ({id_publico})")
+        return render_template('gracias.html')
+    
+    try:
+        with metricas.scoring_etapa.cronometro(etapa='encolar'):
+            encolado = pipeline.enviar({
+                "entrevista_id": entrevista_id_de(clave),
+                "clave_idempotencia": clave,
+                "id_vacante": id_publico,
+                "nombre": nombre,
+                "cc": cc,
+                "preguntas": ids_q,
+                "respuestas": vals_r,
+                "recibido": datetime.utcnow().isoformat()
+            }, envio_id=clave)
+        if encolado:
+            logger.info(f"📥 Postulación encolada: {clave[:12]} ({id_publico})")
         else:
-            veredicto, tag = "NO APTO", "🔴"
-        
-        # ============================================
-        # 8. GUARDAR ENTREVISTA
-        # ============================================
-        
-        nueva_entrevista = {
-            "id": str(uuid.uuid4()),
-            "vacante_id": v['id'],
-            "empresa_id": v['empresa_id'],
-            "nombre_candidato": nombre,
-            "identificacion": cc,
-            "score": score_prescreening,  # Score de pre-screening
-            "veredicto": veredicto,
-            "tag": tag,
-            "comentarios_tecnicos": motivo_descarte,
-            "respuestas_detalle": detalle,
-            "analisis_ia": analisis_ia_texto,
-            "fecha": datetime.utcnow().isoformat(),
-            "entity_skill_score": {
-                h: calc_pct(scores_habilidades[h], max_habilidades[h]) 
-                for h in scores_habilidades
-            },
-            "metricas_categorias": {
-                "Técnica": calc_pct(scores_categorias['Técnica'], max_categorias['Técnica']),
-                "Experiencia": calc_pct(scores_categorias['Experiencia'], max_categorias['Experiencia']),
-                "Blandas": calc_pct(scores_categorias['Blandas'], max_categorias['Blandas']),
-                "Ajuste": calc_pct(scores_categorias['Ajuste'], max_categorias['Ajuste'])
-            }
-        }
-        
-        supabase.table('entrevistas').insert(nueva_entrevista).execute()
-        
-        logger.info(f"✅ Candidato procesado: {nombre}")
-        logger.info(f"   - Score final: {score_prescreening}%")
-        logger.info(f"   - Veredicto: {veredicto}")
-        
+            logger.info(f"🔁 Postulación duplicada ignorada: {clave[:12]} ({id_publico})")
         return render_template('gracias.html')
         
     except Exception as e:
+        idempotencia.olvidar(clave)
         logger.error(f"❌ Error en procesar: {e}")
         import traceback
         logger.error(traceback.format_exc())
@@ -611,25 +784,26 @@ def procesar():
 
 @app.route('/candidatos')
 def candidatos():
+    parcial = request.args.get('parcial')
     if not session.get('logeado'):
-        return redirect(url_for('login'))
+        # El fetch de "Cargar más" seguiría el redirect e insertaría el login en la tabla
+        return ("Sesión expirada", 401) if parcial else redirect(url_for('login'))
+    emp_id_str = session.get('empresa_id')
     try:
-        result = supabase.table('entrevistas').select('*').order('score', desc=True).execute()
-        entrevistas = result.data
+        entrevistas, siguiente_cursor = repositorio.pagina_entrevistas(
+            emp_id_str, proyecciones.ENTREVISTA_LISTA, 'score',
+            request.args.get('cursor'), tamano_pagina(request.args.get('limite'))
+        )
         for e in entrevistas:
-            e['metricas_categorias'] = {
-            'Técnica': e.get('breakdown_tecnica', 0),
-            'Experiencia': e.get('breakdown_experiencia', 0),
-            'Blandas': e.get('breakdown_blandas', 0),
-            'Ajuste': e.get('breakdown_ajuste', 0)
-        }
-            if e.get('analisis_ia'):
-                try:
-                    e['analisis_ia_obj'] = json.loads(e['analisis_ia'])
-                except Exception as ex:
-                    logger.error(f"Error parseando analisis_ia: {ex}")
-                    e['analisis_ia_obj'] = None
-        return render_template('candidatos.html', candidatos=entrevistas)
+            e['metricas_categorias'] = e.get('metricas_categorias') or {}
+            e['vacante'] = (e.pop('vacantes', None) or {}).get('cargo')
+        
+        # "Cargar más": solo las filas nuevas, el cursor siguiente va en un header
+        if parcial:
+            return render_template('_filas_candidatos.html', candidatos=entrevistas), 200, {
+                'X-Siguiente-Cursor': siguiente_cursor or ''
+            }
+        return render_template('candidatos.html', candidatos=entrevistas, siguiente_cursor=siguiente_cursor)
     except Exception as e:
         logger.error(f"❌ Error en ruta candidatos: {e}")
         return f"Error: {e}", 500
@@ -643,7 +817,8 @@ def actualizar_estado():
         nuevo_estado = data.get('estado')
         if not candidato_id or not nuevo_estado:
             return jsonify({"status": "error", "message": "Datos incompletos"}), 400
-        supabase.table('entrevistas').update({'estado': nuevo_estado}).eq('id', candidato_id).execute()
+        repositorio.actualizar_entrevista(candidato_id, {'estado': nuevo_estado})
+        invalidar_dashboard(session.get('empresa_id'))
         print(f"✅ Candidato {candidato_id} actualizado a: {nuevo_estado}")
         return jsonify({"status": "success"}), 200
     except Exception as e:
@@ -654,55 +829,58 @@ def actualizar_estado():
 # DASHBOARD
 # ============================================
 
+def pagina_candidatos_dashboard(emp_id_str, cursor=None):
+    """Una página de tarjetas del dashboard (más recientes primero) y el cursor siguiente."""
+    resultados, siguiente_cursor = repositorio.pagina_entrevistas(
+        emp_id_str, proyecciones.ENTREVISTA_TARJETA, 'fecha', cursor, dashboard_datos.TARJETAS_POR_PAGINA
+    )
+    return [tarjeta_candidato(e) for e in resultados], siguiente_cursor
+
+
 @app.route('/dashboard')
 def dashboard():
+    parcial = request.args.get('parcial')
     if not session.get('logeado'):
-        return redirect(url_for('login'))
+        return ("Sesión expirada", 401) if parcial else redirect(url_for('login'))
 
-    user_id = session.get('user_id')
     emp_id_str = session.get('empresa_id')
 
-    try:
-        usuario_result = supabase.table('usuarios_empresa').select('*').eq('id', user_id).execute()
-        if not usuario_result.data:
-            session.clear()
-            return redirect(url_for('login'))
-        usuario = usuario_result.data[0]
+    # "Cargar más": solo la siguiente página de tarjetas. Un error aquí no
+    # cierra la sesión ni redirige: la página ya cargada sigue siendo válida
+    if parcial:
+        try:
+            candidatos_cards, siguiente_cursor = pagina_candidatos_dashboard(emp_id_str, request.args.get('cursor'))
+        except Exception as e:
+            logger.error(f"Error en dashboard (cargar más): {e}")
+            return "No se pudieron cargar más candidatos", 500
+        return render_template('_filas_dashboard.html', entrevistas=candidatos_cards), 200, {
+            'X-Siguiente-Cursor': siguiente_cursor or ''
+        }
 
-        empresa_result = supabase.table('empresas').select('*').eq('id', emp_id_str).execute()
-        if not empresa_result.data:
+    try:
+        # Identidad (hilo del request) y datos del dashboard en paralelo; los datos
+        # llegan en un solo viaje (RPC dashboard_empresa) y se cachean por empresa
+        res = en_paralelo({
+            'identidad': identidad_actual,
+            'datos': lambda: obtener_dashboard(emp_id_str)
+        })
+        identidad = res['identidad']
+        if not identidad or not identidad['empresa']:
             session.clear()
             return redirect(url_for('login'))
-        empresa = empresa_result.data[0]
-
-        vacantes_result = supabase.table('vacantes').select('*').eq('empresa_id', emp_id_str).execute()
-        vacantes = vacantes_result.data
-
-        entrevistas_result = supabase.table('entrevistas').select('*').eq('empresa_id', emp_id_str).order('fecha', desc=True).execute()
-        resultados = entrevistas_result.data
-
-        candidatos_cards = []
-        for e in resultados:
-            v_rel = next((v for v in vacantes if v['id'] == e['vacante_id']), None)
-            candidatos_cards.append({
-                "id": e['id'],
-                "nombre": e['nombre_candidato'],
-                "cargo": v_rel['cargo'] if v_rel else "N/A",
-                "score": e['score'],
-                "veredicto": e['veredicto'],
-                "tag": e['tag'],
-                "fecha": e.get('fecha', 'N/A')[:10] if e.get('fecha') else "N/A",
-                "analisis_ia": e.get('analisis_ia'),
-                "respuestas_detalle": e.get('respuestas_detalle'),
-                "estado": e.get('estado', None)
-            })
+        usuario = identidad['usuario']
+        empresa = identidad['empresa']
+        datos = res['datos']
+        vacantes = datos['vacantes']
 
         return render_template("dashboard.html",
                                usuario=usuario,
                                empresa=empresa,
-                               entrevistas=candidatos_cards,
+                               entrevistas=datos['tarjetas'],
+                               siguiente_cursor=datos['siguiente_cursor'],
                                vacantes=vacantes,
-                               total_c=len(resultados),
+                               total_c=datos['total_c'],
+                               total_recomendados=datos['total_recomendados'],
                                total_v=len(vacantes),
                                nombre_empresa=empresa['nombre_empresa'])
     except Exception as e:
@@ -720,8 +898,7 @@ def gestionar_vacantes():
         return redirect(url_for('login'))
     emp_id_str = session.get('empresa_id')
     try:
-        vacantes_result = supabase.table('vacantes').select('*').eq('empresa_id', emp_id_str).execute()
-        vacantes = vacantes_result.data
+        vacantes = repositorio.vacantes_empresa(emp_id_str)
         return render_template('lista_vacantes.html', vacantes=vacantes)
     except Exception as e:
         logger.error(f"Error: {e}")
@@ -878,7 +1055,9 @@ def nueva_vacante():
         # ============================================
         
         try:
-            supabase.table('vacantes').insert(nueva_vacante_data).execute()
+            repositorio.crear_vacante(nueva_vacante_data)
+            invalidar_vacante(nueva_vacante_data['id'], id_publico)
+            invalidar_dashboard(emp_id_str)
             
             logger.info(f"✅ Vacante creada: {cargo} ({id_publico})")
             logger.info(f"   - Total preguntas: {len(nuevas_preguntas)}")
@@ -905,10 +1084,9 @@ def vacante_lista(id_publico):
     if not session.get('logeado'):
         return redirect(url_for('login'))
     try:
-        result = supabase.table('vacantes').select('*').eq('id_vacante_publico', id_publico).execute()
-        if not result.data:
+        v = obtener_vacante_publica(id_publico)
+        if not v:
             return "No encontrada", 404
-        v = result.data[0]
         link = f"{request.url_root}encuesta?vacante={id_publico}"
         return render_template('vacante_lista.html', vacante=v, link=link)
     except Exception as e:
@@ -921,11 +1099,10 @@ def editar_vacante(id_publico):
         return redirect(url_for('login'))
     
     try:
-        result = supabase.table('vacantes').select('*').eq('id_vacante_publico', id_publico).execute()
-        if not result.data:
+        v = obtener_vacante_publica(id_publico)
+        if not v:
             return "Vacante no encontrada", 404
         
-        v = result.data[0]
         emp_id_str = session.get('empresa_id')
         
         if v['empresa_id'] != emp_id_str:
@@ -1060,7 +1237,10 @@ def editar_vacante(id_publico):
                 "updated_at": datetime.utcnow().isoformat()
             }
 
-            supabase.table('vacantes').update(datos_actualizados).eq('id_vacante_publico', id_publico).execute()
+            repositorio.actualizar_vacante(v['id'], datos_actualizados)
+            invalidar_vacante(v['id'], id_publico)
+            invalidar_plan(v['id'])
+            invalidar_dashboard(v.get('empresa_id'))
             
             logger.info(f"✅ Vacante actualizada: {id_publico}")
             logger.info(f"   - Total preguntas: {len(nuevas_preguntas)}")
@@ -1068,6 +1248,15 @@ def editar_vacante(id_publico):
             logger.info(f"   - Distribución: T:{peso_tecnicas}% E:{peso_experiencia}% B:{peso_blandas}% A:{peso_ajuste}%")
             logger.info(f"   - Fases: Pre-screening {peso_prescreening}% / Entrevista {peso_entrevista}%")
             
+            # ============================================
+            # 7. RE-SCORING SI CAMBIARON LOS PESOS
+            # ============================================
+            config_anterior = v.get('configuracion_modelo') or {}
+            if (config_anterior.get('distribucion_categorias') != configuracion_modelo['distribucion_categorias']
+                    or config_anterior.get('fases_evaluacion') != configuracion_modelo['fases_evaluacion']
+                    or (v.get('skill_stack') or []) != habilidades_criticas):
+                lanzar_rescoring_vacante({**v, **datos_actualizados})
+            
             return redirect(url_for('gestionar_vacantes'))
 
         # ============================================
@@ -1147,7 +1336,9 @@ def clonar_plantilla(plantilla_id):
         "created_at": datetime.utcnow().isoformat()
     }
     try:
-        supabase.table('vacantes').insert(nueva_vacante).execute()
+        repositorio.crear_vacante(nueva_vacante)
+        invalidar_vacante(nueva_vacante['id'], id_publico)
+        invalidar_dashboard(emp_id_str)
         logger.info(f"✅ Plantilla clonada: {id_publico}")
         return redirect(url_for('vacante_lista', id_publico=id_publico))
     except Exception as e:
@@ -1164,16 +1355,15 @@ def login():
         email = request.form.get('email')
         password = request.form.get('password')
         try:
-            res = supabase.auth.sign_in_with_password({"email": email, "password": password})
-            if res.user:
-                usuario_result = supabase.table('usuarios_empresa').select('*').eq('id', res.user.id).execute()
-                if usuario_result.data:
-                    u_db = usuario_result.data[0]
-                    empresa_result = supabase.table('empresas').select('*').eq('id', u_db['empresa_id']).execute()
-                    nombre_empresa = empresa_result.data[0]['nombre_empresa'] if empresa_result.data else "Mi Empresa"
+            cuenta = repositorio.autenticar(email, password)
+            if cuenta:
+                u_db = repositorio.usuario(cuenta['id'])
+                if u_db:
+                    empresa = repositorio.empresa(u_db['empresa_id'], 'nombre_empresa')
+                    nombre_empresa = empresa['nombre_empresa'] if empresa else "Mi Empresa"
                     session.update({
                         'logeado': True,
-                        'user_id': res.user.id,
+                        'user_id': cuenta['id'],
                         'empresa_id': str(u_db['empresa_id']),
                         'nombre_empresa': nombre_empresa
                     })
@@ -1184,6 +1374,11 @@ def login():
                                            error="Usuario no vinculado.",
                                            supabase_url=os.getenv('SUPABASE_URL'),
                                            supabase_key=os.getenv('SUPABASE_KEY'))
+            logger.warning(f"⚠️ Login rechazado: {email}")
+            return render_template('login.html',
+                                   error="Credenciales incorrectas.",
+                                   supabase_url=os.getenv('SUPABASE_URL'),
+                                   supabase_key=os.getenv('SUPABASE_KEY'))
         except Exception as e:
             logger.error(f"❌ Login error: {e}")
             return render_template('login.html',
@@ -1266,8 +1461,8 @@ def google_sync():
         if not user_id or not email:
             return jsonify({"success": False, "error": "Datos incompletos"}), 400
 
-        usuario_result = supabase.table('usuarios_empresa').select('*').eq('id', user_id).execute()
-        if not usuario_result.data:
+        u_db = repositorio.usuario(user_id)
+        if not u_db:
             empresa_uuid = str(uuid.uuid4())
             nombre_base = email.split('@')[0].replace('.', ' ').title()
             nueva_empresa = {
@@ -1278,7 +1473,7 @@ def google_sync():
                 "tamano": "1-10",
                 "created_at": datetime.utcnow().isoformat()
             }
-            supabase.table('empresas').insert(nueva_empresa).execute()
+            repositorio.crear_empresa(nueva_empresa)
             nuevo_usuario = {
                 "id": user_id,
                 "email": email,
@@ -1286,7 +1481,7 @@ def google_sync():
                 "empresa_id": empresa_uuid,
                 "rol_en_empresa": 'admin'
             }
-            supabase.table('usuarios_empresa').insert(nuevo_usuario).execute()
+            repositorio.crear_usuario(nuevo_usuario)
             id_v_publico = f"JOB-{int(time.time())}"
             primera_vacante = {
                 "id": str(uuid.uuid4()),
@@ -1301,13 +1496,11 @@ def google_sync():
                 "activa": True,
                 "created_at": datetime.utcnow().isoformat()
             }
-            supabase.table('vacantes').insert(primera_vacante).execute()
+            repositorio.crear_vacante(primera_vacante)
             u_db = {"empresa_id": empresa_uuid, "nombre_completo": full_name}
-        else:
-            u_db = usuario_result.data[0]
 
-        empresa_result = supabase.table('empresas').select('*').eq('id', u_db['empresa_id']).execute()
-        nombre_empresa = empresa_result.data[0]['nombre_empresa'] if empresa_result.data else "Mi Empresa"
+        empresa = repositorio.empresa(u_db['empresa_id'], 'nombre_empresa')
+        nombre_empresa = empresa['nombre_empresa'] if empresa else "Mi Empresa"
         session.update({
             'logeado': True,
             'user_id': user_id,
@@ -1333,9 +1526,9 @@ def registro():
         tamano_empresa = request.form.get('tamano') or "1-10"
         cargo_inicial = request.form.get('cargo_inicial')
         try:
-            auth_res = supabase.auth.sign_up({"email": email, "password": password})
-            if auth_res.user:
-                user_id = auth_res.user.id
+            cuenta = repositorio.registrar_credenciales(email, password)
+            if cuenta:
+                user_id = cuenta['id']
                 empresa_uuid = str(uuid.uuid4())
                 nueva_empresa = {
                     "id": empresa_uuid,
@@ -1345,7 +1538,7 @@ def registro():
                     "tamano": tamano_empresa,
                     "created_at": datetime.utcnow().isoformat()
                 }
-                supabase.table('empresas').insert(nueva_empresa).execute()
+                repositorio.crear_empresa(nueva_empresa)
                 nuevo_usuario = {
                     "id": user_id,
                     "email": email,
@@ -1353,7 +1546,7 @@ def registro():
                     "empresa_id": empresa_uuid,
                     "rol_en_empresa": 'admin'
                 }
-                supabase.table('usuarios_empresa').insert(nuevo_usuario).execute()
+                repositorio.crear_usuario(nuevo_usuario)
                 cargo_display = cargo_inicial if cargo_inicial else "Asesor Comercial"
                 id_v_publico = f"JOB-{int(time.time())}"
                 primera_vacante = {
@@ -1371,7 +1564,7 @@ def registro():
                     "activa": True,
                     "created_at": datetime.utcnow().isoformat()
                 }
-                supabase.table('vacantes').insert(primera_vacante).execute()
+                repositorio.crear_vacante(primera_vacante)
                 session.update({
                     'logeado': True,
                     'user_id': user_id,
@@ -1392,13 +1585,13 @@ def eliminar_candidato(id):
         return jsonify({"success": False, "error": "No autorizado"}), 401
     emp_id_str = session.get('empresa_id')
     try:
-        candidato_result = supabase.table('entrevistas').select('*').eq('id', id).execute()
-        if not candidato_result.data:
+        candidato = repositorio.entrevista(id, 'id, empresa_id')
+        if not candidato:
             return jsonify({"success": False, "error": "Candidato no encontrado"}), 404
-        candidato = candidato_result.data[0]
         if candidato['empresa_id'] != emp_id_str:
             return jsonify({"success": False, "error": "No autorizado"}), 403
-        supabase.table('entrevistas').delete().eq('id', id).execute()
+        repositorio.eliminar_entrevista(id)
+        invalidar_dashboard(emp_id_str)
         logger.info(f"✅ Candidato eliminado: {id}")
         return jsonify({"success": True})
     except Exception as e:
@@ -1416,67 +1609,26 @@ def reportes():
         return redirect(url_for('login'))
 
     emp_id_str = session.get('empresa_id')
-    user_id    = session.get('user_id')
 
     try:
-        usuario_result = supabase.table('usuarios_empresa').select('*').eq('id', user_id).execute()
-        usuario = usuario_result.data[0] if usuario_result.data else {}
-
-        empresa_result = supabase.table('empresas').select('*').eq('id', emp_id_str).execute()
-        empresa = empresa_result.data[0] if empresa_result.data else {}
-
-        vacantes_result = supabase.table('vacantes').select('*').eq('empresa_id', emp_id_str).execute()
-        vacantes = vacantes_result.data or []
-
-        entrevistas_result = supabase.table('entrevistas').select('*').eq('empresa_id', emp_id_str).order('fecha', desc=True).execute()
-        entrevistas = entrevistas_result.data or []
-
-        total_c = len(entrevistas)
-        total_v = len(vacantes)
-        recomendados    = [e for e in entrevistas if e.get('veredicto') == 'RECOMENDADO']
-        no_recomendados = [e for e in entrevistas if e.get('veredicto') == 'NO RECOMENDADO']
-        a_revisar       = [e for e in entrevistas if e.get('veredicto') == 'REVISAR']
-
-        tasa_aprobacion = round(len(recomendados) / total_c * 100) if total_c > 0 else 0
-        score_promedio  = round(sum(e.get('score', 0) for e in entrevistas) / total_c, 1) if total_c > 0 else 0
-
-        finalistas  = [e for e in entrevistas if e.get('estado') == 'Finalista']
-        contratados = [e for e in entrevistas if e.get('estado') == 'Contratado']
-        descartados = [e for e in entrevistas if e.get('estado') == 'Descartado']
-        sin_estado  = [e for e in entrevistas if not e.get('estado')]
-
-        rendimiento_por_vacante = []
-        for v in vacantes:
-            cands = [e for e in entrevistas if e.get('vacante_id') == v['id']]
-            if not cands:
-                continue
-            scores = [e.get('score', 0) for e in cands]
-            aptos  = [e for e in cands if e.get('veredicto') == 'RECOMENDADO']
-            rendimiento_por_vacante.append({
-                'cargo':           v['cargo'],
-                'total':           len(cands),
-                'score_promedio':  round(sum(scores) / len(scores), 1),
-                'tasa_aprobacion': round(len(aptos) / len(cands) * 100),
-                'finalistas':      len([e for e in cands if e.get('estado') == 'Finalista']),
-                'contratados':     len([e for e in cands if e.get('estado') == 'Contratado']),
-            })
-        rendimiento_por_vacante.sort(key=lambda x: x['score_promedio'], reverse=True)
-
-        from collections import defaultdict
-        por_mes = defaultdict(list)
-        for e in entrevistas:
-            fecha = e.get('fecha', '')
-            if fecha and len(fecha) >= 7:
-                por_mes[fecha[:7]].append(e.get('score', 0))
-
-        evolucion = []
-        for mes in sorted(por_mes.keys()):
-            scores_mes = por_mes[mes]
-            evolucion.append({
-                'mes':            mes,
-                'total':          len(scores_mes),
-                'score_promedio': round(sum(scores_mes) / len(scores_mes), 1)
-            })
+        # Todos los agregados en una sola llamada (ver sql/003_reporte_empresa.sql),
+        # en paralelo con la identidad
+        res = en_paralelo({
+            'identidad': identidad_actual,
+            'reporte': lambda: repositorio.reporte_empresa(emp_id_str)
+        })
+        identidad = res['identidad'] or {}
+        usuario = identidad.get('usuario') or {}
+        empresa = identidad.get('empresa') or {}
+        reporte = res['reporte'] or {}
+
+        total_c = reporte.get('total_c', 0)
+        total_v = reporte.get('total_v', 0)
+        recomendados = reporte.get('recomendados', 0)
+        tasa_aprobacion = round(recomendados / total_c * 100) if total_c > 0 else 0
+        score_promedio = reporte.get('score_promedio', 0)
+        rendimiento_por_vacante = reporte.get('por_vacante') or []
+        evolucion = reporte.get('evolucion') or []
 
         import json as json_mod
         evolucion_labels  = json_mod.dumps([e['mes'] for e in evolucion])
@@ -1485,7 +1637,7 @@ def reportes():
         vacante_labels    = json_mod.dumps([r['cargo'][:20] for r in rendimiento_por_vacante])
         vacante_scores    = json_mod.dumps([r['score_promedio'] for r in rendimiento_por_vacante])
         vacante_tasas     = json_mod.dumps([r['tasa_aprobacion'] for r in rendimiento_por_vacante])
-        embudo            = json_mod.dumps([total_c, len(recomendados), len(finalistas), len(contratados)])
+        embudo            = json_mod.dumps([total_c, recomendados, reporte.get('finalistas', 0), reporte.get('contratados', 0)])
 
         return render_template('reportes.html',
             usuario=usuario,
@@ -1495,13 +1647,13 @@ def reportes():
             total_v=total_v,
             tasa_aprobacion=tasa_aprobacion,
             score_promedio=score_promedio,
-            recomendados=len(recomendados),
-            no_recomendados=len(no_recomendados),
-            a_revisar=len(a_revisar),
-            finalistas=len(finalistas),
-            contratados=len(contratados),
-            descartados=len(descartados),
-            sin_estado=len(sin_estado),
+            recomendados=recomendados,
+            no_recomendados=reporte.get('no_recomendados', 0),
+            a_revisar=reporte.get('a_revisar', 0),
+            finalistas=reporte.get('finalistas', 0),
+            contratados=reporte.get('contratados', 0),
+            descartados=reporte.get('descartados', 0),
+            sin_estado=reporte.get('sin_estado', 0),
             rendimiento_por_vacante=rendimiento_por_vacante,
             evolucion=evolucion,
             evolucion_labels=evolucion_labels,
@@ -1528,8 +1680,7 @@ def get_habilidades():
     if not session.get('logeado'):
         return jsonify({"error": "No autorizado"}), 401
     try:
-        result = supabase.table('habilidades').select('*').execute()
-        return jsonify(result.data)
+        return jsonify(repositorio.habilidades())
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -1548,11 +1699,10 @@ def api_candidato(id):
         # ============================================
         # 1. OBTENER CANDIDATO
         # ============================================
-        candidato_result = supabase.table('entrevistas').select('*').eq('id', id).execute()
-        if not candidato_result.data:
+        candidato = repositorio.entrevista(id, proyecciones.ENTREVISTA_DETALLE)
+        if not candidato:
             return jsonify({"error": "Candidato no encontrado"}), 404
         
-        candidato = candidato_result.data[0]
         emp_id_str = session.get('empresa_id')
         
         if candidato['empresa_id'] != emp_id_str:
@@ -1561,22 +1711,18 @@ def api_candidato(id):
         # ============================================
         # 2. OBTENER VACANTE Y CONFIGURACIÓN
         # ============================================
-        vacante_result = supabase.table('vacantes').select('*').eq('id', candidato['vacante_id']).execute()
-        cargo = vacante_result.data[0]['cargo'] if vacante_result.data else "N/A"
+        vacante = obtener_vacante(candidato['vacante_id'])
+        plan = obtener_plan(vacante) if vacante else None
+        cargo = plan['cargo'] if plan else "N/A"
         
         # Obtener configuración del modelo
-        config = get_config_modelo(vacante_result.data[0]) if vacante_result.data else None
-        fases_config = {
-            "pre_screening": {"peso": config['peso_prescreening']},
-            "entrevista": {"peso": config['peso_entrevista']}
-        } if config else {"pre_screening": {"peso": 70}, "entrevista": {"peso": 30}}
+        fases_config = plan['fases'] if plan else {"pre_screening": {"peso": 70}, "entrevista": {"peso": 30}}
 
         # ============================================
         # 3. PARSEAR ANÁLISIS IA
         # ============================================
-        try:
-            analisis = json.loads(candidato['analisis_ia'])
-        except:
+        analisis = leer_analisis_ia(candidato.get('analisis_ia'))
+        if not analisis:
             analisis = {
                 "resumen": "Análisis no disponible",
                 "fortalezas": [],
@@ -1654,7 +1800,7 @@ def api_candidato(id):
                 "Blandas": candidato.get('metricas_categorias', {}).get('Blandas', 0),
                 "Ajuste": candidato.get('metricas_categorias', {}).get('Ajuste', 0)
             },
-            "skill_stack": vacante_result.data[0].get('skill_stack', []) if vacante_result.data else []
+            "skill_stack": plan['skill_stack'] if plan else []
         })
         
     except Exception as e:
@@ -1686,17 +1832,16 @@ def guardar_evaluacion():
         # ============================================
         # 1. OBTENER CANDIDATO Y VACANTE
         # ============================================
-        cand_result = supabase.table('entrevistas').select('score, vacante_id').eq('id', entrevista_id).execute()
-        if not cand_result.data:
+        candidato = repositorio.entrevista(entrevista_id, 'score, vacante_id')
+        if not candidato:
             return jsonify({"error": "Candidato no encontrado"}), 404
         
-        candidato = cand_result.data[0]
         score_pre = float(candidato.get('score', 0))
         
         # Obtener configuración de la vacante
-        vacante_result = supabase.table('vacantes').select('*').eq('id', candidato['vacante_id']).execute()
-        config = get_config_modelo(vacante_result.data[0]) if vacante_result.data else None
-        fases_config = config['fases'] if config else {
+        vacante = obtener_vacante(candidato['vacante_id'])
+        plan = obtener_plan(vacante) if vacante else None
+        fases_config = plan['fases'] if plan else {
             "pre_screening": {"peso": 70},
             "entrevista": {"peso": 30}
         }
@@ -1727,12 +1872,12 @@ def guardar_evaluacion():
         # ============================================
         # 4. GUARDAR EN BASE DE DATOS
         # ============================================
-        supabase.table('entrevistas').update({
+        repositorio.actualizar_entrevista(entrevista_id, {
             "criterios_entrevista": criterios,
             "comentario_entrevista": comentario,
             "score_interview": score_interview,
             "score_final_combinado": score_final_combinado,
-        }).eq('id', entrevista_id).execute()
+        })
 
         logger.info(f"✅ Evaluación guardada: {entrevista_id}")
         logger.info(f"   - Score pre-screening: {score_pre}% (peso {fases_config['pre_screening']['peso']}%)")
@@ -1760,58 +1905,120 @@ def guardar_evaluacion():
 # COMPARAR CANDIDATOS
 # ============================================
 
-@app.route('/comparar')
-def comparar():
-    if not session.get('logeado'):
-        return redirect(url_for('candidatos'))
-    id1 = request.args.get('c1')
-    id2 = request.args.get('c2')
-    if not id1 or not id2:
-        return redirect(url_for('candidatos'))
-    try:
-        c1 = supabase.table('entrevistas').select('*, vacantes(cargo, skill_stack)').eq('id', id1).single().execute()
-        c2 = supabase.table('entrevistas').select('*, vacantes(cargo, skill_stack)').eq('id', id2).single().execute()
-
-        for c in [c1.data, c2.data]:
-            if c.get('analisis_ia'):
-                c['analisis_ia_obj'] = json.loads(c['analisis_ia'])
-
-        def get_eval(candidato_data):
-            criterios = candidato_data.get('criterios_entrevista')
-            if not criterios:
-                return None
-            return {
+MIN_COMPARAR = 2
+MAX_COMPARAR = 6
+CATEGORIAS_COMPARAR = ['Técnica', 'Experiencia', 'Blandas', 'Ajuste']
+
+
+def armar_comparacion(candidatos_cmp):
+    """
+    Prepara el comparador recorriendo los candidatos una vez: score final con
+    los pesos de fases de la vacante de cada candidato y matrices {habilidad|categoría: [pct por
+    candidato]} (-1 = no evaluada). Retorna el contexto de comparar.html.
+    """
+    skill_stack = []
+    matriz_habilidades = {}
+    matriz_categorias = {cat: [] for cat in CATEGORIAS_COMPARAR}
+    pesos_por_vacante = {}
+
+    for c in candidatos_cmp:
+        vacante = c.get('vacantes') or {}
+        for hab in vacante.get('skill_stack') or []:
+            if hab not in matriz_habilidades:
+                skill_stack.append(hab)
+                matriz_habilidades[hab] = []
+
+        analisis = leer_analisis_ia(c.get('analisis_ia')) if c.get('analisis_ia') else None
+        c['analisis_ia_obj'] = analisis
+        c['skill_scores'] = (analisis or {}).get('entity_skill_score') or c.get('entity_skill_score') or {}
+
+        if c.get('vacante_id') not in pesos_por_vacante:
+            fases = (vacante.get('configuracion_modelo') or {}).get('fases_evaluacion') or {}
+            pesos_por_vacante[c.get('vacante_id')] = {
+                'peso_prescreening': int(fases.get('pre_screening', {}).get('peso', 70)),
+                'peso_entrevista':   int(fases.get('entrevista', {}).get('peso', 30)),
+            }
+        pesos = pesos_por_vacante[c.get('vacante_id')]
+        c['pesos'] = pesos
+
+        criterios = c.get('criterios_entrevista')
+        if criterios:
+            c['eval'] = {
                 "criterios":             criterios,
-                "comentario":            candidato_data.get('comentario_entrevista', ''),
-                "score_interview":       candidato_data.get('score_interview'),
-                "score_final_combinado": candidato_data.get('score_final_combinado'),
+                "comentario":            c.get('comentario_entrevista', ''),
+                "score_interview":       c.get('score_interview'),
+                "score_final_combinado": c.get('score_final_combinado'),
             }
+            c['score_final'] = calcular_score_combinado(
+                float(c.get('score') or 0), normalizar_score_interview(criterios),
+                pesos['peso_prescreening'], pesos['peso_entrevista']
+            )
+        else:
+            c['eval'] = None
+            c['score_final'] = None
 
-        eval1 = get_eval(c1.data)
-        eval2 = get_eval(c2.data)
+        metricas_cat = c.get('metricas_categorias') or {}
+        for cat in CATEGORIAS_COMPARAR:
+            matriz_categorias[cat].append(metricas_cat.get(cat, -1))
 
-        def calc_score_final(score_pre, eval_data):
-            if not eval_data or not eval_data.get('criterios'):
-                return None
-            criterios = eval_data['criterios']
-            bloque_a = [criterios.get(k, 3) for k in ['dominio', 'resolucion']]
-            bloque_b = [criterios.get(k, 3) for k in ['comunicacion', 'pensamiento', 'cultura', 'seguridad']]
-            score_a = sum(bloque_a) / len(bloque_a) if bloque_a else 3
-            score_b = sum(bloque_b) / len(bloque_b) if bloque_b else 3
-            interview_raw = score_a * 0.4 + score_b * 0.6
-            score_interview = round((interview_raw - 1) / 4 * 100)
-            return round(float(score_pre) * 0.7 + score_interview * 0.3, 1)
+    # Las columnas por habilidad se llenan cuando ya se conoce el stack de todas las vacantes
+    for hab in skill_stack:
+        matriz_habilidades[hab] = [c['skill_scores'].get(hab, -1) for c in candidatos_cmp]
+
+    finales = [c['score_final'] for c in candidatos_cmp if c['score_final'] is not None]
+    mejor_final = max(finales) if finales else None
+    mejor_score = max((c.get('score') or 0) for c in candidatos_cmp)
+
+    pesos_distintos = {(p['peso_prescreening'], p['peso_entrevista']) for p in pesos_por_vacante.values()}
+    pesos_mixtos = len(pesos_distintos) > 1
+    if pesos_mixtos:
+        etiqueta_pesos = "Pesos de fases de cada vacante"
+    else:
+        pre, ent = next(iter(pesos_distintos))
+        etiqueta_pesos = f"{pre}% IA + {ent}% entrevista"
+
+    cargos = []
+    for c in candidatos_cmp:
+        cargo = (c.get('vacantes') or {}).get('cargo')
+        if cargo and cargo not in cargos:
+            cargos.append(cargo)
 
-        c1.data['score_final'] = calc_score_final(c1.data.get('score', 0), eval1)
-        c2.data['score_final'] = calc_score_final(c2.data.get('score', 0), eval2)
-        c1.data['eval'] = eval1
-        c2.data['eval'] = eval2
+    return {
+        "candidatos": candidatos_cmp,
+        "cargos": cargos,
+        "skill_stack": skill_stack,
+        "matriz_habilidades": matriz_habilidades,
+        "matriz_categorias": matriz_categorias,
+        "mejor_final": mejor_final,
+        "mejor_score": mejor_score,
+        "etiqueta_pesos": etiqueta_pesos,
+        "pesos_mixtos": pesos_mixtos,
+    }
 
-        skill_stack = []
-        if c1.data.get('vacantes') and c1.data['vacantes'].get('skill_stack'):
-            skill_stack = c1.data['vacantes']['skill_stack']
 
-        return render_template('comparar.html', c1=c1.data, c2=c2.data, skill_stack=skill_stack)
+@app.route('/comparar')
+def comparar():
+    if not session.get('logeado'):
+        return redirect(url_for('candidatos'))
+
+    # c1..c6 en el orden elegido, sin repetidos
+    ids = []
+    for n in range(1, MAX_COMPARAR + 1):
+        cid = request.args.get(f'c{n}')
+        if cid and cid not in ids:
+            ids.append(cid)
+    if len(ids) < MIN_COMPARAR:
+        return redirect(url_for('candidatos'))
+
+    try:
+        filas = repositorio.entrevistas_por_ids(session.get('empresa_id'), ids, proyecciones.ENTREVISTA_COMPARAR)
+        por_id = {str(c['id']): c for c in filas}
+        candidatos_cmp = [por_id[cid] for cid in ids if cid in por_id]
+        if len(candidatos_cmp) < MIN_COMPARAR:
+            return redirect(url_for('candidatos'))
+
+        comparacion = armar_comparacion(candidatos_cmp)
+        return render_template('comparar.html', **comparacion)
     except Exception as e:
         logger.error(f"❌ Error en comparador: {e}")
         return redirect(url_for('candidatos'))
@@ -1826,8 +2033,7 @@ def comparar():
 def admin_panel():
     """Panel de administrador global"""
     try:
-        metricas_response = supabase.table('vista_metricas_empresas').select('*').execute()
-        empresas = metricas_response.data if metricas_response.data else []
+        empresas = repositorio.metricas_empresas()
         
         total_empresas = len(empresas)
         empresas_activas = sum(1 for e in empresas if e.get('activo'))
@@ -1868,17 +2074,20 @@ def admin_panel():
 def admin_empresa_detalle(empresa_id):
     """Ver detalles completos de una empresa"""
     try:
-        empresa_response = supabase.table('empresas').select('*').eq('id', empresa_id).execute()
-        if not empresa_response.data:
+        # Las cuatro consultas son independientes: se lanzan a la vez
+        res = en_paralelo({
+            'empresa': lambda: repositorio.empresa(empresa_id),
+            'usuarios': lambda: repositorio.usuarios_de_empresa(empresa_id),
+            'vacantes': lambda: repositorio.vacantes_empresa(empresa_id),
+            'candidatos': lambda: repositorio.entrevistas_empresa(empresa_id, proyecciones.ENTREVISTA_TARJETA),
+        })
+        if not res['empresa']:
             return redirect(url_for('admin_panel'))
-        
-        empresa = empresa_response.data[0]
-        usuarios_response = supabase.table('usuarios_empresa').select('*').eq('empresa_id', empresa_id).execute()
-        usuarios = usuarios_response.data if usuarios_response.data else []
-        vacantes_response = supabase.table('vacantes').select('*').eq('empresa_id', empresa_id).execute()
-        vacantes = vacantes_response.data if vacantes_response.data else []
-        candidatos_response = supabase.table('entrevistas').select('*').eq('empresa_id', empresa_id).order('fecha', desc=True).execute()
-        candidatos = candidatos_response.data if candidatos_response.data else []
+
+        empresa = res['empresa']
+        usuarios = res['usuarios']
+        vacantes = res['vacantes']
+        candidatos = res['candidatos']
         
         return render_template('admin/empresa_detalle.html',
                              empresa=empresa,
@@ -1896,8 +2105,7 @@ def admin_empresa_detalle(empresa_id):
 def admin_estadisticas():
     """API para obtener estadísticas agregadas"""
     try:
-        metricas_response = supabase.table('vista_metricas_empresas').select('*').execute()
-        empresas = metricas_response.data if metricas_response.data else []
+        empresas = repositorio.metricas_empresas()
         
         hoy = datetime.now()
         stats_mensuales = {}
@@ -1928,9 +2136,21 @@ def admin_estadisticas():
         return jsonify({'success': False, 'message': str(e)}), 500
 
 # Agregar esto después de las rutas principales, antes del if __name__
+@app.route('/metrics')
+def metrics():
+    """Métricas del proceso en formato Prometheus. Requiere Authorization: Bearer METRICS_TOKEN."""
+    token = os.getenv('METRICS_TOKEN')
+    enviado = request.headers.get('Authorization', '').removeprefix('Bearer ').strip()
+    if not token:
+        return "Not Found", 404
+    if not hmac.compare_digest(enviado.encode(), token.encode()):
+        return "No autorizado", 401
+    return metricas.exponer(), 200, {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
+
+
 @app.route('/health')
 def health():
-    """Health check para Render"""
+    """Health check para Render (solo liveness; las estadísticas de caché están en /metrics)"""
     return jsonify({"status": "healthy", "timestamp": datetime.utcnow().isoformat()}), 200
 
 
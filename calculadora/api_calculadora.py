@@ -7,17 +7,11 @@ from flask import Blueprint, jsonify, request
 from datetime import datetime
 import logging
 import os
-from supabase import create_client, Client
+from storage.repositorio import repositorio
 
 # Logger
 logger = logging.getLogger(__name__)
 
-# Cliente Supabase
-supabase: Client = create_client(
-    os.getenv('SUPABASE_URL'),
-    os.getenv('SUPABASE_KEY')
-)
-
 
 def registrar_demo(diagnostico_id: str, email: str, telefono: str = None, preferencia_horario: str = None):
     """
@@ -34,15 +28,12 @@ def registrar_demo(diagnostico_id: str, email: str, telefono: str = None, prefer
     """
     try:
         # Obtener lead_id del diagnóstico
-        diagnostico = supabase.table('calculadora_diagnosticos') \
-            .select('lead_id') \
-            .eq('id', diagnostico_id) \
-            .execute()
+        diagnostico = repositorio.diagnostico(diagnostico_id, 'lead_id')
         
-        if not diagnostico.data:
+        if not diagnostico:
             return {'success': False, 'error': 'Diagnóstico no encontrado'}
         
-        lead_id = diagnostico.data[0]['lead_id']
+        lead_id = diagnostico['lead_id']
         
         # Insertar solicitud de demo
         demo_data = {
@@ -55,16 +46,13 @@ def registrar_demo(diagnostico_id: str, email: str, telefono: str = None, prefer
             'origen': 'calculadora_resultados'
         }
         
-        result = supabase.table('calculadora_demos').insert(demo_data).execute()
+        demo = repositorio.crear_demo(demo_data)
         
         # Actualizar diagnóstico
-        supabase.table('calculadora_diagnosticos') \
-            .update({'agendada_demo': True}) \
-            .eq('id', diagnostico_id) \
-            .execute()
+        repositorio.actualizar_diagnostico(diagnostico_id, {'agendada_demo': True})
         
         # Registrar interacción
-        supabase.table('calculadora_interacciones').insert({
+        repositorio.registrar_interaccion({
             'lead_id': lead_id,
             'diagnostico_id': diagnostico_id,
             'accion': 'agenda_demo',
@@ -72,13 +60,13 @@ def registrar_demo(diagnostico_id: str, email: str, telefono: str = None, prefer
                 'preferencia_horario': preferencia_horario,
                 'telefono_proporcionado': telefono is not None
             }
-        }).execute()
+        })
         
         logger.info(f"Demo agendada para lead {lead_id}, diagnóstico {diagnostico_id}")
         
         return {
             'success': True,
-            'demo_id': result.data[0]['id'],
+            'demo_id': demo['id'],
             'mensaje': 'Demo agendada exitosamente'
         }
         
@@ -101,15 +89,12 @@ def registrar_interaccion(diagnostico_id: str, accion: str, metadata: dict = Non
     """
     try:
         # Obtener lead_id del diagnóstico
-        diagnostico = supabase.table('calculadora_diagnosticos') \
-            .select('lead_id') \
-            .eq('id', diagnostico_id) \
-            .execute()
+        diagnostico = repositorio.diagnostico(diagnostico_id, 'lead_id')
         
-        if not diagnostico.data:
+        if not diagnostico:
             return {'success': False, 'error': 'Diagnóstico no encontrado'}
         
-        lead_id = diagnostico.data[0]['lead_id']
+        lead_id = diagnostico['lead_id']
         
         # Insertar interacción
         interaccion_data = {
@@ -121,7 +106,7 @@ def registrar_interaccion(diagnostico_id: str, accion: str, metadata: dict = Non
             'ip_address': request.remote_addr
         }
         
-        supabase.table('calculadora_interacciones').insert(interaccion_data).execute()
+        repositorio.registrar_interaccion(interaccion_data)
         
         # Actualizar flags en diagnóstico según la acción
         updates = {}
@@ -134,10 +119,7 @@ def registrar_interaccion(diagnostico_id: str, accion: str, metadata: dict = Non
             updates['click_registro'] = True
         
         if updates:
-            supabase.table('calculadora_diagnosticos') \
-                .update(updates) \
-                .eq('id', diagnostico_id) \
-                .execute()
+            repositorio.actualizar_diagnostico(diagnostico_id, updates)
         
         return {'success': True}
         
@@ -16,7 +16,6 @@ import logging
 import requests
 from datetime import datetime
 from flask import Blueprint, render_template, request, jsonify, redirect, url_for, abort
-from supabase import create_client
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -24,8 +23,8 @@ logger = logging.getLogger(__name__)
 
 epayco_bp = Blueprint('epayco', __name__)
 
-# ── Supabase ──────────────────────────────────────────────
-supabase = create_client(os.getenv('SUPABASE_URL'), os.getenv('SUPABASE_KEY'))
+# ── Repositorio ───────────────────────────────────────────
+from storage.repositorio import repositorio
 
 # ── Credenciales ePayco ───────────────────────────────────
 EPAYCO_P_CUST_ID  = os.getenv('EPAYCO_P_CUST_ID_CLIENTE')
@@ -44,12 +43,7 @@ PRECIO_COP = int(os.getenv('PRECIO_COP', '120000'))  # Precio en COP para ePayco
 def get_diagnostico(diagnostico_id: str):
     """Obtiene diagnóstico con su lead asociado."""
     try:
-        res = supabase.table('calculadora_diagnosticos')\
-            .select('*, calculadora_leads(*)')\
-            .eq('id', diagnostico_id)\
-            .single()\
-            .execute()
-        return res.data
+        return repositorio.diagnostico(diagnostico_id, '*, calculadora_leads(*)')
     except Exception as e:
         logger.error(f"❌ get_diagnostico: {e}")
         return None
@@ -58,12 +52,7 @@ def get_diagnostico(diagnostico_id: str):
 def get_pago_por_diagnostico(diagnostico_id: str):
     """Retorna el pago aprobado de un diagnóstico, si existe."""
     try:
-        res = supabase.table('calculadora_pagos')\
-            .select('*')\
-            .eq('diagnostico_id', diagnostico_id)\
-            .eq('estado', 'aprobado')\
-            .execute()
-        return res.data[0] if res.data else None
+        return repositorio.pago_aprobado(diagnostico_id)
     except:
         return None
 
@@ -100,15 +89,14 @@ def verificar_firma_epayco(data: dict) -> bool:
 def crear_pago_pendiente(diagnostico_id: str, lead_id: str, ref_interna: str):
     """Crea registro de pago en estado pendiente."""
     try:
-        res = supabase.table('calculadora_pagos').insert({
+        return repositorio.crear_pago({
             'diagnostico_id': diagnostico_id,
             'lead_id': lead_id,
             'ref_interna': ref_interna,
             'estado': 'pendiente',
             'monto': PRECIO_USD,
             'moneda': 'USD',
-        }).execute()
-        return res.data[0] if res.data else None
+        })
     except Exception as e:
         logger.error(f"❌ crear_pago_pendiente: {e}")
         return None
@@ -117,25 +105,25 @@ def crear_pago_pendiente(diagnostico_id: str, lead_id: str, ref_interna: str):
 def marcar_pago_aprobado(ref_interna: str, ref_payco: str, payload: dict):
     """Actualiza el pago a aprobado con datos de ePayco."""
     try:
-        supabase.table('calculadora_pagos').update({
+        repositorio.actualizar_pago(ref_interna, {
             'estado': 'aprobado',
             'ref_payco': ref_payco,
             'codigo_respuesta': str(payload.get('x_response_code', '')),
             'respuesta_epayco': payload,
             'fecha_pago': datetime.now().isoformat(),
-        }).eq('ref_interna', ref_interna).execute()
+        })
     except Exception as e:
         logger.error(f"❌ marcar_pago_aprobado: {e}")
 
 
 def marcar_pago_rechazado(ref_interna: str, ref_payco: str, payload: dict, estado='rechazado'):
     try:
-        supabase.table('calculadora_pagos').update({
+        repositorio.actualizar_pago(ref_interna, {
             'estado': estado,
             'ref_payco': ref_payco,
             'codigo_respuesta': str(payload.get('x_response_code', '')),
             'respuesta_epayco': payload,
-        }).eq('ref_interna', ref_interna).execute()
+        })
     except Exception as e:
         logger.error(f"❌ marcar_pago_rechazado: {e}")
 
@@ -233,12 +221,9 @@ def respuesta():
     if codigo == '1':
         # Buscar el diagnóstico por ref_interna
         try:
-            res = supabase.table('calculadora_pagos')\
-                .select('diagnostico_id')\
-                .eq('ref_interna', ref_interna)\
-                .execute()
-            if res.data:
-                diag_id = res.data[0]['diagnostico_id']
+            pago = repositorio.pago_por_referencia(ref_interna, 'diagnostico_id')
+            if pago:
+                diag_id = pago['diagnostico_id']
                 return redirect(url_for('epayco.reporte', diagnostico_id=diag_id))
         except:
             pass
@@ -3,7 +3,7 @@ from datetime import datetime
 import logging
 import os
 
-from supabase import create_client, Client
+from storage.repositorio import repositorio
 from calculadora.logic import calcular_metricas, generar_mensaje_benchmark
 from calculadora.api_calculadora import registrar_demo, registrar_interaccion
 # from calculadora.epayco_checkout import epayco_bp  # DESACTIVADO - Lead Magnet
@@ -19,11 +19,6 @@ calculadora_bp = Blueprint(
 
 logger = logging.getLogger(__name__)
 
-supabase: Client = create_client(
-    os.getenv('SUPABASE_URL'),
-    os.getenv('SUPABASE_KEY')
-)
-
 
 # ==============================================================================
 # PÁGINAS PÚBLICAS
@@ -49,15 +44,12 @@ def lead_gate(diagnostico_id):
     URL: /calculadora/gate/<diagnostico_id>
     """
     try:
-        result = supabase.table('calculadora_diagnosticos') \
-            .select('id, desbloqueado') \
-            .eq('id', diagnostico_id) \
-            .execute()
+        diagnostico = repositorio.diagnostico(diagnostico_id, 'id, desbloqueado')
 
-        if not result.data:
+        if not diagnostico:
             return redirect(url_for('calculadora.formulario'))
 
-        if result.data[0].get('desbloqueado'):
+        if diagnostico.get('desbloqueado'):
             return redirect(url_for('calculadora.resultados', diagnostico_id=diagnostico_id))
 
         return render_template('calculadora/calculadora_lead_gate.html', diagnostico_id=diagnostico_id)
@@ -76,23 +68,15 @@ def resultados(diagnostico_id):
     URL: /calculadora/resultados/<diagnostico_id>
     """
     try:
-        result = supabase.table('calculadora_diagnosticos') \
-            .select('*, calculadora_leads(*)') \
-            .eq('id', diagnostico_id) \
-            .execute()
+        data = repositorio.diagnostico(diagnostico_id, '*, calculadora_leads(*)')
 
-        if not result.data:
+        if not data:
             return "Diagnóstico no encontrado", 404
 
-        data = result.data[0]
-
         if not data.get('desbloqueado'):
             return redirect(url_for('calculadora.lead_gate', diagnostico_id=diagnostico_id))
 
-        supabase.table('calculadora_diagnosticos') \
-            .update({'visto_resultados': True}) \
-            .eq('id', diagnostico_id) \
-            .execute()
+        repositorio.actualizar_diagnostico(diagnostico_id, {'visto_resultados': True})
 
         mensajes = generar_mensaje_benchmark(
             data.get('diferencia_vs_benchmark_tiempo', 0),
@@ -148,20 +132,13 @@ def api_submit():
             'utm_campaign':  data.get('utm_campaign'),
         }
 
-        existing = supabase.table('calculadora_leads') \
-            .select('id') \
-            .eq('email', data['email']) \
-            .execute()
-
-        if existing.data:
-            lead_id = existing.data[0]['id']
-            supabase.table('calculadora_leads') \
-                .update(lead_payload) \
-                .eq('id', lead_id) \
-                .execute()
+        existente = repositorio.lead_por_email(data['email'])
+
+        if existente:
+            lead_id = existente['id']
+            repositorio.actualizar_lead(lead_id, lead_payload)
         else:
-            ins = supabase.table('calculadora_leads').insert(lead_payload).execute()
-            lead_id = ins.data[0]['id']
+            lead_id = repositorio.crear_lead(lead_payload)['id']
 
         logger.info(f"Lead procesado: {data['email']} → {lead_id}")
 
@@ -189,14 +166,11 @@ def api_submit():
             **metricas,
         }
 
-        diag = supabase.table('calculadora_diagnosticos') \
-            .insert(diagnostico_payload) \
-            .execute()
-        diagnostico_id = diag.data[0]['id']
+        diagnostico_id = repositorio.crear_diagnostico(diagnostico_payload)['id']
 
         logger.info(f"Diagnóstico creado: {diagnostico_id}")
 
-        supabase.table('calculadora_interacciones').insert({
+        repositorio.registrar_interaccion({
             'lead_id':        lead_id,
             'diagnostico_id': diagnostico_id,
             'accion':         'formulario_completado',
@@ -204,7 +178,7 @@ def api_submit():
                 'costo_mensual': metricas['costo_operativo_mensual'],
                 'ahorro_anual':  metricas['ahorro_anual'],
             }
-        }).execute()
+        })
 
         return jsonify({
             'success':        True,
@@ -233,31 +207,28 @@ def api_lead_gate():
         if not diagnostico_id:
             return jsonify({'success': False, 'error': 'diagnostico_id requerido'}), 400
 
-        diag = supabase.table('calculadora_diagnosticos') \
-            .select('lead_id') \
-            .eq('id', diagnostico_id) \
-            .execute()
+        diag = repositorio.diagnostico(diagnostico_id, 'lead_id')
 
-        if not diag.data:
+        if not diag:
             return jsonify({'success': False, 'error': 'Diagnóstico no encontrado'}), 404
 
-        lead_id = diag.data[0]['lead_id']
+        lead_id = diag['lead_id']
 
-        supabase.table('calculadora_leads').update({
+        repositorio.actualizar_lead(lead_id, {
             'nombre':    data.get('nombre'),
             'cargo':     data.get('cargo'),
             'empresa':   data.get('empresa'),
             'email':     data.get('email'),
             'telefono':  data.get('telefono'),
             'empleados': data.get('empleados'),
-        }).eq('id', lead_id).execute()
+        })
 
-        supabase.table('calculadora_diagnosticos').update({
+        repositorio.actualizar_diagnostico(diagnostico_id, {
             'desbloqueado':    True,
             'desbloqueado_at': datetime.now().isoformat(),
-        }).eq('id', diagnostico_id).execute()
+        })
 
-        supabase.table('calculadora_interacciones').insert({
+        repositorio.registrar_interaccion({
             'lead_id':        lead_id,
             'diagnostico_id': diagnostico_id,
             'accion':         'lead_gate_completado',
@@ -265,7 +236,7 @@ def api_lead_gate():
                 'empleados':      data.get('empleados'),
                 'tiene_telefono': bool(data.get('telefono')),
             }
-        }).execute()
+        })
 
         logger.info(f"Lead Gate completado: {data.get('email')} → {diagnostico_id}")
 
@@ -291,22 +262,19 @@ def api_tracking():
         if not data or not data.get('diagnostico_id'):
             return jsonify({'success': False}), 400
 
-        diag = supabase.table('calculadora_diagnosticos') \
-            .select('lead_id') \
-            .eq('id', data['diagnostico_id']) \
-            .execute()
+        diag = repositorio.diagnostico(data['diagnostico_id'], 'lead_id')
 
-        if not diag.data:
+        if not diag:
             return jsonify({'success': False, 'error': 'No encontrado'}), 404
 
-        lead_id = diag.data[0]['lead_id']
+        lead_id = diag['lead_id']
 
-        supabase.table('calculadora_interacciones').insert({
+        repositorio.registrar_interaccion({
             'lead_id':        lead_id,
             'diagnostico_id': data['diagnostico_id'],
             'accion':         data.get('tipo_interaccion') or data.get('accion'),
             'metadata':       data.get('datos') or data.get('metadata'),
-        }).execute()
+        })
 
         flags = {}
         accion = data.get('tipo_interaccion') or data.get('accion', '')
@@ -322,10 +290,7 @@ def api_tracking():
             flags['click_trial'] = True
 
         if flags:
-            supabase.table('calculadora_diagnosticos') \
-                .update(flags) \
-                .eq('id', data['diagnostico_id']) \
-                .execute()
+            repositorio.actualizar_diagnostico(data['diagnostico_id'], flags)
 
         return jsonify({'success': True}), 200
 
@@ -0,0 +1,8 @@
+# Palabras clave técnicas/comerciales que se buscan en las transcripciones.
+# Se comparan contra texto normalizado por core.text_cleaner (minúsculas, sin
+# acentos), así que una raíz como "simetri" cuenta "simetria" y "simetrico".
+KEYWORDS_TRANSCRIPCION = (
+    "simetri", "estabilidad", "megas", "latencia",
+    "cobertura", "navegar", "instalacion", "beneficio",
+    "fibra", "velocidad", "promocion"
+)
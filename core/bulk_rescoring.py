@@ -0,0 +1,181 @@
+"""
+core/bulk_rescoring.py
+Re-scoring masivo de una vacante tras cambiar su configuración del modelo
+"""
+
+import logging
+
+import numpy as np
+
+from core.counters import puntuar_respuesta_abierta
+from core.scoring_plan import CATEGORIAS, TIPOS_CERRADOS
+from storage.repositorio import repositorio
+
+logger = logging.getLogger(__name__)
+
+TAMANO_LOTE_ESCRITURA = 500
+BOOST_FACTOR = 1.15
+UMBRAL_BOOST = 80
+
+COLUMNAS_RESCORING = 'id, veredicto, score_interview, respuestas_detalle'
+
+
+def _puntos(pregunta: dict, respuesta: str):
+    """(puntos, falla_ko) de una respuesta con las reglas actuales del plan, igual que evaluar_envio."""
+    if pregunta['tipo'] in TIPOS_CERRADOS:
+        if respuesta.lower() == pregunta['ideal']:
+            return pregunta['peso'], False
+        return 0, pregunta['knockout']
+    if pregunta['palabras_clave']:
+        return round(pregunta['peso'] * puntuar_respuesta_abierta(respuesta, pregunta['palabras_clave']), 2), False
+    return 0, False
+
+
+def cargar_matrices(filas: list, plan: dict) -> dict:
+    """
+    Convierte las respuestas_detalle de todos los candidatos en matrices:
+    candidatos × categorías y candidatos × habilidades (obtenido y máximo).
+
+    Los puntos se recalculan con el plan actual (peso, ideal y palabras
+    clave) a partir de la respuesta guardada; las preguntas se cruzan por
+    texto porque el detalle no guarda el id, y las que ya no existen en la
+    vacante se ignoran, como en el scoring en vivo. Los máximos son los del
+    plan para todas las filas: saltarse preguntas no sube el porcentaje.
+    """
+    por_texto = {}
+    for p in plan['preguntas'].values():
+        por_texto.setdefault(p['texto'], p)
+
+    habilidades = list(plan['max_habilidades'])
+    idx_hab = {h: j for j, h in enumerate(habilidades)}
+    idx_cat = {c: j for j, c in enumerate(CATEGORIAS)}
+
+    n = len(filas)
+    cat_obtenido = np.zeros((n, len(CATEGORIAS)))
+    cat_maximo = np.tile([float(plan['max_categorias'].get(c, 0)) for c in CATEGORIAS], (n, 1))
+    hab_obtenido = np.zeros((n, len(habilidades)))
+    hab_maximo = np.tile([float(plan['max_habilidades'][h]) for h in habilidades], (n, 1))
+    ko = np.zeros(n, dtype=bool)
+    score_interview = np.full(n, np.nan)
+
+    for i, fila in enumerate(filas):
+        detalle = fila.get('respuestas_detalle') or []
+        # Sin detalle no hay con qué recalcular el KO: se conserva el guardado
+        ko[i] = not detalle and str(fila.get('veredicto') or '').startswith('DESCARTADO')
+        if fila.get('score_interview') is not None:
+            score_interview[i] = float(fila['score_interview'])
+
+        for item in detalle:
+            pregunta = por_texto.get(item.get('pregunta'))
+            if pregunta is None:
+                continue
+            puntos, falla_ko = _puntos(pregunta, str(item.get('respuesta') or '').strip())
+            ko[i] |= falla_ko
+            if not puntos:
+                continue
+
+            j = idx_cat.get(pregunta['categoria'])
+            if j is not None:
+                cat_obtenido[i, j] += puntos
+            hab_obtenido[i, idx_hab[pregunta['habilidad']]] += puntos
+
+    return {
+        "ids": [f['id'] for f in filas],
+        "habilidades": habilidades,
+        "cat_obtenido": cat_obtenido,
+        "cat_maximo": cat_maximo,
+        "hab_obtenido": hab_obtenido,
+        "hab_maximo": hab_maximo,
+        "ko": ko,
+        "score_interview": score_interview
+    }
+
+
+def _pct(obtenido, maximo):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(maximo > 0, obtenido / np.where(maximo > 0, maximo, 1) * 100, 0.0)
+
+
+def _redondear(valores, decimales=1):
+    # round() de Python (no np.round) para obtener exactamente los mismos
+    # valores que las funciones escalares de app.py
+    return np.array([round(float(x), decimales) for x in valores])
+
+
+def recalcular_scores(matrices: dict, plan: dict) -> dict:
+    """
+    Equivalente vectorizado de calcular_score_prescreening +
+    aplicar_boost_skill_stack + calcular_score_final_combinado.
+    """
+    dist = plan['dist']
+    pct_cat = _pct(matrices['cat_obtenido'], matrices['cat_maximo'])
+    score_base = np.zeros(len(matrices['ids']))
+    for j, cat in enumerate(CATEGORIAS):
+        score_base += pct_cat[:, j] * (dist.get(cat, 0) / 100)
+    score_base = _redondear(score_base)
+
+    score = score_base
+    idx_hab = {h: j for j, h in enumerate(matrices['habilidades'])}
+    criticas = [idx_hab[h] for h in plan['skill_stack'] if h in idx_hab]
+    if criticas:
+        suma = np.zeros(len(score_base))
+        n_eval = np.zeros(len(score_base))
+        for k in criticas:
+            maximo = matrices['hab_maximo'][:, k]
+            suma += _pct(matrices['hab_obtenido'][:, k], maximo)
+            n_eval += maximo > 0
+        promedio = suma / np.maximum(n_eval, 1)
+        aplica = (n_eval > 0) & (promedio >= UMBRAL_BOOST)
+        score = np.where(aplica, np.minimum(score_base * BOOST_FACTOR, 100), score_base)
+
+    fases = plan['fases']
+    peso_pre = fases.get('pre_screening', {}).get('peso', 70) / 100
+    peso_ent = fases.get('entrevista', {}).get('peso', 30) / 100
+    combinado = _redondear(score * peso_pre + matrices['score_interview'] * peso_ent)
+
+    return {"score": score, "combinado": combinado, "ko": matrices['ko']}
+
+
+def _veredicto(score: float, ko: bool):
+    if ko:
+        return "DESCARTADO (KO)", "🔴"
+    if score >= 75:
+        return "RECOMENDADO", "🟢"
+    if score >= 40:
+        return "REVISAR", "🟡"
+    return "NO APTO", "🔴"
+
+
+def recalcular_vacante(vacante: dict, plan: dict) -> int:
+    """
+    Recalcula score, veredicto y score_final_combinado de todos los
+    candidatos de la vacante y los escribe por lotes con un UPDATE por id
+    (repositorio.actualizar_entrevistas_lote).
+
+    Retorna el número de entrevistas actualizadas.
+    """
+    filas = repositorio.entrevistas_vacante(vacante['id'], COLUMNAS_RESCORING)
+    if not filas:
+        return 0
+
+    matrices = cargar_matrices(filas, plan)
+    resultado = recalcular_scores(matrices, plan)
+
+    actualizaciones = []
+    for i, fila in enumerate(filas):
+        score = float(resultado['score'][i])
+        veredicto, tag = _veredicto(score, bool(resultado['ko'][i]))
+        combinado = resultado['combinado'][i]
+        actualizaciones.append({
+            "id": fila['id'],
+            "score": score,
+            "veredicto": veredicto,
+            "tag": tag,
+            "score_final_combinado": None if np.isnan(combinado) else float(combinado)
+        })
+
+    for inicio in range(0, len(actualizaciones), TAMANO_LOTE_ESCRITURA):
+        repositorio.actualizar_entrevistas_lote(actualizaciones[inicio:inicio + TAMANO_LOTE_ESCRITURA])
+
+    logger.info(f"♻️ Re-scoring vacante {vacante['id']}: {len(actualizaciones)} candidatos actualizados")
+    return len(actualizaciones)
@@ -0,0 +1,76 @@
+"""
+core/cache.py
+Caché en memoria acotada (LRU) con expiración por TTL, segura entre hilos
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+_FALTA = object()
+
+
+class CacheTTL:
+    """
+    Guarda hasta `max_items` entradas durante `ttl` segundos cada una.
+    Al superar el tamaño se descarta la menos usada recientemente.
+    """
+
+    def __init__(self, max_items: int = 1024, ttl: float = 300):
+        self.max_items = max_items
+        self.ttl = ttl
+        self._datos = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, clave, default=None):
+        ahora = time.monotonic()
+        with self._lock:
+            entrada = self._datos.get(clave, _FALTA)
+            if entrada is not _FALTA:
+                expira, valor = entrada
+                if expira > ahora:
+                    self._datos.move_to_end(clave)
+                    self.hits += 1
+                    return valor
+                del self._datos[clave]
+            self.misses += 1
+            return default
+
+    def set(self, clave, valor, ttl: float = None):
+        """Guarda el valor; `ttl` reemplaza el de la caché solo para esta entrada."""
+        with self._lock:
+            self._datos[clave] = (time.monotonic() + (self.ttl if ttl is None else ttl), valor)
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self.max_items:
+                self._datos.popitem(last=False)
+
+    def add(self, clave, valor=True) -> bool:
+        """Guarda la clave solo si no existe (o expiró). Retorna True si la agregó."""
+        ahora = time.monotonic()
+        with self._lock:
+            entrada = self._datos.get(clave)
+            if entrada is not None and entrada[0] > ahora:
+                self.hits += 1
+                return False
+            self.misses += 1
+            self._datos[clave] = (ahora + self.ttl, valor)
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self.max_items:
+                self._datos.popitem(last=False)
+            return True
+
+    def invalidar(self, clave):
+        """Descarta la clave y retorna el valor que tenía (o None)."""
+        with self._lock:
+            entrada = self._datos.pop(clave, None)
+        return entrada[1] if entrada else None
+
+    def limpiar(self):
+        with self._lock:
+            self._datos.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"items": len(self._datos), "hits": self.hits, "misses": self.misses}
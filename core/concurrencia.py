@@ -0,0 +1,144 @@
+"""
+core/concurrencia.py
+Fan-out acotado de consultas independientes dentro de un request
+
+Uso:
+    res = en_paralelo({
+        'identidad': identidad_actual,                 # corre en el hilo del request
+        'datos':     lambda: obtener_dashboard(emp),   # corre en el pool
+    })
+    res['datos'], res.latencias['datos']
+
+La primera tarea se ejecuta en el hilo que llama (puede usar session/g); las
+demás van a un ThreadPoolExecutor compartido por el proceso y no deben tocar
+el contexto de Flask. Funciona igual con workers sync y gthread de gunicorn:
+el pool es por proceso y se recrea tras un fork.
+"""
+
+import contextvars
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+logger = logging.getLogger(__name__)
+
+MAX_HILOS = int(os.getenv('FANOUT_MAX_HILOS', '8'))
+TIMEOUT_FANOUT = float(os.getenv('FANOUT_TIMEOUT', '10'))
+
+_pool = None
+_pid = None
+_lock = threading.Lock()
+_local = threading.local()
+
+
+class TiempoAgotado(TimeoutError):
+    """Alguna tarea del fan-out no terminó dentro del timeout."""
+
+
+class Resultados(dict):
+    """Resultados por nombre de tarea; `latencias` guarda los ms de cada una."""
+
+    def __init__(self):
+        super().__init__()
+        self.latencias = {}
+
+
+def _get_pool() -> ThreadPoolExecutor:
+    global _pool, _pid
+    pid = os.getpid()
+    if _pool is not None and _pid == pid:
+        return _pool
+    with _lock:
+        if _pool is None or _pid != pid:
+            _pool = ThreadPoolExecutor(max_workers=MAX_HILOS, thread_name_prefix='fanout')
+            _pid = pid
+    return _pool
+
+
+def _descartar_tras_fork():
+    # Los hilos del padre no existen en el hijo: se crea un pool nuevo al primer uso
+    global _pool, _pid, _lock
+    _pool = None
+    _pid = None
+    _lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_descartar_tras_fork)
+
+
+def _medir(nombre, fn, latencias):
+    inicio = time.perf_counter()
+    try:
+        return fn()
+    finally:
+        latencias[nombre] = round((time.perf_counter() - inicio) * 1000, 1)
+
+
+def _en_pool(nombre, fn, latencias):
+    # Marca el hilo para que un en_paralelo anidado no espere a su propio pool
+    _local.dentro = True
+    try:
+        return _medir(nombre, fn, latencias)
+    finally:
+        _local.dentro = False
+
+
+def en_paralelo(tareas: dict, timeout: float = TIMEOUT_FANOUT) -> Resultados:
+    """
+    Ejecuta {nombre: callable} en paralelo y retorna sus resultados por nombre.
+    Si alguna tarea falla se relanza su excepción (la primera en el orden de
+    `tareas`) solo después de que terminaron todas, para que ninguna siga
+    corriendo cuando la ruta maneja el error; las demás fallas van al log.
+    Si no terminan en `timeout` segundos se lanza TiempoAgotado.
+    """
+    resultados = Resultados()
+    items = list(tareas.items())
+    if not items:
+        return resultados
+
+    # Dentro del pool (fan-out anidado) o con una sola tarea no hay nada que repartir
+    if getattr(_local, 'dentro', False) or len(items) == 1:
+        for nombre, fn in items:
+            resultados[nombre] = _medir(nombre, fn, resultados.latencias)
+        return resultados
+
+    limite = time.monotonic() + timeout
+    pool = _get_pool()
+    # Cada tarea corre en una copia del contexto del request (p. ej. el perfil de consultas)
+    futuros = {nombre: pool.submit(contextvars.copy_context().run, _en_pool, nombre, fn, resultados.latencias)
+               for nombre, fn in items[1:]}
+
+    primero, fn_primero = items[0]
+    errores = {}
+    try:
+        resultados[primero] = _medir(primero, fn_primero, resultados.latencias)
+    except Exception as e:
+        errores[primero] = e
+
+    # Se espera a todas aunque la primera haya fallado
+    _, pendientes = wait(futuros.values(), timeout=max(0.0, limite - time.monotonic()))
+    for nombre, futuro in futuros.items():
+        if futuro not in pendientes and futuro.exception() is not None:
+            errores[nombre] = futuro.exception()
+
+    if pendientes:
+        for f in pendientes:
+            f.cancel()
+        lentas = [n for n, f in futuros.items() if f in pendientes]
+        logger.warning(f"⏱️ Fan-out: sin respuesta tras {timeout}s en {', '.join(lentas)}")
+        if not errores:
+            raise TiempoAgotado(f"Consultas sin respuesta tras {timeout}s: {', '.join(lentas)}")
+
+    if errores:
+        error = next(iter(errores.values()))
+        for otro, e in list(errores.items())[1:]:
+            logger.warning(f"⚠️ Fan-out: '{otro}' también falló: {e}")
+        raise error
+    for nombre, futuro in futuros.items():
+        resultados[nombre] = futuro.result()
+
+    logger.debug(f"🔀 Fan-out {resultados.latencias}")
+    return resultados
@@ -1,15 +1,117 @@
+from collections import deque
+from functools import lru_cache
+
+from config.keywords import KEYWORDS_TRANSCRIPCION
+from core.text_cleaner import clean_text
+
+
+@lru_cache(maxsize=1024)
+def compilar_automata(keywords: tuple, inicio_palabra: bool = False):
+    """
+    Construye un autómata Aho-Corasick para el conjunto de palabras clave.
+    Las palabras se normalizan igual que el texto (core.text_cleaner), y el
+    resultado queda cacheado por conjunto de palabras.
+
+    Con inicio_palabra=True cada patrón solo coincide al comienzo de una
+    palabra del texto (coincidencia por prefijo: "venta" cuenta "ventas").
+    """
+    patrones = []
+    for word in dict.fromkeys(keywords):
+        patron = clean_text(word)
+        if patron:
+            patrones.append((word, ' ' + patron if inicio_palabra else patron))
+
+    goto = [{}]
+    salida = [[]]
+    for idx, (_, patron) in enumerate(patrones):
+        estado = 0
+        for ch in patron:
+            siguiente = goto[estado].get(ch)
+            if siguiente is None:
+                siguiente = len(goto)
+                goto[estado][ch] = siguiente
+                goto.append({})
+                salida.append([])
+            estado = siguiente
+        salida[estado].append(idx)
+
+    # Resolver los enlaces de fallo en una tabla de transiciones completa (DFA):
+    # el recorrido del texto queda en una sola búsqueda de diccionario por carácter
+    fallo = [0] * len(goto)
+    transiciones = [dict(goto[0])] + [None] * (len(goto) - 1)
+    cola = deque(goto[0].values())
+    while cola:
+        estado = cola.popleft()
+        transiciones[estado] = {**transiciones[fallo[estado]], **goto[estado]}
+        for ch, siguiente in goto[estado].items():
+            cola.append(siguiente)
+            fallo[siguiente] = transiciones[fallo[estado]].get(ch, 0)
+            salida[siguiente] = salida[siguiente] + salida[fallo[siguiente]]
+
+    return patrones, transiciones, salida
+
+
 # Asegúrate de que el nombre sea 'count_keywords' (en plural)
-def count_keywords(text: str):
-    keywords = [
-        "simetri", "estabilidad", "megas", "latencia", 
-        "cobertura", "navegar", "instalacion", "beneficio",
-        "fibra", "velocidad", "promocion"
-    ]
-    
-    results = {}
-    
-    for word in keywords:
-        count = text.count(word)
-        results[word] = count
-        
-    return results
\ No newline at end of file
+def count_keywords(text: str, keywords=None, inicio_palabra: bool = False):
+    """
+    Cuenta todas las palabras clave en una sola pasada sobre el texto.
+    Mismo resultado que text.count(word) por palabra (ocurrencias sin solapar).
+    `text` debe venir normalizado con core.text_cleaner.clean_text.
+    """
+    keywords = tuple(keywords) if keywords is not None else KEYWORDS_TRANSCRIPCION
+    patrones, transiciones, salida = compilar_automata(keywords, inicio_palabra)
+    if inicio_palabra:
+        text = ' ' + text
+
+    conteos = [0] * len(patrones)
+    fin_ultimo = [0] * len(patrones)
+    longitudes = [len(p) for _, p in patrones]
+
+    estado = 0
+    for i, ch in enumerate(text, 1):
+        estado = transiciones[estado].get(ch, 0)
+        if salida[estado]:
+            for idx in salida[estado]:
+                # Igual que str.count: solo ocurrencias que no se solapan con la anterior
+                if i - longitudes[idx] >= fin_ultimo[idx]:
+                    conteos[idx] += 1
+                    fin_ultimo[idx] = i
+
+    results = dict.fromkeys(keywords, 0)
+    for (word, _), count in zip(patrones, conteos):
+        results[word] += count
+    return results
+
+
+def _raiz(palabra: str) -> str:
+    # Stemming mínimo de plurales en español: "clientes" -> "client", "metas" -> "meta"
+    if len(palabra) > 5 and palabra.endswith('es'):
+        return palabra[:-2]
+    if len(palabra) > 3 and palabra.endswith('s'):
+        return palabra[:-1]
+    return palabra
+
+
+def preparar_palabras_clave(palabras) -> tuple:
+    """
+    Normaliza las palabras clave de una pregunta abierta y reduce la última
+    palabra de cada una a su raíz, para compararlas por prefijo.
+    """
+    preparadas = []
+    for palabra in palabras or []:
+        partes = clean_text(str(palabra)).split()
+        if partes:
+            partes[-1] = _raiz(partes[-1])
+            preparadas.append(' '.join(partes))
+    return tuple(dict.fromkeys(preparadas))
+
+
+def puntuar_respuesta_abierta(respuesta: str, palabras_clave: tuple) -> float:
+    """
+    Fracción (0-1) de palabras clave presentes en la respuesta.
+    `palabras_clave` debe venir de preparar_palabras_clave.
+    """
+    if not palabras_clave:
+        return 0.0
+    conteos = count_keywords(clean_text(respuesta), palabras_clave, inicio_palabra=True)
+    return sum(1 for c in conteos.values() if c) / len(conteos)
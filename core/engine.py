@@ -1,177 +1,137 @@
 from datetime import datetime
 
+_ACENTOS = str.maketrans({'á': 'a', 'é': 'e', 'í': 'i', 'ó': 'o', 'ú': 'u'})
 
+TIPOS_LOGICOS = ("si_no", "booleana", "multiple", "seleccion_multiple")
 
-def evaluar_candidato_motor_supabase(respuestas_candidato, config_preguntas):
 
-    # 1. Estructura de Dimensiones
+def limpiar_local(texto):
+    return str(texto).lower().strip().translate(_ACENTOS)
 
-    categorias = {
 
-        "Tecnica": {"puntos": 0},
+def compilar_config_preguntas(config_preguntas):
+    """
+    Precalcula una sola vez por configuración lo que no depende del candidato:
+    ideal normalizado, máximo de escala, peso relativo y textos.
+    """
+    compiladas = []
+    for config in config_preguntas:
+        tipo = config.get('tipo') or ''
+        peso = config.get('peso', 0)
+        compiladas.append({
+            "id": str(config.get('id')),
+            "tipo": tipo,
+            "es_logica": tipo in TIPOS_LOGICOS,
+            "es_escala": "escala" in tipo,
+            "max_escala": 5 if "5" in tipo else 10,
+            "ideal": limpiar_local((config.get('reglas') or {}).get('ideal', '')),
+            "factor": peso / 100,
+            "cat": config.get('categoria', 'Ajuste'),
+            "knockout": config.get('knockout') is True,
+            "texto": config.get('texto'),
+            "texto_item": config.get('texto_corto') or config.get('texto')
+        })
+    return compiladas
+
+
+def indexar_respuestas(respuestas_candidato):
+    """Índice id → valor; ante ids repetidos se conserva la primera respuesta."""
+    indice = {}
+    for r in respuestas_candidato:
+        indice.setdefault(str(r['id']), r['valor'])
+    return indice
+
+
+def _evaluar_compilado(respuestas, compiladas):
 
+    # 1. Estructura de Dimensiones
+    categorias = {
+        "Tecnica": {"puntos": 0},
         "Experiencia": {"puntos": 0},
-
         "Blandas": {"puntos": 0},
-
         "Ajuste": {"puntos": 0}
-
     }
 
-    
-
     score_total = 0
-
     fortalezas = []
-
     debilidades = []
+    detalles_ia = []
 
-    detalles_ia = [] 
-
-
-
-    def limpiar_local(texto):
-
-        t = str(texto).lower().strip()
-
-        for a, b in {'á':'a','é':'e','í':'i','ó':'o','ú':'u'}.items(): t = t.replace(a, b)
-
-        return t
-
-
-
-    for config in config_preguntas:
-
-        q_id = config.get('id')
-
-        peso = config.get('peso', 0)
-
-        tipo = config.get('tipo')
-
-        cat = config.get('categoria', 'Ajuste')
-
-        
-
-        # Buscar respuesta del candidato
-
-        rta_candidato = next((r['valor'] for r in respuestas_candidato if str(r['id']) == str(q_id)), "")
-
+    for config in compiladas:
+        rta_candidato = respuestas.get(config['id'], "")
         puntos_pregunta = 0
 
-
-
         # --- EVALUACIÓN LÓGICA (Ajustada a tu tipo "si_no") ---
+        if config['es_logica']:
+            puntos_pregunta = 100 if limpiar_local(rta_candidato) == config['ideal'] else 0
+            detalles_ia.append(f"{config['texto']}: {'✅' if puntos_pregunta == 100 else '❌'}")
 
-        if tipo in ["si_no", "booleana", "multiple", "seleccion_multiple"]:
-
-            ideal = config.get('reglas', {}).get('ideal', '')
-
-            puntos_pregunta = 100 if limpiar_local(rta_candidato) == limpiar_local(ideal) else 0
-
-            detalles_ia.append(f"{config.get('texto')}: {'✅' if puntos_pregunta == 100 else '❌'}")
-
-
-
-        elif "escala" in tipo:
-
+        elif config['es_escala']:
             try:
-
-                max_e = 5 if "5" in tipo else 10
-
+                max_e = config['max_escala']
                 puntos_pregunta = (float(rta_candidato) / max_e) * 100
-
-                detalles_ia.append(f"{config.get('texto')}: {rta_candidato}/{max_e}")
-
+                detalles_ia.append(f"{config['texto']}: {rta_candidato}/{max_e}")
             except: puntos_pregunta = 0
 
-
-
         # --- LÓGICA DE KNOCK-OUT (KO) ---
-
-        if config.get('knockout') is True and puntos_pregunta < 100:
-
+        if config['knockout'] and puntos_pregunta < 100:
             return {
-
                 "score": 0,
-
                 "score_ia": 0,
-
                 "veredicto": "DESCALIFICADO (KO)",
-
                 "fortalezas": "",
-
-                "debilidades": config.get('texto_corto') or config.get('texto'),
-
-                "analisis_ia": f"🚫 KO: No cumple con: {config.get('texto')}",
-
+                "debilidades": config['texto_item'],
+                "analisis_ia": f"🚫 KO: No cumple con: {config['texto']}",
                 "estado": "Rechazado",
-
                 "fecha": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
             }
 
-
-
         # --- SUMA POR CATEGORÍA Y TOTAL ---
+        if config['cat'] in categorias:
+            categorias[config['cat']]["puntos"] += (puntos_pregunta * config['factor'])
 
-        if cat in categorias:
-
-            categorias[cat]["puntos"] += (puntos_pregunta * (peso / 100))
-
-        
-
-        score_total += (puntos_pregunta * (peso / 100))
-
-        
+        score_total += (puntos_pregunta * config['factor'])
 
         # --- FORTALEZAS Y DEBILIDADES ---
-
-        texto_item = config.get('texto_corto') or config.get('texto')
-
         if puntos_pregunta >= 80:
-
-            if len(fortalezas) < 2: fortalezas.append(texto_item)
-
+            if len(fortalezas) < 2: fortalezas.append(config['texto_item'])
         elif puntos_pregunta <= 40:
-
-            if len(debilidades) < 2: debilidades.append(texto_item)
-
-
+            if len(debilidades) < 2: debilidades.append(config['texto_item'])
 
     # --- RECOMENDACIÓN FINAL ---
-
     if score_total >= 85: rec = "⭐ Perfil sobresaliente."
-
     elif score_total >= 60: rec = "🔍 Perfil promedio."
-
     else: rec = "🚫 No cumple mínimos."
 
-
-
     # Formatear el análisis para la columna 'analisis_ia'
-
     desglose = f"T:{round(categorias['Tecnica']['puntos'],1)}% E:{round(categorias['Experiencia']['puntos'],1)}% B:{round(categorias['Blandas']['puntos'],1)}% A:{round(categorias['Ajuste']['puntos'],1)}%"
-
     analisis_final = f"{rec} | {desglose} | " + " | ".join(detalles_ia)
 
-
-
     return {
-
         "score": round(score_total, 2),
-
         "score_ia": round(score_total, 2),
-
         "veredicto": "APROBADO" if score_total >= 70 else "RECHAZADO",
-
         "fortalezas": ", ".join(fortalezas),
-
         "debilidades": ", ".join(debilidades),
-
         "analisis_ia": analisis_final,
-
         "fecha": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-
         "estado": "Evaluado"
+    }
 
-    }
\ No newline at end of file
+
+def evaluar_candidato_motor_supabase(respuestas_candidato, config_preguntas):
+    return _evaluar_compilado(
+        indexar_respuestas(respuestas_candidato),
+        compilar_config_preguntas(config_preguntas)
+    )
+
+
+def evaluar_candidatos_motor_supabase(candidatos, config_preguntas):
+    """
+    Evalúa en lote muchos candidatos contra la misma configuración.
+    `candidatos` es un iterable de listas de respuestas [{'id', 'valor'}, ...];
+    los resultados se generan uno a uno (memoria constante).
+    """
+    compiladas = compilar_config_preguntas(config_preguntas)
+    for respuestas_candidato in candidatos:
+        yield _evaluar_compilado(indexar_respuestas(respuestas_candidato), compiladas)
@@ -0,0 +1,60 @@
+"""
+core/estadisticas.py
+Rebuild y verificación del rollup estadisticas_entrevistas (sql/004)
+
+Uso:
+    python -m core.estadisticas verificar [empresa_id]
+    python -m core.estadisticas reconstruir [empresa_id]
+"""
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def reconstruir_estadisticas(supabase, empresa_id=None) -> int:
+    """Recalcula el rollup desde entrevistas (una empresa o todas). Retorna las filas generadas."""
+    res = supabase.rpc('reconstruir_estadisticas', {'p_empresa_id': empresa_id}).execute()
+    filas = res.data or 0
+    logger.info(f"♻️ Estadísticas reconstruidas: {filas} filas ({empresa_id or 'todas las empresas'})")
+    return filas
+
+
+def verificar_estadisticas(supabase, empresa_id=None) -> list:
+    """
+    Compara el rollup contra entrevistas. Retorna las diferencias encontradas
+    (lista vacía si es consistente); cada una trae 'calculado' y 'rollup'.
+    """
+    res = supabase.rpc('verificar_estadisticas', {'p_empresa_id': empresa_id}).execute()
+    diferencias = res.data or []
+    if diferencias:
+        logger.warning(f"⚠️ Estadísticas desviadas en {len(diferencias)} grupos ({empresa_id or 'todas las empresas'})")
+    else:
+        logger.info(f"✅ Estadísticas consistentes ({empresa_id or 'todas las empresas'})")
+    return diferencias
+
+
+if __name__ == "__main__":
+    import json
+    import sys
+    from dotenv import load_dotenv
+    from storage.supabase_client import get_supabase
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    load_dotenv()
+
+    if len(sys.argv) < 2 or sys.argv[1] not in ('verificar', 'reconstruir'):
+        logger.error(f"❌ Comando inválido: {' '.join(sys.argv[1:]) or '(ninguno)'}{__doc__}")
+        sys.exit(2)
+
+    comando = sys.argv[1]
+    empresa = sys.argv[2] if len(sys.argv) > 2 else None
+
+    if comando == 'reconstruir':
+        reconstruir_estadisticas(get_supabase(), empresa)
+    else:
+        diferencias = verificar_estadisticas(get_supabase(), empresa)
+        # Salida del comando: una diferencia JSON por línea en stdout (el resto va al log)
+        for d in diferencias:
+            print(json.dumps(d, ensure_ascii=False, default=str))
+        sys.exit(1 if diferencias else 0)
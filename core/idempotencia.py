@@ -0,0 +1,50 @@
+"""
+core/idempotencia.py
+Claves de idempotencia para postulaciones repetidas (doble clic, refresh)
+"""
+
+import hashlib
+import json
+import uuid
+
+from core.cache import CacheTTL
+
+# Ventana en la que un reenvío idéntico se considera duplicado
+TTL_ENVIOS = 600
+MAX_ENVIOS_RECIENTES = 10000
+
+_NAMESPACE = uuid.UUID('6f1c1f8e-3a51-4f55-9d0a-2c1b5e0d7a41')
+
+_recientes = CacheTTL(max_items=MAX_ENVIOS_RECIENTES, ttl=TTL_ENVIOS)
+
+
+def clave_envio(id_publico: str, cc: str, preguntas: list, respuestas: list, token: str = None) -> str:
+    """
+    Clave estable de una postulación. Si el formulario trae token_envio se usa
+    ese token; si no, el contenido (vacante, documento y respuestas).
+    """
+    if token:
+        base = ["token", id_publico, cc.strip(), token]
+    else:
+        base = ["contenido", id_publico, cc.strip(), list(preguntas), list(respuestas)]
+    datos = json.dumps(base, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(datos.encode('utf-8')).hexdigest()
+
+
+def entrevista_id_de(clave: str) -> str:
+    """Id de entrevista determinístico: el mismo envío siempre produce la misma fila."""
+    return str(uuid.uuid5(_NAMESPACE, clave))
+
+
+def registrar(clave: str) -> bool:
+    """Marca la clave como recibida. Retorna False si ya se había recibido hace poco."""
+    return _recientes.add(clave)
+
+
+def olvidar(clave: str):
+    """Libera la clave (p. ej. si no se pudo encolar) para aceptar el reintento."""
+    _recientes.invalidar(clave)
+
+
+def stats() -> dict:
+    return _recientes.stats()
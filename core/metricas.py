@@ -0,0 +1,208 @@
+"""
+core/metricas.py
+Métricas en memoria del proceso (contadores, gauges e histogramas) en formato de texto de Prometheus
+
+Cada observación es un dict lookup y una suma bajo el lock de la métrica,
+así que se puede dejar activo en todos los workers. Los valores son por
+proceso: con varios workers de gunicorn cada uno expone los suyos (el
+scrape cae en cualquiera), por eso conviene scrapear cada worker o correr
+uno solo con hilos.
+
+Las etiquetas deben tener cardinalidad acotada: regla de la ruta (no la
+URL), tabla, operación, etapa. Nunca ids.
+"""
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+BUCKETS_DEFAULT = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_registro = []
+_recolectores = []
+_caches = {}
+
+
+def _escapar(valor) -> str:
+    return str(valor).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _etiquetas(nombres, valores, extra='') -> str:
+    pares = [f'{n}="{_escapar(v)}"' for n, v in zip(nombres, valores)]
+    if extra:
+        pares.append(extra)
+    return '{' + ','.join(pares) + '}' if pares else ''
+
+
+def _numero(valor) -> str:
+    if valor == float('inf'):
+        return '+Inf'
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+
+class _Metrica:
+    tipo = None
+
+    def __init__(self, nombre, ayuda, etiquetas=()):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = tuple(etiquetas)
+        self._valores = {}
+        self._lock = threading.Lock()
+        _registro.append(self)
+
+    def _clave(self, etiquetas: dict) -> tuple:
+        return tuple(etiquetas.get(n, '') for n in self.etiquetas)
+
+    def exponer(self) -> list:
+        lineas = [f'# HELP {self.nombre} {self.ayuda}', f'# TYPE {self.nombre} {self.tipo}']
+        with self._lock:
+            items = sorted(self._valores.items())
+        for clave, valor in items:
+            lineas.append(f'{self.nombre}{_etiquetas(self.etiquetas, clave)} {_numero(valor)}')
+        return lineas
+
+
+class Contador(_Metrica):
+    tipo = 'counter'
+
+    def inc(self, cantidad=1, **etiquetas):
+        clave = self._clave(etiquetas)
+        with self._lock:
+            self._valores[clave] = self._valores.get(clave, 0) + cantidad
+
+
+class Gauge(_Metrica):
+    tipo = 'gauge'
+
+    def inc(self, cantidad=1, **etiquetas):
+        clave = self._clave(etiquetas)
+        with self._lock:
+            self._valores[clave] = self._valores.get(clave, 0) + cantidad
+
+    def dec(self, cantidad=1, **etiquetas):
+        self.inc(-cantidad, **etiquetas)
+
+    def set(self, valor, **etiquetas):
+        with self._lock:
+            self._valores[self._clave(etiquetas)] = valor
+
+
+class Histograma(_Metrica):
+    tipo = 'histogram'
+
+    def __init__(self, nombre, ayuda, etiquetas=(), buckets=BUCKETS_DEFAULT):
+        super().__init__(nombre, ayuda, etiquetas)
+        self.buckets = tuple(sorted(buckets))
+
+    def observar(self, valor, **etiquetas):
+        clave = self._clave(etiquetas)
+        i = bisect.bisect_left(self.buckets, valor)
+        with self._lock:
+            serie = self._valores.get(clave)
+            if serie is None:
+                # [conteo por bucket (no acumulado)..., +Inf, suma]
+                serie = self._valores[clave] = [0] * (len(self.buckets) + 1) + [0.0]
+            serie[i] += 1
+            serie[-1] += valor
+
+    @contextmanager
+    def cronometro(self, **etiquetas):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observar(time.perf_counter() - inicio, **etiquetas)
+
+    def tramos(self, etiqueta: str) -> '_Tramos':
+        """Para medir etapas consecutivas sin reindentar: t = h.tramos('etapa'); ...; t.marcar('a')"""
+        return _Tramos(self, etiqueta)
+
+    def exponer(self) -> list:
+        lineas = [f'# HELP {self.nombre} {self.ayuda}', f'# TYPE {self.nombre} {self.tipo}']
+        with self._lock:
+            items = sorted((clave, list(serie)) for clave, serie in self._valores.items())
+        for clave, serie in items:
+            acumulado = 0
+            for limite, conteo in zip(self.buckets + (float('inf'),), serie[:-1]):
+                acumulado += conteo
+                le = f'le="{_numero(limite)}"'
+                lineas.append(f'{self.nombre}_bucket{_etiquetas(self.etiquetas, clave, le)} {acumulado}')
+            etiquetas = _etiquetas(self.etiquetas, clave)
+            lineas.append(f'{self.nombre}_sum{etiquetas} {_numero(serie[-1])}')
+            lineas.append(f'{self.nombre}_count{etiquetas} {acumulado}')
+        return lineas
+
+
+class _Tramos:
+    """Observa en el histograma el tiempo transcurrido desde la marca anterior."""
+
+    def __init__(self, histograma, etiqueta):
+        self._histograma = histograma
+        self._etiqueta = etiqueta
+        self._desde = time.perf_counter()
+
+    def marcar(self, valor):
+        ahora = time.perf_counter()
+        self._histograma.observar(ahora - self._desde, **{self._etiqueta: valor})
+        self._desde = ahora
+
+
+def registrar_recolector(funcion):
+    """`funcion()` se llama en cada scrape y retorna líneas ya formateadas (p. ej. stats de cachés)."""
+    _recolectores.append(funcion)
+
+
+def registrar_cache(nombre: str, stats):
+    """Expone hits, misses, items y tasa de aciertos de una CacheTTL a partir de su stats()."""
+    _caches[nombre] = stats
+
+
+def _recolectar_caches() -> list:
+    series = {'cache_aciertos_total': [], 'cache_fallos_total': [], 'cache_items': [], 'cache_tasa_aciertos': []}
+    for nombre, stats in sorted(_caches.items()):
+        s = stats()
+        consultas = s['hits'] + s['misses']
+        etiqueta = _etiquetas(('cache',), (nombre,))
+        series['cache_aciertos_total'].append(f'cache_aciertos_total{etiqueta} {s["hits"]}')
+        series['cache_fallos_total'].append(f'cache_fallos_total{etiqueta} {s["misses"]}')
+        series['cache_items'].append(f'cache_items{etiqueta} {s["items"]}')
+        series['cache_tasa_aciertos'].append(
+            f'cache_tasa_aciertos{etiqueta} {_numero(round(s["hits"] / consultas, 4) if consultas else 0.0)}')
+    tipos = {'cache_aciertos_total': 'counter', 'cache_fallos_total': 'counter',
+             'cache_items': 'gauge', 'cache_tasa_aciertos': 'gauge'}
+    lineas = []
+    for nombre, filas in series.items():
+        if filas:
+            lineas += [f'# HELP {nombre} Cachés en memoria del proceso', f'# TYPE {nombre} {tipos[nombre]}'] + filas
+    return lineas
+
+
+registrar_recolector(_recolectar_caches)
+
+
+def exponer() -> str:
+    """Todas las métricas del proceso en formato de texto de Prometheus 0.0.4."""
+    lineas = []
+    for metrica in _registro:
+        lineas += metrica.exponer()
+    for recolector in _recolectores:
+        lineas += recolector()
+    return '\n'.join(lineas) + '\n'
+
+
+# ── Métricas de la app ───────────────────────────────────────
+http_duracion = Histograma('http_request_duracion_segundos', 'Duración de los requests por ruta',
+                           ('ruta', 'metodo', 'status'))
+http_en_curso = Gauge('http_requests_en_curso', 'Requests en curso por ruta', ('ruta',))
+
+supabase_duracion = Histograma('supabase_request_duracion_segundos',
+                               'Latencia de Supabase hasta los headers de respuesta, por tabla y operación',
+                               ('tabla', 'operacion'))
+supabase_errores = Contador('supabase_errores_total', 'Respuestas 4xx/5xx y fallas de red de Supabase',
+                            ('tabla', 'operacion', 'tipo'))
+
+scoring_etapa = Histograma('scoring_etapa_duracion_segundos', 'Duración de cada etapa de evaluar_envio',
+                           ('etapa',), buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5))
+envios_procesados = Contador('pipeline_envios_total', 'Envíos de la cola procesados por resultado', ('resultado',))
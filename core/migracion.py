@@ -0,0 +1,60 @@
+"""
+core/migracion.py
+Compatibilidad y migración de entrevistas.analisis_ia (texto JSON -> jsonb)
+"""
+
+import json
+import logging
+from functools import lru_cache
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=4096)
+def _parsear_analisis(texto: str):
+    try:
+        valor = json.loads(texto)
+    except (TypeError, ValueError):
+        valor = None
+    # Texto libre heredado (no JSON): se conserva como resumen, igual que migrar_analisis_ia_lote
+    if valor is None or isinstance(valor, str):
+        return {'resumen': texto}
+    return valor if isinstance(valor, dict) else None
+
+
+def leer_analisis_ia(valor):
+    """
+    Retorna analisis_ia como dict, venga como jsonb (dict), como el string
+    JSON heredado o como texto libre ({'resumen': texto}, la misma forma que
+    deja sql/001). Cada string distinto se parsea una sola vez por proceso;
+    el dict retornado es compartido, no modificarlo.
+    """
+    if valor is None or isinstance(valor, dict):
+        return valor
+    if isinstance(valor, str):
+        return _parsear_analisis(valor)
+    return None
+
+
+def migrar_analisis_ia(supabase, lote: int = 500) -> int:
+    """
+    Backfill por lotes de las filas que aún guardan analisis_ia como string.
+    Requiere sql/001_analisis_ia_jsonb.sql aplicado en la base de datos.
+    """
+    total = 0
+    while True:
+        res = supabase.rpc('migrar_analisis_ia_lote', {'p_limite': lote}).execute()
+        convertidas = res.data or 0
+        total += convertidas
+        logger.info(f"♻️ analisis_ia: {convertidas} filas convertidas (total {total})")
+        if convertidas == 0:
+            return total
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+    from storage.supabase_client import get_supabase
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    load_dotenv()
+    print(f"✅ Migración completada: {migrar_analisis_ia(get_supabase())} filas")
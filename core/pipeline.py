@@ -0,0 +1,101 @@
+"""
+core/pipeline.py
+Pool de workers en segundo plano que procesa la cola de envíos
+"""
+
+import logging
+import os
+import threading
+
+import storage.cola_envios as cola
+from core import metricas
+
+logger = logging.getLogger(__name__)
+
+NUM_WORKERS = int(os.getenv('PIPELINE_WORKERS', '2'))
+MAX_INTENTOS = 5
+ESPERA_BASE = 2          # segundos; se duplica en cada reintento
+ESPERA_SIN_TRABAJO = 1   # segundos entre sondeos de la cola vacía
+
+_handler = None
+_despertar = threading.Event()
+_lock = threading.Lock()
+_pid_workers = None
+
+
+class ErrorPermanente(Exception):
+    """El envío no se puede procesar nunca (p. ej. vacante inexistente): no reintentar."""
+
+
+def _procesar_uno() -> bool:
+    trabajo = cola.tomar_siguiente(MAX_INTENTOS)
+    if trabajo is None:
+        return False
+
+    envio_id, payload, intentos = trabajo
+    try:
+        _handler(payload)
+        cola.marcar_hecho(envio_id)
+        metricas.envios_procesados.inc(resultado='ok')
+    except ErrorPermanente as e:
+        logger.error(f"❌ Envío {envio_id} descartado: {e}")
+        cola.marcar_fallido(envio_id, str(e))
+        metricas.envios_procesados.inc(resultado='descartado')
+    except Exception as e:
+        if intentos + 1 >= MAX_INTENTOS:
+            logger.error(f"❌ Envío {envio_id} falló {MAX_INTENTOS} veces: {e}")
+            cola.marcar_fallido(envio_id, str(e))
+            metricas.envios_procesados.inc(resultado='fallido')
+        else:
+            espera = ESPERA_BASE * (2 ** intentos)
+            logger.warning(f"⚠️ Envío {envio_id} falló (intento {intentos + 1}), reintento en {espera}s: {e}")
+            cola.reprogramar(envio_id, str(e), espera)
+            metricas.envios_procesados.inc(resultado='reintento')
+    return True
+
+
+def _loop():
+    while True:
+        try:
+            if _procesar_uno():
+                continue
+        except Exception as e:
+            logger.error(f"💥 Error en worker de pipeline: {e}")
+        _despertar.wait(ESPERA_SIN_TRABAJO)
+        _despertar.clear()
+
+
+def iniciar(handler, num_workers: int = NUM_WORKERS):
+    """
+    Arranca los workers de este proceso (una sola vez por PID, así que es
+    seguro llamarlo antes y después del fork de gunicorn).
+    """
+    global _handler, _pid_workers
+    with _lock:
+        _handler = handler
+        if _pid_workers == os.getpid():
+            return
+        _pid_workers = os.getpid()
+        for i in range(num_workers):
+            threading.Thread(target=_loop, name=f"pipeline-{i}", daemon=True).start()
+        logger.info(f"✅ Pipeline de envíos: {num_workers} workers (pid {_pid_workers})")
+
+
+def asegurar_workers(handler):
+    """Arranca los workers si este proceso todavía no los tiene (solo compara el PID)."""
+    if _pid_workers != os.getpid():
+        iniciar(handler)
+
+
+def enviar(payload: dict, envio_id: str = None) -> bool:
+    """
+    Persiste el envío en la cola durable y despierta a los workers.
+    Retorna False si ese envio_id ya estaba en la cola (duplicado).
+    """
+    nuevo = cola.encolar(payload, envio_id)
+    if not nuevo:
+        return False
+    if _handler is not None:
+        asegurar_workers(_handler)
+    _despertar.set()
+    return True
@@ -0,0 +1,140 @@
+"""
+core/scoring_plan.py
+Plan de scoring compilado por vacante (índice de preguntas, máximos y KO)
+"""
+
+import threading
+from collections import OrderedDict
+
+from core.counters import compilar_automata, preparar_palabras_clave
+
+CATEGORIAS = ("Técnica", "Experiencia", "Blandas", "Ajuste")
+TIPOS_CERRADOS = ("si_no", "multiple", "escala_1_5", "escala_1_10")
+
+DISTRIBUCION_DEFAULT = {"Técnica": 40, "Experiencia": 20, "Blandas": 30, "Ajuste": 10}
+FASES_DEFAULT = {
+    "pre_screening": {"peso": 70, "activo": True},
+    "entrevista": {"peso": 30, "activo": True}
+}
+
+MAX_PLANES_EN_CACHE = 256
+
+_planes = OrderedDict()
+_lock = threading.Lock()
+
+
+def _preguntas_de(vacante: dict) -> list:
+    preguntas = vacante.get('preguntas') or []
+    if isinstance(preguntas, dict) and 'preguntas' in preguntas:
+        preguntas = preguntas['preguntas']
+    return preguntas
+
+
+def compilar_plan(vacante: dict) -> dict:
+    """
+    Compila la vacante en un plan de scoring listo para evaluar respuestas.
+
+    El plan contiene:
+    - preguntas: índice id → pregunta con el ideal ya normalizado y, en las
+      abiertas, las palabras clave preparadas (autómata ya compilado)
+    - max_categorias / max_habilidades: puntos máximos posibles
+    - knockout: ids de preguntas KO
+    - skill_stack / dist / fases: configuración del modelo
+    """
+    config = vacante.get('configuracion_modelo') or {}
+    skill_stack = vacante.get('skill_stack') or []
+    criticas = frozenset(skill_stack)
+
+    preguntas = {}
+    max_categorias = dict.fromkeys(CATEGORIAS, 0)
+    max_habilidades = {}
+    knockout = set()
+
+    for p in _preguntas_de(vacante):
+        q_id = p.get('id')
+        if q_id is None or q_id in preguntas:
+            continue
+
+        tipo = p.get('tipo')
+        peso = float(p.get('peso', 0))
+        reglas = p.get('reglas') or {}
+        categoria = p.get('categoria', 'Ajuste')
+        habilidad = p.get('habilidad', 'General')
+        palabras_clave = ()
+        if tipo == 'abierta' and peso > 0:
+            palabras_clave = preparar_palabras_clave(reglas.get('palabras_clave'))
+            if palabras_clave:
+                compilar_automata(palabras_clave, True)
+        puntuable = tipo in TIPOS_CERRADOS or bool(palabras_clave)
+
+        max_habilidades.setdefault(habilidad, 0)
+        if puntuable:
+            if categoria in max_categorias:
+                max_categorias[categoria] += peso
+            max_habilidades[habilidad] += peso
+
+        es_ko = bool(p.get('knockout', False))
+        if es_ko:
+            knockout.add(q_id)
+
+        preguntas[q_id] = {
+            "id": q_id,
+            "texto": p.get('texto', ''),
+            "tipo": tipo,
+            "peso": peso,
+            "knockout": es_ko,
+            "ideal": str(reglas.get('ideal', '')).strip().lower(),
+            "categoria": categoria,
+            "habilidad": habilidad,
+            "es_critica": habilidad in criticas,
+            "puntuable": puntuable,
+            "palabras_clave": palabras_clave
+        }
+
+    return {
+        "vacante_id": vacante.get('id'),
+        "version": vacante.get('updated_at') or vacante.get('created_at'),
+        "cargo": vacante.get('cargo', ''),
+        "skill_stack": skill_stack,
+        "dist": config.get('distribucion_categorias') or dict(DISTRIBUCION_DEFAULT),
+        "fases": config.get('fases_evaluacion') or dict(FASES_DEFAULT),
+        "preguntas": preguntas,
+        "max_categorias": max_categorias,
+        "max_habilidades": max_habilidades,
+        "knockout": frozenset(knockout)
+    }
+
+
+def obtener_plan(vacante: dict) -> dict:
+    """
+    Retorna el plan compilado de la vacante, usando la caché del proceso.
+    La clave es (id, updated_at): editar la vacante genera un plan nuevo.
+    """
+    clave = (vacante.get('id'), vacante.get('updated_at') or vacante.get('created_at'))
+    if clave[0] is None:
+        return compilar_plan(vacante)
+
+    with _lock:
+        plan = _planes.get(clave)
+        if plan is not None:
+            _planes.move_to_end(clave)
+            return plan
+
+    plan = compilar_plan(vacante)
+
+    with _lock:
+        _planes[clave] = plan
+        _planes.move_to_end(clave)
+        while len(_planes) > MAX_PLANES_EN_CACHE:
+            _planes.popitem(last=False)
+    return plan
+
+
+def invalidar_plan(vacante_id=None):
+    """Descarta los planes de una vacante (o todos si no se indica id)."""
+    with _lock:
+        if vacante_id is None:
+            _planes.clear()
+            return
+        for clave in [k for k in _planes if k[0] == vacante_id]:
+            del _planes[clave]
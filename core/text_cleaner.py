@@ -1,20 +1,64 @@
 import re
 import unicodedata
+from functools import lru_cache
 
-def clean_text(text: str) -> str:
-    # 1. Convertir a minúsculas
-    text = text.lower()
-    
-    # 2. Eliminar acentos y tildes (normalización)
-    text = ''.join(
-        c for c in unicodedata.normalize('NFD', text)
-        if unicodedata.category(c) != 'Mn'
+_NO_LETRA = re.compile(r'[^a-z\s]')
+
+
+def _limpiar_caracter(c: str) -> str:
+    # Los mismos pasos de siempre (minúsculas, quitar tildes, dejar solo
+    # letras y espacios) aplicados a un único carácter
+    texto = ''.join(
+        d for d in unicodedata.normalize('NFD', c.lower())
+        if unicodedata.category(d) != 'Mn'
     )
-    
-    # 3. Eliminar caracteres especiales y números (opcional, dejamos solo letras y espacios)
-    text = re.sub(r'[^a-z\s]', '', text)
-    
+    texto = _NO_LETRA.sub('', texto)
+    # Cualquier espacio Unicode (\xa0,  ...) termina siendo un separador
+    return ''.join(' ' if d.isspace() else d for d in texto)
+
+
+# Lo que no esté precalculado (CJK, emojis, ...) pasa por esta caché acotada:
+# la entrada de los candidatos es pública y no debe poder inflar la tabla
+@lru_cache(maxsize=4096)
+def _limpiar_codigo(codigo: int) -> str:
+    return _limpiar_caracter(chr(codigo))
+
+
+class _TablaLimpieza(dict):
+    """
+    Tabla para str.translate. El resultado por carácter no depende de sus
+    vecinos (solo sobreviven a-z y espacios), así que traducir carácter a
+    carácter equivale a la normalización completa. Los rangos latinos y la
+    puntuación general van precalculados en el dict; el resto se resuelve con
+    _limpiar_codigo sin guardarse aquí.
+    """
+
+    def __missing__(self, codigo):
+        return _limpiar_codigo(codigo)
+
+
+_TABLA_ASCII = {codigo: _limpiar_caracter(chr(codigo)) for codigo in range(128)}
+# Misma tabla en formato bytes.translate para el camino rápido de texto ASCII
+_TABLA_BYTES = bytes(ord(_TABLA_ASCII[c]) if _TABLA_ASCII[c] else c for c in range(128)) + bytes(range(128, 256))
+_BORRAR_BYTES = bytes(c for c in range(128) if not _TABLA_ASCII[c])
+# Latin-1, Latin Extended-A/B, diacríticos combinables y puntuación general (comillas, guiones, espacios)
+_RANGOS_PRECALCULADOS = (range(128, 0x370), range(0x2000, 0x2070))
+_TABLA = _TablaLimpieza(_TABLA_ASCII)
+_TABLA.update({codigo: _limpiar_caracter(chr(codigo)) for rango in _RANGOS_PRECALCULADOS for codigo in rango})
+
+
+def clean_text(text: str) -> str:
+    # 1-3. Minúsculas, sin acentos y solo letras/espacios en una sola pasada
+    if text.isascii():
+        text = text.encode('ascii').translate(_TABLA_BYTES, _BORRAR_BYTES).decode('ascii')
+    else:
+        text = text.translate(_TABLA)
+
     # 4. Eliminar espacios extra
-    text = " ".join(text.split())
-    
-    return text
\ No newline at end of file
+    return " ".join(text.split())
+
+
+def clean_many(textos):
+    """Versión en streaming de clean_text para lotes de respuestas/transcripciones."""
+    for text in textos:
+        yield clean_text(text)
@@ -0,0 +1,439 @@
+"""
+herramientas/datos_sinteticos.py
+Generador determinista de empresas, vacantes y candidatos sintéticos a escala
+
+Produce N empresas (cada una con su usuario reclutador), M vacantes por
+empresa con preguntas como las de nueva_vacante / clonar_plantilla y K
+candidatos por vacante. Las respuestas se generan a partir de una
+"aptitud" latente por candidato y los scores, veredictos, métricas por
+categoría y entity_skill_score salen del mismo cálculo vectorizado del
+re-scoring (core/bulk_rescoring), así que son los que daría el motor.
+
+Escribe en lotes con repositorio.insertar_filas, en el backend de
+REPOSITORIO_BACKEND. Con sqlite también crea las credenciales que usa
+herramientas/supabase_local.py para el login.
+
+    python -m herramientas.datos_sinteticos empresa_grande         # 1 empresa, 50k candidatos
+    python -m herramientas.datos_sinteticos muchas_empresas        # 2k empresas con 100 c/u
+    python -m herramientas.datos_sinteticos --empresas 5 --vacantes 3 --candidatos 200 --semilla 7
+
+La misma semilla y la misma fecha --hasta producen exactamente los mismos datos.
+"""
+
+import argparse
+import logging
+import random
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from werkzeug.security import generate_password_hash
+
+from core.bulk_rescoring import cargar_matrices, recalcular_scores, _pct, _veredicto
+from core.counters import puntuar_respuesta_abierta
+from core.scoring_plan import CATEGORIAS, compilar_plan
+from storage.repositorio import get_repositorio
+from storage.repositorio_sqlite import RepositorioSQLite
+
+logger = logging.getLogger(__name__)
+
+ESCENARIOS = {
+    'demo': {'empresas': 3, 'vacantes': 3, 'candidatos': 40},
+    'empresa_grande': {'empresas': 1, 'vacantes': 20, 'candidatos': 2500},
+    'muchas_empresas': {'empresas': 2000, 'vacantes': 2, 'candidatos': 50},
+}
+
+PASSWORD_DEFAULT = 'sintetico123'
+LOTE_ESCRITURA = 5000
+# Orden de escritura: las FK de Postgres exigen empresas y vacantes antes que entrevistas
+ORDEN_TABLAS = ('empresas', 'usuarios_empresa', 'auth_usuarios', 'vacantes', 'entrevistas')
+
+
+def _pregunta(q_id, texto, tipo, peso, categoria, habilidad, knockout=False, **reglas):
+    # Misma forma que arma nueva_vacante
+    return {
+        "id": q_id, "texto": texto, "tipo": tipo, "peso": float(peso), "knockout": knockout,
+        "reglas": reglas, "categoria": categoria, "habilidad": habilidad,
+        "texto_corto": texto[:30] + "..."
+    }
+
+
+PLANTILLAS = [
+    {
+        'cargo': 'Auxiliar Operativo',
+        'skill_stack': ['Disponibilidad', 'Experiencia operativa'],
+        'distribucion': {"Técnica": 20, "Experiencia": 40, "Blandas": 10, "Ajuste": 30},
+        'preguntas': [
+            _pregunta("q1", "¿Vives en la ciudad de la vacante?", "si_no", 15, "Ajuste", "Disponibilidad", True, ideal="si"),
+            _pregunta("q2", "¿Tienes disponibilidad para viajar?", "si_no", 5, "Ajuste", "Disponibilidad", ideal="si"),
+            _pregunta("q3", "¿Tienes experiencia en el cargo?", "si_no", 20, "Experiencia", "Experiencia operativa", True, ideal="si"),
+            _pregunta("q4", "¿Dispones del horario requerido?", "si_no", 10, "Ajuste", "Disponibilidad", True, ideal="si"),
+            _pregunta("q5", "¿Cuántos años de experiencia tienes?", "multiple", 20, "Experiencia", "Experiencia operativa",
+                      opciones=["Menos de 1", "1 a 3", "3 a 5", "Más de 5"], ideal="3 a 5"),
+            _pregunta("q6", "Describe brevemente tu última función", "abierta", 20, "Técnica", "Logística",
+                      palabras_clave=["inventario", "despacho", "bodega", "cargue"]),
+            _pregunta("q7", "¿Cómo calificas tu trabajo en equipo?", "escala_1_5", 10, "Blandas", "Trabajo en equipo", ideal="5"),
+            _pregunta("q8", "¿Cuándo puedes iniciar?", "abierta", 0, "Ajuste", "General", palabras_clave=[]),
+        ]
+    },
+    {
+        'cargo': 'Asesor Comercial',
+        'skill_stack': ['Ventas', 'Negociación'],
+        'distribucion': {"Técnica": 40, "Experiencia": 30, "Blandas": 20, "Ajuste": 10},
+        'preguntas': [
+            _pregunta("q1", "¿Tienes experiencia previa en ventas?", "si_no", 20, "Experiencia", "Ventas", True, ideal="si"),
+            _pregunta("q2", "¿Cuentas con vehículo propio?", "si_no", 10, "Ajuste", "Movilidad", ideal="si"),
+            _pregunta("q3", "Describe tu logro comercial más relevante", "abierta", 25, "Técnica", "Negociación",
+                      palabras_clave=["meta", "cliente", "ventas", "cierre", "cuota"]),
+            _pregunta("q4", "¿Qué canal de ventas dominas?", "multiple", 15, "Técnica", "Ventas",
+                      opciones=["Retail", "Telefónico", "Campo", "Digital"], ideal="Campo"),
+            _pregunta("q5", "¿Has cumplido cuotas de ventas?", "si_no", 20, "Experiencia", "Ventas", True, ideal="si"),
+            _pregunta("q6", "¿Qué tan cómodo te sientes manejando objeciones?", "escala_1_5", 10, "Blandas", "Negociación", ideal="5"),
+            _pregunta("q7", "¿Cuándo puedes iniciar?", "abierta", 0, "Ajuste", "General", palabras_clave=[]),
+        ]
+    },
+    {
+        'cargo': 'Técnico de Campo',
+        'skill_stack': ['Electricidad', 'Seguridad industrial'],
+        'distribucion': {"Técnica": 50, "Experiencia": 20, "Blandas": 10, "Ajuste": 20},
+        'preguntas': [
+            _pregunta("q1", "¿Tienes certificación técnica vigente?", "si_no", 25, "Técnica", "Electricidad", True, ideal="si"),
+            _pregunta("q2", "¿Cuentas con herramientas propias?", "si_no", 10, "Ajuste", "Recursos propios", ideal="si"),
+            _pregunta("q3", "¿Tienes licencia de conducción?", "si_no", 15, "Ajuste", "Movilidad", True, ideal="si"),
+            _pregunta("q4", "Describe tu experiencia técnica", "abierta", 20, "Experiencia", "Electricidad",
+                      palabras_clave=["mantenimiento", "instalación", "redes", "tablero"]),
+            _pregunta("q5", "¿Disponibilidad para trabajo en alturas?", "si_no", 10, "Técnica", "Seguridad industrial", ideal="si"),
+            _pregunta("q6", "¿Qué tan a fondo conoces las normas de seguridad?", "escala_1_5", 10, "Técnica",
+                      "Seguridad industrial", ideal="5"),
+            _pregunta("q7", "¿Qué turno prefieres?", "multiple", 10, "Blandas", "Disponibilidad",
+                      opciones=["Diurno", "Nocturno", "Rotativo", "Indiferente"], ideal="Rotativo"),
+        ]
+    },
+    {
+        'cargo': 'Agente de Servicio al Cliente',
+        'skill_stack': ['Comunicación', 'Orientación al cliente'],
+        'distribucion': {"Técnica": 20, "Experiencia": 20, "Blandas": 40, "Ajuste": 20},
+        'preguntas': [
+            _pregunta("q1", "¿Tienes experiencia en call center?", "si_no", 20, "Experiencia", "Orientación al cliente", True, ideal="si"),
+            _pregunta("q2", "¿Cómo calificas tu manejo de herramientas ofimáticas?", "escala_1_5", 10, "Técnica", "Ofimática", ideal="5"),
+            _pregunta("q3", "Cuéntanos cómo atendiste a un cliente molesto", "abierta", 25, "Blandas", "Comunicación",
+                      palabras_clave=["escuchar", "solución", "empatía", "seguimiento"]),
+            _pregunta("q4", "¿Cuál es tu nivel de inglés?", "multiple", 15, "Técnica", "Idiomas",
+                      opciones=["Básico", "Intermedio", "Avanzado", "Nativo"], ideal="Avanzado"),
+            _pregunta("q5", "¿Tienes disponibilidad para turnos de fin de semana?", "si_no", 15, "Ajuste", "Disponibilidad", True, ideal="si"),
+            _pregunta("q6", "¿Qué tan cómodo te sientes trabajando con metas diarias?", "escala_1_5", 15, "Blandas",
+                      "Orientación al cliente", ideal="5"),
+        ]
+    },
+]
+
+FASES = [(70, 30), (60, 40), (80, 20), (50, 50)]
+CIUDADES = ['Bogotá', 'Medellín', 'Cali', 'Barranquilla', 'Bucaramanga', 'Pereira', 'Cartagena']
+INDUSTRIAS = ['Retail', 'Logística', 'Tecnología', 'Servicios', 'Manufactura', 'Salud']
+TAMANOS = ['1-10', '11-50', '51-200', '201-1000']
+NOMBRES = ['Ana', 'Luis', 'María', 'Carlos', 'Laura', 'Andrés', 'Camila', 'Jorge', 'Valentina', 'Felipe',
+           'Daniela', 'Santiago', 'Paula', 'Julián', 'Natalia', 'Sebastián', 'Juliana', 'Diego']
+APELLIDOS = ['Gómez', 'Rodríguez', 'Martínez', 'López', 'García', 'Hernández', 'Díaz', 'Pérez', 'Sánchez',
+             'Ramírez', 'Torres', 'Rojas', 'Vargas', 'Moreno', 'Castro', 'Ortiz']
+RELLENO = ['En mi último trabajo', 'me encargaba de', 'apoyaba al equipo con', 'era responsable de', 'y también de']
+CRITERIOS = ['dominio', 'resolucion', 'comunicacion', 'pensamiento', 'cultura', 'seguridad']
+# Estados por veredicto y sus pesos (None = recién evaluado, sin mover en el pipeline)
+ESTADOS = {
+    "RECOMENDADO": ([None, 'Agendado Meet', 'Finalista', 'Contratado', 'Rechazado'], [35, 25, 20, 10, 10]),
+    "REVISAR": ([None, 'Agendado Meet', 'Finalista', 'Rechazado', 'Descartado'], [55, 15, 5, 15, 10]),
+    "NO APTO": ([None, 'Rechazado', 'Descartado'], [60, 20, 20]),
+    "DESCARTADO (KO)": ([None, 'Descartado'], [70, 30]),
+}
+ESTADOS_ENTREVISTADOS = ('Agendado Meet', 'Finalista', 'Contratado')
+
+
+def _uuid(rng: random.Random) -> str:
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+class _Escritor:
+    """Acumula filas por tabla y las vacía en lotes respetando ORDEN_TABLAS."""
+
+    def __init__(self, repo, lote=LOTE_ESCRITURA):
+        self.repo = repo
+        self.lote = lote
+        self.pendientes = {t: [] for t in ORDEN_TABLAS}
+        self.escritas = dict.fromkeys(ORDEN_TABLAS, 0)
+
+    def agregar(self, tabla, filas):
+        self.pendientes[tabla].extend(filas)
+        if sum(len(f) for f in self.pendientes.values()) >= self.lote:
+            self.vaciar()
+
+    def vaciar(self):
+        for tabla in ORDEN_TABLAS:
+            filas = self.pendientes[tabla]
+            if filas:
+                self.escritas[tabla] += self.repo.insertar_filas(tabla, filas)
+                self.pendientes[tabla] = []
+
+
+class GeneradorSintetico:
+
+    def __init__(self, semilla: int = 42, meses: int = 12, hasta: datetime = None):
+        self.semilla = semilla
+        self.meses = meses
+        self.hasta = hasta or datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+
+    def _rng(self, *clave) -> random.Random:
+        # Un generador por empresa: el escenario chico es prefijo del grande
+        return random.Random(':'.join(str(c) for c in (self.semilla,) + clave))
+
+    def _fecha(self, rng, dias_max=None) -> datetime:
+        dias_max = dias_max or self.meses * 30
+        return self.hasta - timedelta(seconds=rng.uniform(0, dias_max * 86400))
+
+    # ── Empresas y vacantes ──────────────────────────────────
+    def empresa(self, i: int) -> dict:
+        rng = self._rng('empresa', i)
+        empresa_id = _uuid(rng)
+        creada = self._fecha(rng, self.meses * 30 + 90).isoformat()
+        empresa = {
+            "id": empresa_id,
+            "nombre_empresa": f"Empresa Sintética {i + 1:05d}",
+            "pais": "Colombia",
+            "industria": rng.choice(INDUSTRIAS),
+            "tamano": rng.choice(TAMANOS),
+            "created_at": creada,
+        }
+        usuario = {
+            "id": _uuid(rng),
+            "email": f"reclutador{i + 1:05d}@sintetico.test",
+            "nombre_completo": f"{rng.choice(NOMBRES)} {rng.choice(APELLIDOS)}",
+            "empresa_id": empresa_id,
+            "rol_en_empresa": 'admin',
+        }
+        return {"empresa": empresa, "usuario": usuario}
+
+    def vacante(self, empresa: dict, i: int, j: int) -> dict:
+        rng = self._rng('vacante', i, j)
+        plantilla = PLANTILLAS[(i + j) % len(PLANTILLAS)]
+        peso_pre, peso_ent = rng.choice(FASES)
+        return {
+            "id": _uuid(rng),
+            "cargo": f"{plantilla['cargo']} - {rng.choice(CIUDADES)}",
+            "id_vacante_publico": f"JOB-S{self.semilla}-{i + 1:05d}-{j + 1:03d}",
+            "empresa_id": empresa['id'],
+            "preguntas": plantilla['preguntas'],
+            "skill_stack": plantilla['skill_stack'],
+            "configuracion_modelo": {
+                "distribucion_categorias": plantilla['distribucion'],
+                "fases_evaluacion": {
+                    "pre_screening": {"peso": peso_pre, "activo": True},
+                    "entrevista": {"peso": peso_ent, "activo": True}
+                },
+                "metodo_scoring": "skill_stack_v2",
+                "version": "2.0"
+            },
+            "activa": rng.random() < 0.8,
+            "created_at": self._fecha(rng).isoformat(),
+        }
+
+    # ── Candidatos ───────────────────────────────────────────
+    def _respuesta(self, rng, p: dict, aptitud: float):
+        """(respuesta, puntos, falla_ko) de una pregunta del plan."""
+        reglas_ok = (0.9 + 0.09 * aptitud) if p['knockout'] else (0.15 + 0.75 * aptitud)
+        acierta = rng.random() < reglas_ok
+        tipo = p['tipo']
+        if tipo == 'si_no':
+            respuesta = p['ideal'] if acierta else ('no' if p['ideal'] == 'si' else 'si')
+        elif tipo == 'multiple':
+            otras = [o for o in p['opciones'] if o.lower() != p['ideal']]
+            respuesta = next(o for o in p['opciones'] if o.lower() == p['ideal']) if acierta else rng.choice(otras)
+        elif tipo in ('escala_1_5', 'escala_1_10'):
+            tope = 5 if tipo == 'escala_1_5' else 10
+            respuesta = p['ideal'] if acierta else str(rng.randint(1, tope - 1))
+        else:
+            palabras = [w for w in p['palabras_originales'] if rng.random() < 0.2 + 0.7 * aptitud]
+            respuesta = f"{rng.choice(RELLENO)} {' y '.join(palabras) or 'tareas generales'}."
+            if not p['palabras_clave']:
+                return respuesta, 0, False
+            return respuesta, round(p['peso'] * puntuar_respuesta_abierta(respuesta, p['palabras_clave']), 2), False
+        puntos = p['peso'] if acierta else 0
+        return respuesta, puntos, (not acierta and p['knockout'])
+
+    def candidatos(self, vacante: dict, i: int, j: int, cantidad: int) -> list:
+        rng = self._rng('candidatos', i, j)
+        plan = compilar_plan(vacante)
+        # El plan normaliza el ideal; para armar respuestas también hacen falta las opciones y palabras
+        originales = {p['id']: p for p in vacante['preguntas']}
+        preguntas = []
+        for q_id, p in plan['preguntas'].items():
+            reglas = originales[q_id].get('reglas') or {}
+            preguntas.append({**p, 'opciones': reglas.get('opciones', []),
+                              'palabras_originales': reglas.get('palabras_clave') or []})
+
+        # Los candidatos llegan entre la creación de la vacante y --hasta
+        dias_abierta = (self.hasta - datetime.fromisoformat(vacante['created_at'])).total_seconds() / 86400
+        filas = []
+        for k in range(cantidad):
+            aptitud = rng.betavariate(2.0, 2.4)
+            detalle, motivo_ko = [], ""
+            for p in preguntas:
+                respuesta, puntos, falla_ko = self._respuesta(rng, p, aptitud)
+                if falla_ko and not motivo_ko:
+                    motivo_ko = f"No cumple requisito crítico: {p['texto']}"
+                detalle.append({
+                    "pregunta": p['texto'], "respuesta": respuesta, "puntos": puntos, "peso": p['peso'],
+                    "tipo": p['tipo'], "categoria": p['categoria'], "habilidad": p['habilidad'],
+                    "es_critica": p['es_critica'], "puntuable": p['puntuable']
+                })
+            filas.append({
+                "id": _uuid(rng),
+                "clave_idempotencia": None,
+                "vacante_id": vacante['id'],
+                "empresa_id": vacante['empresa_id'],
+                "nombre_candidato": f"{rng.choice(NOMBRES)} {rng.choice(APELLIDOS)} {rng.choice(APELLIDOS)}",
+                "identificacion": str(rng.randint(10_000_000, 1_199_999_999)),
+                "veredicto": "DESCARTADO (KO)" if motivo_ko else None,
+                "comentarios_tecnicos": motivo_ko,
+                "respuestas_detalle": detalle,
+                "fecha": self._fecha(rng, dias_abierta).isoformat(),
+                "score_interview": None,
+                "_aptitud": aptitud,
+            })
+
+        self._puntuar(filas, plan, rng)
+        return filas
+
+    def _puntuar(self, filas: list, plan: dict, rng: random.Random):
+        """Scores, veredictos, estados y entrevistas con el cálculo del re-scoring."""
+        matrices = cargar_matrices(filas, plan)
+        scores = recalcular_scores(matrices, plan)['score']
+        pct_cat = _pct(matrices['cat_obtenido'], matrices['cat_maximo'])
+        pct_hab = _pct(matrices['hab_obtenido'], matrices['hab_maximo'])
+        fases = plan['fases']
+        peso_pre = fases['pre_screening']['peso'] / 100
+        peso_ent = fases['entrevista']['peso'] / 100
+
+        for i, fila in enumerate(filas):
+            aptitud = fila.pop('_aptitud')
+            score = float(scores[i])
+            veredicto, tag = _veredicto(score, bool(fila['comentarios_tecnicos']))
+            opciones, pesos = ESTADOS[veredicto]
+            estado = rng.choices(opciones, pesos)[0]
+
+            habilidades = {h: int(round(pct_hab[i, k])) for k, h in enumerate(matrices['habilidades'])}
+            categorias = {c: int(round(pct_cat[i, k])) for k, c in enumerate(CATEGORIAS)}
+            fila.update({
+                "score": round(score, 1),
+                "veredicto": veredicto,
+                "tag": tag,
+                "estado": estado,
+                "entity_skill_score": habilidades,
+                "metricas_categorias": categorias,
+                "analisis_ia": self._analisis(plan, score, veredicto, fila['comentarios_tecnicos'], habilidades, categorias),
+            })
+
+            if estado in ESTADOS_ENTREVISTADOS and rng.random() < 0.7:
+                criterios = {c: max(1, min(5, round(rng.gauss(1 + 4 * aptitud, 0.8)))) for c in CRITERIOS}
+                bloque_a = [criterios[c] for c in CRITERIOS[:2]]
+                bloque_b = [criterios[c] for c in CRITERIOS[2:]]
+                crudo = (sum(bloque_a) / 2) * 0.4 + (sum(bloque_b) / 4) * 0.6
+                score_interview = round((crudo - 1) / 4 * 100)
+                fila.update({
+                    "criterios_entrevista": criterios,
+                    "comentario_entrevista": "",
+                    "score_interview": score_interview,
+                    "score_final_combinado": round(score * peso_pre + score_interview * peso_ent, 1),
+                })
+
+    @staticmethod
+    def _analisis(plan, score, veredicto, motivo_ko, habilidades, categorias) -> dict:
+        # Versión corta de generar_resumen_profesional (misma forma del dict)
+        criticas = plan['skill_stack']
+        fortalezas = [f"{h} ({habilidades[h]}% — habilidad crítica del rol)"
+                      for h in criticas if habilidades.get(h, 0) >= 80]
+        riesgos = [f"Bajo desempeño en {h} ({habilidades[h]}% — habilidad crítica del rol)"
+                   for h in criticas if h in habilidades and habilidades[h] <= 60]
+        if motivo_ko:
+            riesgos.insert(0, f"KO automático: {motivo_ko}")
+        if veredicto == "DESCARTADO (KO)":
+            resumen, recomendacion = f"Candidato descartado automáticamente. {motivo_ko}.", "❌ No continuar proceso"
+        elif score >= 75:
+            resumen, recomendacion = f"Candidato con perfil sobresaliente para {plan['cargo']}.", "✅ Avanzar a siguiente fase"
+        elif score >= 40:
+            resumen, recomendacion = f"Candidato con potencial moderado para {plan['cargo']}.", "⚠ Entrevista técnica de validación"
+        else:
+            resumen, recomendacion = f"Candidato por debajo del perfil mínimo esperado para {plan['cargo']}.", "❌ Descartar candidato"
+        return {
+            "resumen": resumen,
+            "fortalezas": fortalezas[:5] or ["Evaluación completada — sin habilidades críticas con puntaje destacado"],
+            "riesgos": riesgos[:5] or ["Validar competencias blandas en entrevista"],
+            "recomendacion": recomendacion,
+            "radar": " ".join(f"{c[0]}:{categorias[c]}%" for c in CATEGORIAS),
+            "metodo": "Motor de Competencias Sales AI v2 — Skill Stack",
+            "entity_skill_score": habilidades,
+        }
+
+
+def generar(empresas: int, vacantes: int, candidatos: int, semilla: int = 42, meses: int = 12,
+            hasta: datetime = None, repo=None, password: str = PASSWORD_DEFAULT, desde_empresa: int = 0) -> dict:
+    """
+    Genera y escribe el dataset. Retorna {filas por tabla, segundos, empresas: [(empresa_id, email)]}.
+    `desde_empresa` permite agregar empresas a un dataset existente sin repetir ids.
+    """
+    repo = repo or get_repositorio()
+    generador = GeneradorSintetico(semilla, meses, hasta)
+    escritor = _Escritor(repo)
+    # Las credenciales locales solo tienen sentido en el archivo que sirve supabase_local
+    con_auth = isinstance(repo, RepositorioSQLite)
+    # Mismo formato que RepositorioSQLite.registrar_credenciales; un solo hash para todas las cuentas
+    password_hash = generate_password_hash(password) if con_auth else None
+    inicio = time.perf_counter()
+    cuentas = []
+
+    for i in range(desde_empresa, desde_empresa + empresas):
+        datos = generador.empresa(i)
+        escritor.agregar('empresas', [datos['empresa']])
+        escritor.agregar('usuarios_empresa', [datos['usuario']])
+        if con_auth:
+            escritor.agregar('auth_usuarios', [{
+                "id": datos['usuario']['id'], "email": datos['usuario']['email'],
+                "password_hash": password_hash, "created_at": datos['empresa']['created_at'],
+            }])
+        cuentas.append((datos['empresa']['id'], datos['usuario']['email']))
+
+        for j in range(vacantes):
+            vacante = generador.vacante(datos['empresa'], i, j)
+            escritor.agregar('vacantes', [vacante])
+            escritor.agregar('entrevistas', generador.candidatos(vacante, i, j, candidatos))
+
+        if (i - desde_empresa + 1) % 100 == 0:
+            logger.info(f"⏳ {i - desde_empresa + 1}/{empresas} empresas generadas")
+
+    escritor.vaciar()
+    return {"filas": escritor.escritas, "segundos": round(time.perf_counter() - inicio, 1), "empresas": cuentas}
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description='Genera empresas, vacantes y candidatos sintéticos')
+    parser.add_argument('escenario', nargs='?', choices=sorted(ESCENARIOS), help='Tamaño predefinido')
+    parser.add_argument('--empresas', type=int)
+    parser.add_argument('--vacantes', type=int, help='Vacantes por empresa')
+    parser.add_argument('--candidatos', type=int, help='Candidatos por vacante')
+    parser.add_argument('--semilla', type=int, default=42)
+    parser.add_argument('--meses', type=int, default=12, help='Meses hacia atrás en que se reparten las fechas')
+    parser.add_argument('--hasta', type=lambda s: datetime.fromisoformat(s), help='Fecha más reciente (por defecto hoy)')
+    parser.add_argument('--desde-empresa', type=int, default=0, help='Índice de la primera empresa (para ampliar un dataset)')
+    parser.add_argument('--password', default=PASSWORD_DEFAULT, help='Contraseña de los reclutadores en supabase_local')
+    args = parser.parse_args()
+
+    tamano = dict(ESCENARIOS.get(args.escenario) or ESCENARIOS['demo'])
+    for clave in ('empresas', 'vacantes', 'candidatos'):
+        if getattr(args, clave) is not None:
+            tamano[clave] = getattr(args, clave)
+
+    logger.info(f"🧪 Generando {tamano['empresas']} empresas × {tamano['vacantes']} vacantes × "
+                f"{tamano['candidatos']} candidatos (semilla {args.semilla})")
+    resultado = generar(semilla=args.semilla, meses=args.meses, hasta=args.hasta,
+                        password=args.password, desde_empresa=args.desde_empresa, **tamano)
+    logger.info(f"✅ {resultado['filas']} en {resultado['segundos']}s")
+    if resultado['empresas']:
+        logger.info(f"   Login de ejemplo: {resultado['empresas'][0][1]} / {args.password}")
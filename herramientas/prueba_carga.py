@@ -0,0 +1,347 @@
+"""
+herramientas/prueba_carga.py
+Pruebas de carga HTTP de las rutas calientes con comparación contra una línea base
+
+Escenarios (cada usuario virtual repite su sesión hasta que termina la fase):
+    candidato     GET /encuesta + POST /procesar (ráfagas de postulaciones)
+    reclutador    login, /dashboard, /candidatos, /api/candidato/<id> y
+                  /api/guardar_evaluacion
+    calculadora   /calculadora/api/submit + /calculadora/api/tracking
+
+Por escenario y por ruta reporta throughput, p50/p95/p99, errores y las
+llamadas a Supabase por request (contadas en herramientas/supabase_local).
+
+    # Todo en el proceso: stand-in de Supabase + app sobre un dataset de datos_sinteticos
+    python -m herramientas.prueba_carga --local --db /tmp/carga.db --latencia 15 --jitter 10
+
+    # Contra un servidor ya levantado (gunicorn apuntando al stand-in)
+    python -m herramientas.prueba_carga --url http://127.0.0.1:8000 --stats-url http://127.0.0.1:54321
+
+Con --linea-base el proceso sale con código 1 si algún escenario empeora
+más que --tolerancia; --guardar-linea-base escribe la corrida como nueva base.
+Las empresas se ubican con la misma --semilla con la que se generó el dataset.
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+LINEA_BASE_DEFAULT = os.path.join(os.path.dirname(__file__), 'linea_base_carga.json')
+TOLERANCIA_DEFAULT = 0.2
+USUARIOS_DEFAULT = {'candidato': 20, 'reclutador': 5, 'calculadora': 5}
+CRITERIOS = ['dominio', 'resolucion', 'comunicacion', 'pensamiento', 'cultura', 'seguridad']
+RESPUESTAS_CALCULADORA = {
+    'vacantes_activas': ["1-3", "4-10", "11-25", "26-50", "+50"],
+    'candidatos_por_vacante': ["1-20", "21-50", "51-100", "101-200", "+200"],
+    'tiempo_por_cv': ["1-3 min", "4-7 min", "8-15 min", "+15 min"],
+    'personas_proceso': ["Solo yo", "2-3", "4-6", "+7"],
+    'rango_salarial': ["$2-5k/mes", "$6-10k", "$11-20k", "+$20k"],
+    'frecuencia_error': ["Casi nunca", "1 de cada 10", "3 de cada 10", "5 de cada 10"],
+    'principal_dolor': ["Tiempo", "Calidad", "Costo"],
+}
+
+
+class _Cliente:
+    """
+    httpx.Client que registra (etiqueta, status, ms) de cada request.
+    La cookie de sesión es Secure: se reenvía a mano para poder probar sobre http.
+    """
+
+    def __init__(self, base_url):
+        self.http = httpx.Client(base_url=base_url, timeout=30, follow_redirects=False)
+        self.registros = []
+
+    def pedir(self, metodo, ruta, etiqueta=None, **kwargs):
+        inicio = time.perf_counter()
+        try:
+            respuesta = self.http.request(metodo, ruta, **kwargs)
+            status = respuesta.status_code
+        except httpx.HTTPError:
+            respuesta, status = None, 0
+        self.registros.append((f"{metodo} {etiqueta or ruta}", status, (time.perf_counter() - inicio) * 1000))
+        if respuesta is not None and respuesta.cookies.get('session'):
+            self.http.headers['Cookie'] = f"session={respuesta.cookies['session']}"
+        return respuesta
+
+    def cerrar(self):
+        self.http.close()
+
+
+# ── Escenarios ───────────────────────────────────────────────
+def escenario_candidato(cliente, datos, rng, estado):
+    vacante = rng.choice(datos['vacantes'])
+    cliente.pedir('GET', f"/encuesta?vacante={vacante['id_vacante_publico']}", '/encuesta')
+    ids, respuestas = [], []
+    for p in vacante['preguntas']:
+        reglas = p.get('reglas') or {}
+        if p['tipo'] == 'si_no':
+            valor = rng.choice(['si', 'si', 'si', 'no'])
+        elif p['tipo'] == 'multiple':
+            valor = rng.choice(reglas.get('opciones') or ['-'])
+        elif p['tipo'] in ('escala_1_5', 'escala_1_10'):
+            valor = str(rng.randint(1, 5 if p['tipo'] == 'escala_1_5' else 10))
+        else:
+            palabras = reglas.get('palabras_clave') or []
+            valor = 'Me encargaba de ' + ' y '.join(rng.sample(palabras, k=rng.randint(0, len(palabras))))
+        ids.append(p['id'])
+        respuestas.append(valor)
+    cliente.pedir('POST', '/procesar', data={
+        'id_vacante': vacante['id_vacante_publico'],
+        'nombre': f"Candidato Carga {rng.randint(1, 10**6)}",
+        'cc': str(rng.randint(10_000_000, 1_199_999_999)),
+        'preguntas_custom[]': ids,
+        'respuestas_custom[]': respuestas,
+        'token_envio': uuid.UUID(int=rng.getrandbits(128)).hex,
+    })
+
+
+def escenario_reclutador(cliente, datos, rng, estado):
+    if 'cuenta' not in estado:
+        estado['cuenta'] = rng.choice(datos['cuentas'])
+        cliente.pedir('POST', '/login', data={'email': estado['cuenta']['email'], 'password': datos['password']})
+    cuenta = estado['cuenta']
+    cliente.pedir('GET', '/dashboard')
+    cliente.pedir('GET', '/candidatos')
+    if not cuenta['entrevistas']:
+        return
+    for entrevista_id in rng.sample(cuenta['entrevistas'], k=min(3, len(cuenta['entrevistas']))):
+        cliente.pedir('GET', f"/api/candidato/{entrevista_id}", '/api/candidato/<id>')
+    cliente.pedir('POST', '/api/guardar_evaluacion', json={
+        'entrevista_id': rng.choice(cuenta['entrevistas']),
+        'criterios': {c: rng.randint(1, 5) for c in CRITERIOS},
+        'comentario': 'Prueba de carga',
+    })
+
+
+def escenario_calculadora(cliente, datos, rng, estado):
+    n = rng.randint(1, 10**7)
+    respuesta = cliente.pedir('POST', '/calculadora/api/submit', json={
+        'nombre': f"Lead Carga {n}",
+        'email': f"lead{n}@carga.test",
+        'empresa': f"Empresa Carga {n % 500}",
+        'cargo': 'Gerente de RRHH',
+        **{campo: rng.choice(opciones) for campo, opciones in RESPUESTAS_CALCULADORA.items()},
+    })
+    if respuesta is None or respuesta.status_code != 201:
+        return
+    diagnostico_id = respuesta.json()['diagnostico_id']
+    for accion in ('abrio_modal_demo', 'descarga_pdf'):
+        cliente.pedir('POST', '/calculadora/api/tracking', json={'diagnostico_id': diagnostico_id, 'accion': accion})
+
+
+ESCENARIOS = {
+    'candidato': escenario_candidato,
+    'reclutador': escenario_reclutador,
+    'calculadora': escenario_calculadora,
+}
+
+
+# ── Ejecución ────────────────────────────────────────────────
+def preparar_datos(repo, semilla, cuentas, password) -> dict:
+    """Cuentas de reclutador, vacantes e ids de entrevistas del dataset de datos_sinteticos."""
+    from herramientas.datos_sinteticos import GeneradorSintetico
+
+    generador = GeneradorSintetico(semilla)
+    datos = {'cuentas': [], 'vacantes': [], 'password': password}
+    for i in range(cuentas):
+        base = generador.empresa(i)
+        empresa_id = base['empresa']['id']
+        vacantes = repo.vacantes_empresa(empresa_id, 'id, id_vacante_publico, preguntas, activa')
+        if not vacantes:
+            break
+        filas, _ = repo.pagina_entrevistas(empresa_id, 'id, fecha', 'fecha', None, 50)
+        datos['cuentas'].append({'email': base['usuario']['email'], 'entrevistas': [f['id'] for f in filas]})
+        datos['vacantes'] += [v for v in vacantes if v.get('activa', True)]
+    if not datos['cuentas'] or not datos['vacantes']:
+        raise SystemExit("❌ No hay datos: genera el dataset con herramientas/datos_sinteticos y la misma --semilla")
+    return datos
+
+
+def correr_fase(base_url, escenario, usuarios, duracion, datos, semilla=0, contador=None) -> dict:
+    """Corre `usuarios` usuarios virtuales del escenario durante `duracion` segundos."""
+    funcion = ESCENARIOS[escenario]
+    fin = time.monotonic() + duracion
+    llamadas_antes = contador() if contador else None
+
+    def usuario_virtual(n):
+        rng = random.Random(f"{semilla}:{escenario}:{n}")
+        cliente, estado = _Cliente(base_url), {}
+        try:
+            while time.monotonic() < fin:
+                funcion(cliente, datos, rng, estado)
+        finally:
+            cliente.cerrar()
+        return cliente.registros
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=usuarios, thread_name_prefix=f"carga-{escenario}") as pool:
+        registros = [r for lote in pool.map(usuario_virtual, range(usuarios)) for r in lote]
+    segundos = time.perf_counter() - inicio
+    llamadas = (contador() - llamadas_antes) if contador else None
+    return resumir(registros, segundos, llamadas)
+
+
+def _percentiles(latencias) -> dict:
+    p50, p95, p99 = np.percentile(latencias, [50, 95, 99]) if latencias else (0, 0, 0)
+    return {'p50_ms': round(float(p50), 1), 'p95_ms': round(float(p95), 1), 'p99_ms': round(float(p99), 1)}
+
+
+def resumir(registros, segundos, llamadas=None) -> dict:
+    por_ruta = defaultdict(list)
+    errores = defaultdict(int)
+    for etiqueta, status, ms in registros:
+        por_ruta[etiqueta].append(ms)
+        if status == 0 or status >= 500:
+            errores[etiqueta] += 1
+
+    total = len(registros)
+    return {
+        'requests': total,
+        'segundos': round(segundos, 2),
+        'rps': round(total / segundos, 1) if segundos else 0,
+        'errores': sum(errores.values()),
+        'llamadas_supabase_por_request': round(llamadas / total, 2) if llamadas is not None and total else None,
+        **_percentiles([ms for _, _, ms in registros]),
+        'rutas': {
+            etiqueta: {'requests': len(ms), 'errores': errores[etiqueta], **_percentiles(ms)}
+            for etiqueta, ms in sorted(por_ruta.items())
+        },
+    }
+
+
+def comparar(resultado: dict, linea_base: dict, tolerancia: float) -> list:
+    """Regresiones de `resultado` frente a `linea_base` (lista de mensajes, vacía si no hay)."""
+    regresiones = []
+    for escenario, base in linea_base.items():
+        actual = resultado.get(escenario)
+        if not actual:
+            continue
+        if actual['rps'] < base['rps'] * (1 - tolerancia):
+            regresiones.append(f"{escenario}: throughput {actual['rps']} rps < {base['rps']} rps")
+        for clave in ('p95_ms', 'p99_ms'):
+            if actual[clave] > base[clave] * (1 + tolerancia):
+                regresiones.append(f"{escenario}: {clave} {actual[clave]} > {base[clave]}")
+        tasa, tasa_base = actual['errores'] / max(actual['requests'], 1), base['errores'] / max(base['requests'], 1)
+        if tasa > tasa_base + 0.01:
+            regresiones.append(f"{escenario}: errores {tasa:.1%} > {tasa_base:.1%}")
+        llamadas, llamadas_base = actual.get('llamadas_supabase_por_request'), base.get('llamadas_supabase_por_request')
+        if llamadas is not None and llamadas_base is not None and llamadas > llamadas_base * (1 + tolerancia) + 0.1:
+            regresiones.append(f"{escenario}: llamadas a Supabase por request {llamadas} > {llamadas_base}")
+    return regresiones
+
+
+def imprimir(resultado: dict):
+    print(f"\n{'escenario / ruta':<42}{'req':>7}{'rps':>8}{'p50':>8}{'p95':>8}{'p99':>8}{'err':>6}{'sb/req':>8}")
+    for escenario, r in resultado.items():
+        sb = '-' if r['llamadas_supabase_por_request'] is None else r['llamadas_supabase_por_request']
+        print(f"{escenario:<42}{r['requests']:>7}{r['rps']:>8}{r['p50_ms']:>8}{r['p95_ms']:>8}{r['p99_ms']:>8}"
+              f"{r['errores']:>6}{sb:>8}")
+        for etiqueta, ruta in r['rutas'].items():
+            print(f"  {etiqueta:<40}{ruta['requests']:>7}{'':>8}{ruta['p50_ms']:>8}{ruta['p95_ms']:>8}"
+                  f"{ruta['p99_ms']:>8}{ruta['errores']:>6}")
+
+
+def _levantar_local(args):
+    """
+    Stand-in de Supabase + app Flask en hilos de este proceso.
+    Retorna (url, contador de llamadas, servidores, repositorio SQLite del dataset).
+    """
+    # La app debe ir por HTTP al stand-in: el backend se fija al importar storage.repositorio
+    os.environ['REPOSITORIO_BACKEND'] = 'supabase'
+    from werkzeug.serving import make_server
+    from herramientas.supabase_local import SupabaseLocal, iniciar, CLAVE_ANON
+
+    local = SupabaseLocal(args.db, args.latencia, args.jitter, semilla=args.semilla)
+    servidor_sb = iniciar(local, puerto=0)
+    os.environ.update({
+        'SUPABASE_URL': f"http://127.0.0.1:{servidor_sb.server_address[1]}",
+        'SUPABASE_KEY': CLAVE_ANON,
+    })
+    from app import app as flask_app
+    # El log por request de la app taparía el reporte
+    logging.getLogger().setLevel(logging.ERROR)
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+
+    servidor_app = make_server('127.0.0.1', 0, flask_app, threaded=True)
+    threading.Thread(target=servidor_app.serve_forever, name='carga-app', daemon=True).start()
+    contador = lambda: sum(local.peticiones.values())
+    return f"http://127.0.0.1:{servidor_app.server_port}", contador, (servidor_app, servidor_sb), local.repo
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description='Pruebas de carga de las rutas calientes')
+    destino = parser.add_mutually_exclusive_group(required=True)
+    destino.add_argument('--url', help='App ya levantada (p. ej. http://127.0.0.1:8000)')
+    destino.add_argument('--local', action='store_true', help='Levanta supabase_local y la app en este proceso')
+    parser.add_argument('--db', help='SQLite del dataset para --local (por defecto REPOSITORIO_SQLITE_PATH)')
+    parser.add_argument('--latencia', type=float, default=10, help='ms fijos por viaje a Supabase en --local')
+    parser.add_argument('--jitter', type=float, default=5, help='media (ms) de la cola exponencial en --local')
+    parser.add_argument('--stats-url', help='supabase_local de --url, para contar llamadas a Supabase')
+    parser.add_argument('--escenarios', default=','.join(USUARIOS_DEFAULT),
+                        help='escenario[=usuarios] separados por coma, p. ej. candidato=50,reclutador=10')
+    parser.add_argument('--duracion', type=float, default=20, help='Segundos por escenario')
+    parser.add_argument('--semilla', type=int, default=42, help='Semilla del dataset de datos_sinteticos')
+    parser.add_argument('--cuentas', type=int, default=20, help='Reclutadores (empresas) a usar')
+    parser.add_argument('--password', default='sintetico123')
+    parser.add_argument('--linea-base', default=LINEA_BASE_DEFAULT)
+    parser.add_argument('--tolerancia', type=float, default=TOLERANCIA_DEFAULT)
+    parser.add_argument('--guardar-linea-base', action='store_true')
+    parser.add_argument('--salida', help='Guardar el resultado completo en este JSON')
+    args = parser.parse_args()
+
+    if args.local:
+        base_url, contador, servidores, repo = _levantar_local(args)
+    else:
+        from storage.repositorio import get_repositorio
+        base_url, servidores, repo = args.url, (), get_repositorio()
+        contador = (lambda: httpx.get(f"{args.stats_url}/__local/stats").json()['total']) if args.stats_url else None
+
+    datos = preparar_datos(repo, args.semilla, args.cuentas, args.password)
+    fases = []
+    for item in args.escenarios.split(','):
+        nombre, _, usuarios = item.strip().partition('=')
+        if nombre not in ESCENARIOS:
+            parser.error(f"Escenario desconocido: {nombre}")
+        fases.append((nombre, int(usuarios or USUARIOS_DEFAULT[nombre])))
+
+    resultado = {}
+    for nombre, usuarios in fases:
+        print(f"▶️  {nombre}: {usuarios} usuarios × {args.duracion}s contra {base_url}")
+        resultado[nombre] = correr_fase(base_url, nombre, usuarios, args.duracion, datos, args.semilla, contador)
+    for servidor in servidores:
+        servidor.shutdown()
+
+    imprimir(resultado)
+    if args.salida:
+        with open(args.salida, 'w') as f:
+            json.dump(resultado, f, indent=2, ensure_ascii=False)
+
+    if args.guardar_linea_base:
+        with open(args.linea_base, 'w') as f:
+            json.dump(resultado, f, indent=2, ensure_ascii=False)
+        print(f"\n💾 Línea base guardada en {args.linea_base}")
+    elif os.path.exists(args.linea_base):
+        with open(args.linea_base) as f:
+            regresiones = comparar(resultado, json.load(f), args.tolerancia)
+        if regresiones:
+            print(f"\n❌ Regresiones frente a {args.linea_base}:")
+            for mensaje in regresiones:
+                print(f"   - {mensaje}")
+            sys.exit(1)
+        print(f"\n✅ Sin regresiones frente a {args.linea_base} (tolerancia {args.tolerancia:.0%})")
+    else:
+        print(f"\nℹ️ Sin línea base en {args.linea_base}; usa --guardar-linea-base para crearla")
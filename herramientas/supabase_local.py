@@ -0,0 +1,506 @@
+"""
+herramientas/supabase_local.py
+Servidor local compatible con el subconjunto de PostgREST y GoTrue que usa la app
+
+Sirve el mismo archivo SQLite que storage/repositorio_sqlite.py, así que los
+datos cargados con REPOSITORIO_BACKEND=sqlite (o con el generador de
+herramientas/datos_sinteticos.py) quedan disponibles para la app corriendo
+con el backend supabase apuntado aquí:
+
+    python -m herramientas.supabase_local --puerto 54321 --latencia 15 --jitter 10
+    SUPABASE_URL=http://127.0.0.1:54321 SUPABASE_KEY=<clave que imprime> gunicorn app:app
+
+Soporta: select (con embeds vacantes(...) / calculadora_leads(...)), eq, neq,
+gt, gte, lt, lte, in, is, not, or/and anidados, order (nullsfirst/last),
+limit/offset, single, insert, upsert, update, delete, las RPC
+dashboard_empresa / reporte_empresa y auth.sign_in_with_password / sign_up.
+
+Cada petición espera latencia + exponencial(jitter) ms antes de responder.
+GET /__local/stats da el conteo de peticiones por operación y tabla;
+POST /__local/reset lo pone en cero.
+"""
+
+import argparse
+import base64
+import json
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+import uuid
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qsl
+
+from storage.repositorio import Duplicado
+from storage.repositorio_sqlite import RepositorioSQLite, TABLAS
+
+logger = logging.getLogger(__name__)
+
+LATENCIA_MS = float(os.getenv('SUPABASE_LOCAL_LATENCIA_MS', '0'))
+JITTER_MS = float(os.getenv('SUPABASE_LOCAL_JITTER_MS', '0'))
+
+PARAMS_RESERVADOS = {'select', 'order', 'limit', 'offset', 'on_conflict', 'columns', 'or', 'and'}
+OPERADORES = {'eq': '=', 'neq': '<>', 'gt': '>', 'gte': '>=', 'lt': '<', 'lte': '<='}
+
+def _b64(datos: dict) -> str:
+    return base64.urlsafe_b64encode(json.dumps(datos, separators=(',', ':')).encode()).decode().rstrip('=')
+
+
+def token_falso(claims: dict) -> str:
+    """JWT con forma válida (sin firma real): el cliente solo revisa el formato."""
+    return f"{_b64({'alg': 'HS256', 'typ': 'JWT'})}.{_b64(claims)}.local"
+
+
+CLAVE_ANON = token_falso({'iss': 'supabase-local', 'role': 'anon'})
+
+
+class ErrorPostgrest(Exception):
+    def __init__(self, estado, codigo, mensaje):
+        super().__init__(mensaje)
+        self.estado, self.codigo, self.mensaje = estado, codigo, mensaje
+
+
+# ── Parseo de filtros PostgREST ──────────────────────────────
+def _partir(texto: str) -> list:
+    """Separa por comas de nivel 0 respetando paréntesis y comillas."""
+    partes, actual, nivel, comillas, escape = [], '', 0, False, False
+    for ch in texto:
+        if escape:
+            actual += ch
+            escape = False
+            continue
+        if ch == '\\' and comillas:
+            actual += ch
+            escape = True
+            continue
+        if ch == '"':
+            comillas = not comillas
+        elif not comillas and ch == '(':
+            nivel += 1
+        elif not comillas and ch == ')':
+            nivel -= 1
+        elif not comillas and nivel == 0 and ch == ',':
+            partes.append(actual)
+            actual = ''
+            continue
+        actual += ch
+    if actual:
+        partes.append(actual)
+    return [p.strip() for p in partes]
+
+
+def _valor(texto: str) -> str:
+    if len(texto) >= 2 and texto[0] == '"' and texto[-1] == '"':
+        return texto[1:-1].replace('\\"', '"').replace('\\\\', '\\')
+    return texto
+
+
+def _numero(texto: str):
+    try:
+        return int(texto)
+    except ValueError:
+        try:
+            return float(texto)
+        except ValueError:
+            return None
+
+
+class _Consulta:
+    """Traduce filtros PostgREST a un WHERE de SQLite sobre (columnas reales | json_extract(doc))."""
+
+    def __init__(self, tabla):
+        self.tabla = tabla
+        self.columnas = set(TABLAS.get(tabla, ())) | {'id'}
+
+    def expr(self, columna: str) -> str:
+        if columna in self.columnas:
+            return columna
+        if not columna.replace('_', '').isalnum():
+            raise ErrorPostgrest(400, 'PGRST100', f"Columna inválida: {columna}")
+        return f"json_extract(doc, '$.\"{columna}\"')"
+
+    def condicion(self, columna: str, op_valor: str):
+        negar = False
+        if op_valor.startswith('not.'):
+            negar, op_valor = True, op_valor[4:]
+        op, _, crudo = op_valor.partition('.')
+        x = self.expr(columna)
+
+        if op == 'is':
+            literal = {'null': 'NULL', 'true': '1', 'false': '0'}.get(crudo.lower())
+            if literal is None:
+                raise ErrorPostgrest(400, 'PGRST100', f"Valor inválido para is: {crudo}")
+            sql, params = (f'{x} IS NULL', []) if literal == 'NULL' else (f'{x} = {literal}', [])
+        elif op == 'in':
+            valores = [_valor(v) for v in _partir(crudo.strip()[1:-1])] if crudo.strip() else []
+            candidatos = []
+            for v in valores:
+                candidatos += self._formas(v)
+            sql = f"{x} IN ({','.join('?' * len(candidatos))})" if candidatos else '0'
+            params = candidatos
+        elif op in ('eq', 'neq'):
+            formas = self._formas(_valor(crudo))
+            sql = f"{x} IN ({','.join('?' * len(formas))})"
+            params = formas
+            if op == 'neq':
+                sql = f'NOT ({sql})'
+        elif op in OPERADORES:
+            v = _valor(crudo)
+            n = _numero(v)
+            sql, params = f'{x} {OPERADORES[op]} ?', [n if n is not None else v]
+        elif op == 'ilike':
+            sql, params = f'{x} LIKE ?', [_valor(crudo).replace('*', '%')]
+        elif op == 'like':
+            # LIKE de SQLite ignora mayúsculas; GLOB respeta como el like de Postgres
+            sql, params = f'{x} GLOB ?', [_valor(crudo).replace('%', '*')]
+        else:
+            raise ErrorPostgrest(400, 'PGRST100', f"Operador no soportado: {op}")
+        return (f'NOT ({sql})', params) if negar else (sql, params)
+
+    @staticmethod
+    def _formas(v: str) -> list:
+        # PostgREST castea al tipo de la columna; aquí se compara texto y número/booleano
+        formas = [v]
+        n = _numero(v)
+        if n is not None:
+            formas.append(n)
+        if v in ('true', 'false'):
+            formas.append(1 if v == 'true' else 0)
+        return formas
+
+    def logica(self, operador: str, contenido: str):
+        """or=(a.eq.1,and(b.lt.2,c.is.null)) -> SQL."""
+        partes, params = [], []
+        for item in _partir(contenido):
+            for anidado in ('and', 'or', 'not.and', 'not.or'):
+                if item.startswith(anidado + '('):
+                    sql, p = self.logica(anidado.replace('not.', ''), item[len(anidado) + 1:-1])
+                    if anidado.startswith('not.'):
+                        sql = f'NOT {sql}'
+                    break
+            else:
+                columna, _, op_valor = item.partition('.')
+                sql, p = self.condicion(columna, op_valor)
+            partes.append(sql)
+            params += p
+        union = ' OR ' if operador == 'or' else ' AND '
+        return '(' + union.join(partes) + ')', params
+
+    def where(self, params_query: list):
+        partes, params = [], []
+        for clave, valor in params_query:
+            if clave in ('or', 'and'):
+                sql, p = self.logica(clave, valor.strip()[1:-1])
+            elif clave in PARAMS_RESERVADOS:
+                continue
+            else:
+                sql, p = self.condicion(clave, valor)
+            partes.append(sql)
+            params += p
+        return (' WHERE ' + ' AND '.join(partes)) if partes else '', params
+
+    def orden(self, texto: str) -> str:
+        if not texto:
+            return ''
+        claves = []
+        for item in texto.split(','):
+            partes = item.split('.')
+            columna, direccion = partes[0], 'ASC'
+            nulos = None
+            for mod in partes[1:]:
+                if mod in ('asc', 'desc'):
+                    direccion = mod.upper()
+                elif mod in ('nullsfirst', 'nullslast'):
+                    nulos = 'NULLS FIRST' if mod == 'nullsfirst' else 'NULLS LAST'
+            # Igual que Postgres: desc pone los NULL primero salvo que se pida otra cosa
+            nulos = nulos or ('NULLS FIRST' if direccion == 'DESC' else 'NULLS LAST')
+            claves.append(f'{self.expr(columna)} {direccion} {nulos}')
+        return ' ORDER BY ' + ', '.join(claves)
+
+
+# ── Servidor ─────────────────────────────────────────────────
+class SupabaseLocal:
+    """Estado del servidor: repositorio SQLite, latencia inyectada y contadores."""
+
+    def __init__(self, ruta=None, latencia_ms=LATENCIA_MS, jitter_ms=JITTER_MS, semilla=None):
+        self.repo = RepositorioSQLite(ruta)
+        self.latencia_ms = latencia_ms
+        self.jitter_ms = jitter_ms
+        self._azar = random.Random(semilla)
+        self._lock = threading.Lock()
+        self.peticiones = Counter()
+
+    def esperar(self):
+        if not self.latencia_ms and not self.jitter_ms:
+            return
+        with self._lock:
+            extra = self._azar.expovariate(1 / self.jitter_ms) if self.jitter_ms else 0
+        time.sleep((self.latencia_ms + extra) / 1000)
+
+    def contar(self, clave):
+        with self._lock:
+            self.peticiones[clave] += 1
+
+    # ── PostgREST ──
+    def seleccionar(self, tabla, params):
+        # La vista del panel admin se calcula al vuelo (sin filtros: la app la lee completa)
+        if tabla == 'vista_metricas_empresas':
+            return self.repo.metricas_empresas()
+        consulta = _Consulta(tabla)
+        self.repo._asegurar_tabla(tabla)
+        where, valores = consulta.where(params)
+        opciones = dict(params)
+        sql = f'SELECT doc FROM {tabla}{where}{consulta.orden(opciones.get("order"))}'
+        if 'limit' in opciones or 'offset' in opciones:
+            sql += ' LIMIT ? OFFSET ?'
+            valores += [int(opciones.get('limit', -1)), int(opciones.get('offset', 0))]
+        return self.repo._proyectar(self.repo._docs(sql, valores), opciones.get('select', '*'))
+
+    def _ids(self, tabla, params):
+        consulta = _Consulta(tabla)
+        self.repo._asegurar_tabla(tabla)
+        where, valores = consulta.where(params)
+        return [f[0] for f in self.repo._conexion().execute(f'SELECT id FROM {tabla}{where}', valores)]
+
+    def insertar(self, tabla, cuerpo, upsert=False, on_conflict='id'):
+        filas = cuerpo if isinstance(cuerpo, list) else [cuerpo]
+        consulta = _Consulta(tabla)
+        claves = [c.strip() for c in (on_conflict or 'id').split(',')]
+        conn = self.repo._conexion()
+        self.repo._asegurar_tabla(tabla)
+        resultado = []
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            for fila in filas:
+                existente = None
+                if upsert and all(fila.get(c) is not None for c in claves):
+                    condicion = ' AND '.join(f'{consulta.expr(c)} = ?' for c in claves)
+                    existente = conn.execute(f'SELECT id FROM {tabla} WHERE {condicion}',
+                                             [str(fila[c]) if c == 'id' else fila[c] for c in claves]).fetchone()
+                if existente:
+                    resultado.append(self.repo._fusionar(tabla, existente[0], fila))
+                else:
+                    resultado.append(self.repo._insertar(tabla, fila))
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return resultado
+
+    def actualizar(self, tabla, params, cambios):
+        conn = self.repo._conexion()
+        self.repo._asegurar_tabla(tabla)
+        # Los ids se leen dentro de la transacción: nada se cuela entre el filtro y el UPDATE
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            filas = [self.repo._fusionar(tabla, i, cambios) for i in self._ids(tabla, params)]
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return filas
+
+    def eliminar(self, tabla, params):
+        conn = self.repo._conexion()
+        self.repo._asegurar_tabla(tabla)
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            ids = self._ids(tabla, params)
+            filas = []
+            if ids:
+                marcas = ','.join('?' * len(ids))
+                filas = self.repo._docs(f'SELECT doc FROM {tabla} WHERE id IN ({marcas})', ids)
+                conn.execute(f'DELETE FROM {tabla} WHERE id IN ({marcas})', ids)
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return filas
+
+    def rpc(self, nombre, args):
+        if nombre == 'dashboard_empresa':
+            return self.repo.dashboard_empresa(args['p_empresa_id'], int(args.get('p_limite', 11)))
+        if nombre == 'reporte_empresa':
+            return self.repo.reporte_empresa(args['p_empresa_id'])
+        if nombre == 'actualizar_entrevistas_lote':
+            return self.repo.actualizar_entrevistas_lote(args.get('p_filas') or [])
+        # Sin rollup en SQLite: los agregados se calculan al vuelo
+        if nombre == 'reconstruir_estadisticas':
+            return 0
+        if nombre == 'verificar_estadisticas':
+            return []
+        raise ErrorPostgrest(404, 'PGRST202', f"Función no encontrada: {nombre}")
+
+    # ── GoTrue ──
+    def crear_usuario_auth(self, email, password, user_id=None):
+        """Alta de credenciales para /auth/v1/signup (mismo formato que REPOSITORIO_BACKEND=sqlite)."""
+        try:
+            return self.repo.registrar_credenciales(email, password, user_id)
+        except Duplicado:
+            raise ErrorPostgrest(422, 'user_already_exists', 'User already registered')
+
+    def sesion(self, usuario):
+        ahora = int(time.time())
+        perfil = {
+            'id': usuario['id'], 'aud': 'authenticated', 'role': 'authenticated',
+            'email': usuario['email'], 'app_metadata': {'provider': 'email'}, 'user_metadata': {},
+            'created_at': usuario['created_at'],
+        }
+        return {
+            'access_token': token_falso({'sub': usuario['id'], 'email': usuario['email'],
+                                         'role': 'authenticated', 'exp': ahora + 3600}),
+            'refresh_token': uuid.uuid4().hex,
+            'token_type': 'bearer',
+            'expires_in': 3600,
+            'expires_at': ahora + 3600,
+            'user': perfil,
+        }
+
+    def iniciar_sesion(self, email, password):
+        usuario = self.repo.autenticar(email, password)
+        if usuario:
+            return self.sesion(usuario)
+        raise ErrorPostgrest(400, 'invalid_credentials', 'Invalid login credentials')
+
+
+def _crear_handler(local: SupabaseLocal):
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, formato, *args):
+            logger.debug(formato % args)
+
+        def _responder(self, estado, cuerpo=None, headers=None):
+            datos = b'' if cuerpo is None else json.dumps(cuerpo, ensure_ascii=False, default=str).encode('utf-8')
+            self.send_response(estado)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(datos)))
+            for clave, valor in (headers or {}).items():
+                self.send_header(clave, valor)
+            self.end_headers()
+            if datos:
+                self.wfile.write(datos)
+
+        def _cuerpo(self):
+            largo = int(self.headers.get('Content-Length') or 0)
+            return json.loads(self.rfile.read(largo) or b'null') if largo else None
+
+        def _atender(self, metodo):
+            url = urlsplit(self.path)
+            params = parse_qsl(url.query, keep_blank_values=True)
+            ruta = url.path.rstrip('/')
+            try:
+                if ruta == '/__local/stats':
+                    return self._responder(200, {'peticiones': dict(local.peticiones),
+                                                 'total': sum(local.peticiones.values())})
+                if ruta == '/__local/reset':
+                    local.peticiones.clear()
+                    return self._responder(204)
+
+                cuerpo = self._cuerpo() if metodo in ('POST', 'PATCH') else None
+                local.esperar()
+
+                if ruta.startswith('/auth/v1/'):
+                    return self._auth(metodo, ruta[len('/auth/v1/'):], cuerpo)
+                if ruta.startswith('/rest/v1/rpc/'):
+                    nombre = ruta[len('/rest/v1/rpc/'):]
+                    local.contar(f'RPC {nombre}')
+                    return self._responder(200, local.rpc(nombre, cuerpo or {}))
+                if ruta.startswith('/rest/v1/'):
+                    return self._rest(metodo, ruta[len('/rest/v1/'):], params, cuerpo)
+                raise ErrorPostgrest(404, 'PGRST000', f"Ruta no soportada: {ruta}")
+            except ErrorPostgrest as e:
+                self._responder(e.estado, {'code': e.codigo, 'message': e.mensaje, 'details': None, 'hint': None,
+                                           'msg': e.mensaje, 'error_code': e.codigo})
+            except (Duplicado, sqlite3.IntegrityError) as e:
+                self._responder(409, {'code': '23505', 'message': str(e), 'details': None, 'hint': None})
+            except Exception as e:
+                logger.exception(f"❌ supabase_local: {metodo} {self.path}")
+                self._responder(500, {'code': 'XX000', 'message': str(e), 'details': None, 'hint': None})
+
+        def _rest(self, metodo, tabla, params, cuerpo):
+            local.contar(f'{metodo} {tabla}')
+            prefer = self.headers.get('Prefer', '')
+            if metodo == 'GET':
+                filas = local.seleccionar(tabla, params)
+            elif metodo == 'POST':
+                opciones = dict(params)
+                filas = local.insertar(tabla, cuerpo, upsert='merge-duplicates' in prefer,
+                                       on_conflict=opciones.get('on_conflict'))
+                filas = local.repo._proyectar(filas, opciones.get('select', '*'))
+            elif metodo == 'PATCH':
+                filas = local.actualizar(tabla, params, cuerpo or {})
+            elif metodo == 'DELETE':
+                filas = local.eliminar(tabla, params)
+            else:
+                raise ErrorPostgrest(405, 'PGRST000', f"Método no soportado: {metodo}")
+
+            headers = {}
+            if 'count=' in prefer:
+                headers['Content-Range'] = f"0-{max(len(filas) - 1, 0)}/{len(filas)}"
+            if 'application/vnd.pgrst.object+json' in self.headers.get('Accept', ''):
+                if len(filas) != 1:
+                    raise ErrorPostgrest(406, 'PGRST116', f"JSON object requested, multiple (or no) rows returned ({len(filas)})")
+                return self._responder(200, filas[0], headers)
+            if metodo != 'GET' and 'return=minimal' in prefer:
+                return self._responder(204 if metodo != 'POST' else 201, None, headers)
+            return self._responder(201 if metodo == 'POST' else 200, filas, headers)
+
+        def _auth(self, metodo, ruta, cuerpo):
+            local.contar(f'AUTH {ruta}')
+            if ruta == 'token' and metodo == 'POST':
+                return self._responder(200, local.iniciar_sesion(cuerpo.get('email'), cuerpo.get('password')))
+            if ruta == 'signup' and metodo == 'POST':
+                usuario = local.crear_usuario_auth(cuerpo.get('email'), cuerpo.get('password'))
+                return self._responder(200, local.sesion(usuario))
+            if ruta == 'logout':
+                return self._responder(204)
+            raise ErrorPostgrest(404, 'not_found', f"Endpoint de auth no soportado: {ruta}")
+
+        def do_GET(self):
+            self._atender('GET')
+
+        def do_POST(self):
+            self._atender('POST')
+
+        def do_PATCH(self):
+            self._atender('PATCH')
+
+        def do_DELETE(self):
+            self._atender('DELETE')
+
+    return Handler
+
+
+def iniciar(local: SupabaseLocal, host='127.0.0.1', puerto=54321) -> ThreadingHTTPServer:
+    """Arranca el servidor en un hilo y lo retorna (server.shutdown() para detenerlo)."""
+    servidor = ThreadingHTTPServer((host, puerto), _crear_handler(local))
+    servidor.daemon_threads = True
+    threading.Thread(target=servidor.serve_forever, name='supabase-local', daemon=True).start()
+    return servidor
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description='Stand-in local de Supabase (PostgREST + auth) sobre SQLite')
+    parser.add_argument('--db', default=None, help='Archivo SQLite (por defecto REPOSITORIO_SQLITE_PATH)')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--puerto', type=int, default=54321)
+    parser.add_argument('--latencia', type=float, default=LATENCIA_MS, help='ms fijos por petición')
+    parser.add_argument('--jitter', type=float, default=JITTER_MS, help='media (ms) de la cola exponencial')
+    args = parser.parse_args()
+
+    local = SupabaseLocal(args.db, args.latencia, args.jitter)
+    servidor = ThreadingHTTPServer((args.host, args.puerto), _crear_handler(local))
+    servidor.daemon_threads = True
+    logger.info(f"✅ Supabase local en http://{args.host}:{args.puerto} ({local.repo.ruta}), "
+                f"latencia {args.latencia}ms + exp({args.jitter}ms)")
+    logger.info(f"   SUPABASE_URL=http://{args.host}:{args.puerto} SUPABASE_KEY={CLAVE_ANON}")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
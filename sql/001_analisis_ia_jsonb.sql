@@ -0,0 +1,43 @@
+-- ============================================
+-- entrevistas.analisis_ia: text (JSON serializado) -> jsonb
+-- ============================================
+-- 1. Cambio de tipo sin parsear (rápido, no falla con filas inválidas):
+--    las filas existentes quedan como jsonb de tipo string.
+ALTER TABLE entrevistas
+    ALTER COLUMN analisis_ia TYPE jsonb
+    USING CASE WHEN analisis_ia IS NULL THEN NULL ELSE to_jsonb(analisis_ia) END;
+
+-- 2. Backfill por lotes: convierte los strings en objetos JSON.
+--    Se invoca desde core/migracion.py (python -m core.migracion) hasta que retorne 0.
+CREATE OR REPLACE FUNCTION migrar_analisis_ia_lote(p_limite integer DEFAULT 500)
+RETURNS integer
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    fila record;
+    texto text;
+    valor jsonb;
+    convertidas integer := 0;
+BEGIN
+    FOR fila IN
+        SELECT id, analisis_ia FROM entrevistas
+        WHERE jsonb_typeof(analisis_ia) = 'string'
+        LIMIT p_limite
+        FOR UPDATE SKIP LOCKED
+    LOOP
+        texto := fila.analisis_ia #>> '{}';
+        BEGIN
+            valor := texto::jsonb;
+        EXCEPTION WHEN others THEN
+            valor := NULL;
+        END;
+        -- Texto libre heredado (no JSON): se conserva como resumen
+        IF valor IS NULL OR jsonb_typeof(valor) = 'string' THEN
+            valor := jsonb_build_object('resumen', texto);
+        END IF;
+        UPDATE entrevistas SET analisis_ia = valor WHERE id = fila.id;
+        convertidas := convertidas + 1;
+    END LOOP;
+    RETURN convertidas;
+END;
+$$;
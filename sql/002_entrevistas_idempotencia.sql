@@ -0,0 +1,21 @@
+-- ============================================
+-- entrevistas.clave_idempotencia: respaldo contra postulaciones duplicadas
+-- ============================================
+-- La clave la calcula /procesar (core/idempotencia.py). Las filas anteriores
+-- quedan en NULL, que no choca con la restricción UNIQUE.
+ALTER TABLE entrevistas
+    ADD COLUMN IF NOT EXISTS clave_idempotencia text;
+
+-- Solo la primera vez, para que la migración se pueda volver a correr
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_constraint
+        WHERE conname = 'entrevistas_clave_idempotencia_key'
+          AND conrelid = 'entrevistas'::regclass
+    ) THEN
+        ALTER TABLE entrevistas
+            ADD CONSTRAINT entrevistas_clave_idempotencia_key UNIQUE (clave_idempotencia);
+    END IF;
+END;
+$$;
@@ -0,0 +1,76 @@
+-- ============================================
+-- reporte_empresa: agregados de /reportes calculados en la base de datos
+-- ============================================
+-- Retorna un único jsonb con los totales, conteos por veredicto y estado,
+-- rendimiento por vacante y evolución mensual. La ruta ya no descarga las
+-- entrevistas de la empresa. Se invoca con supabase.rpc('reporte_empresa', ...).
+-- Los índices sirven tanto al reporte como a la paginación por cursor de
+-- /dashboard (fecha, id) y /candidatos (score, id).
+
+CREATE INDEX IF NOT EXISTS idx_entrevistas_empresa_fecha
+    ON entrevistas (empresa_id, fecha DESC NULLS LAST, id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_entrevistas_empresa_score
+    ON entrevistas (empresa_id, score DESC NULLS LAST, id DESC);
+
+CREATE OR REPLACE FUNCTION reporte_empresa(p_empresa_id entrevistas.empresa_id%TYPE)
+RETURNS jsonb
+LANGUAGE sql
+STABLE
+AS $$
+    WITH e AS (
+        SELECT vacante_id,
+               coalesce(score, 0)::numeric AS score,
+               veredicto,
+               nullif(estado, '') AS estado,
+               left(fecha::text, 7) AS mes
+        FROM entrevistas
+        WHERE empresa_id = p_empresa_id
+    ),
+    totales AS (
+        SELECT count(*) AS total_c,
+               coalesce(round(avg(score), 1), 0) AS score_promedio,
+               count(*) FILTER (WHERE veredicto = 'RECOMENDADO') AS recomendados,
+               count(*) FILTER (WHERE veredicto = 'NO RECOMENDADO') AS no_recomendados,
+               count(*) FILTER (WHERE veredicto = 'REVISAR') AS a_revisar,
+               count(*) FILTER (WHERE estado = 'Finalista') AS finalistas,
+               count(*) FILTER (WHERE estado = 'Contratado') AS contratados,
+               count(*) FILTER (WHERE estado = 'Descartado') AS descartados,
+               count(*) FILTER (WHERE estado IS NULL) AS sin_estado
+        FROM e
+    ),
+    por_vacante AS (
+        SELECT v.cargo,
+               count(*) AS total,
+               round(avg(e.score), 1) AS score_promedio,
+               round(100.0 * count(*) FILTER (WHERE e.veredicto = 'RECOMENDADO') / count(*))::int AS tasa_aprobacion,
+               count(*) FILTER (WHERE e.estado = 'Finalista') AS finalistas,
+               count(*) FILTER (WHERE e.estado = 'Contratado') AS contratados
+        FROM e
+        JOIN vacantes v ON v.id = e.vacante_id AND v.empresa_id = p_empresa_id
+        GROUP BY v.id, v.cargo
+    ),
+    por_mes AS (
+        SELECT mes,
+               count(*) AS total,
+               round(avg(score), 1) AS score_promedio
+        FROM e
+        WHERE length(mes) = 7
+        GROUP BY mes
+    )
+    SELECT jsonb_build_object(
+        'total_c',         t.total_c,
+        'total_v',         (SELECT count(*) FROM vacantes WHERE empresa_id = p_empresa_id),
+        'score_promedio',  t.score_promedio,
+        'recomendados',    t.recomendados,
+        'no_recomendados', t.no_recomendados,
+        'a_revisar',       t.a_revisar,
+        'finalistas',      t.finalistas,
+        'contratados',     t.contratados,
+        'descartados',     t.descartados,
+        'sin_estado',      t.sin_estado,
+        'por_vacante',     coalesce((SELECT jsonb_agg(to_jsonb(pv) ORDER BY pv.score_promedio DESC) FROM por_vacante pv), '[]'::jsonb),
+        'evolucion',       coalesce((SELECT jsonb_agg(to_jsonb(pm) ORDER BY pm.mes) FROM por_mes pm), '[]'::jsonb)
+    )
+    FROM totales t;
+$$;
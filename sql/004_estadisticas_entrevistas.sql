@@ -0,0 +1,260 @@
+-- ============================================
+-- estadisticas_entrevistas: rollup incremental por empresa / vacante / mes
+-- ============================================
+-- Un trigger sobre entrevistas aplica el delta (-fila vieja, +fila nueva) en
+-- cada INSERT, UPDATE y DELETE, así que cualquier escritura (workers de
+-- /procesar, actualizar_estado, guardar_evaluacion, eliminar_candidato, el
+-- re-scoring masivo) mantiene el rollup al día. reporte_empresa pasa a leer
+-- de aquí: su costo depende de vacantes x meses, no del número de candidatos.
+--
+-- Recuperación ante desvíos (python -m core.estadisticas):
+--   reconstruir_estadisticas(empresa) recalcula desde entrevistas
+--   verificar_estadisticas(empresa)   lista las diferencias contra entrevistas
+--
+-- Requiere PostgreSQL 15 o superior (Supabase ya corre 15+): la clave única usa
+-- UNIQUE NULLS NOT DISTINCT para que las entrevistas sin vacante (vacante_id
+-- NULL) caigan en una sola fila por empresa y mes, y el upsert del trigger
+-- depende de esa constraint (ON CONFLICT ON CONSTRAINT).
+
+-- 1. Tabla (empresa_id y vacante_id heredan el tipo de entrevistas)
+CREATE TABLE IF NOT EXISTS estadisticas_entrevistas AS
+SELECT empresa_id,
+       vacante_id,
+       ''::text      AS mes,
+       0::bigint     AS total,
+       0::numeric    AS suma_score,
+       0::bigint     AS recomendados,
+       0::bigint     AS no_recomendados,
+       0::bigint     AS a_revisar,
+       0::bigint     AS finalistas,
+       0::bigint     AS contratados,
+       0::bigint     AS descartados,
+       0::bigint     AS sin_estado,
+       0::bigint     AS entrevistados,
+       0::numeric    AS suma_score_final
+FROM entrevistas
+WITH NO DATA;
+
+-- CREATE TABLE ... AS no admite constraints: se agrega aparte, solo la
+-- primera vez, para que la migración se pueda volver a correr
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_constraint
+        WHERE conname = 'estadisticas_entrevistas_clave'
+          AND conrelid = 'estadisticas_entrevistas'::regclass
+    ) THEN
+        ALTER TABLE estadisticas_entrevistas
+            ADD CONSTRAINT estadisticas_entrevistas_clave
+            UNIQUE NULLS NOT DISTINCT (empresa_id, vacante_id, mes);
+    END IF;
+END;
+$$;
+
+-- 2. Delta de una fila (p_signo = 1 al agregar, -1 al quitar)
+CREATE OR REPLACE FUNCTION _estadisticas_aplicar(p_fila entrevistas, p_signo integer)
+RETURNS void
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    IF p_fila.empresa_id IS NULL THEN
+        RETURN;
+    END IF;
+
+    INSERT INTO estadisticas_entrevistas AS s (
+        empresa_id, vacante_id, mes, total, suma_score,
+        recomendados, no_recomendados, a_revisar,
+        finalistas, contratados, descartados, sin_estado,
+        entrevistados, suma_score_final
+    )
+    VALUES (
+        p_fila.empresa_id,
+        p_fila.vacante_id,
+        coalesce(left(p_fila.fecha::text, 7), ''),
+        p_signo,
+        p_signo * coalesce(p_fila.score, 0)::numeric,
+        p_signo * (p_fila.veredicto IS NOT DISTINCT FROM 'RECOMENDADO')::int,
+        p_signo * (p_fila.veredicto IS NOT DISTINCT FROM 'NO RECOMENDADO')::int,
+        p_signo * (p_fila.veredicto IS NOT DISTINCT FROM 'REVISAR')::int,
+        p_signo * (p_fila.estado IS NOT DISTINCT FROM 'Finalista')::int,
+        p_signo * (p_fila.estado IS NOT DISTINCT FROM 'Contratado')::int,
+        p_signo * (p_fila.estado IS NOT DISTINCT FROM 'Descartado')::int,
+        p_signo * (nullif(p_fila.estado, '') IS NULL)::int,
+        p_signo * (p_fila.score_final_combinado IS NOT NULL)::int,
+        p_signo * coalesce(p_fila.score_final_combinado, 0)::numeric
+    )
+    ON CONFLICT ON CONSTRAINT estadisticas_entrevistas_clave DO UPDATE SET
+        total            = s.total + excluded.total,
+        suma_score       = s.suma_score + excluded.suma_score,
+        recomendados     = s.recomendados + excluded.recomendados,
+        no_recomendados  = s.no_recomendados + excluded.no_recomendados,
+        a_revisar        = s.a_revisar + excluded.a_revisar,
+        finalistas       = s.finalistas + excluded.finalistas,
+        contratados      = s.contratados + excluded.contratados,
+        descartados      = s.descartados + excluded.descartados,
+        sin_estado       = s.sin_estado + excluded.sin_estado,
+        entrevistados    = s.entrevistados + excluded.entrevistados,
+        suma_score_final = s.suma_score_final + excluded.suma_score_final;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION trg_estadisticas_entrevistas()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM _estadisticas_aplicar(OLD, -1);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM _estadisticas_aplicar(NEW, 1);
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS estadisticas_entrevistas_sync ON entrevistas;
+CREATE TRIGGER estadisticas_entrevistas_sync
+    AFTER INSERT OR DELETE
+       OR UPDATE OF empresa_id, vacante_id, fecha, score, veredicto, estado, score_final_combinado
+    ON entrevistas
+    FOR EACH ROW EXECUTE FUNCTION trg_estadisticas_entrevistas();
+
+-- 3. Agregado "de verdad" calculado desde entrevistas (base de rebuild y verificación)
+CREATE OR REPLACE FUNCTION _estadisticas_desde_entrevistas(p_empresa_id entrevistas.empresa_id%TYPE)
+RETURNS SETOF estadisticas_entrevistas
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT empresa_id,
+           vacante_id,
+           coalesce(left(fecha::text, 7), '') AS mes,
+           count(*),
+           sum(coalesce(score, 0)::numeric),
+           count(*) FILTER (WHERE veredicto = 'RECOMENDADO'),
+           count(*) FILTER (WHERE veredicto = 'NO RECOMENDADO'),
+           count(*) FILTER (WHERE veredicto = 'REVISAR'),
+           count(*) FILTER (WHERE estado = 'Finalista'),
+           count(*) FILTER (WHERE estado = 'Contratado'),
+           count(*) FILTER (WHERE estado = 'Descartado'),
+           count(*) FILTER (WHERE nullif(estado, '') IS NULL),
+           count(*) FILTER (WHERE score_final_combinado IS NOT NULL),
+           sum(coalesce(score_final_combinado, 0)::numeric)
+    FROM entrevistas
+    WHERE empresa_id IS NOT NULL
+      AND (p_empresa_id IS NULL OR empresa_id = p_empresa_id)
+    GROUP BY 1, 2, 3;
+$$;
+
+-- 4. Rebuild (toda la tabla o una empresa). Bloquea escrituras en entrevistas
+--    mientras corre para que ningún trigger se cruce con el recálculo.
+CREATE OR REPLACE FUNCTION reconstruir_estadisticas(p_empresa_id entrevistas.empresa_id%TYPE DEFAULT NULL)
+RETURNS integer
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    filas integer;
+BEGIN
+    LOCK TABLE entrevistas IN SHARE MODE;
+    DELETE FROM estadisticas_entrevistas
+    WHERE p_empresa_id IS NULL OR empresa_id = p_empresa_id;
+    INSERT INTO estadisticas_entrevistas
+    SELECT * FROM _estadisticas_desde_entrevistas(p_empresa_id);
+    GET DIAGNOSTICS filas = ROW_COUNT;
+    RETURN filas;
+END;
+$$;
+
+-- 5. Verificación: diferencias entre el rollup y entrevistas (vacío = consistente)
+CREATE OR REPLACE FUNCTION verificar_estadisticas(p_empresa_id entrevistas.empresa_id%TYPE DEFAULT NULL)
+RETURNS jsonb
+LANGUAGE sql
+STABLE
+AS $$
+    WITH calculado AS (
+        SELECT * FROM _estadisticas_desde_entrevistas(p_empresa_id)
+    ),
+    rollup AS (
+        SELECT * FROM estadisticas_entrevistas
+        WHERE (p_empresa_id IS NULL OR empresa_id = p_empresa_id)
+          AND (total <> 0 OR suma_score <> 0 OR entrevistados <> 0 OR suma_score_final <> 0)
+    )
+    SELECT coalesce(jsonb_agg(jsonb_build_object(
+               'empresa_id', coalesce(r.empresa_id, s.empresa_id),
+               'vacante_id', coalesce(r.vacante_id, s.vacante_id),
+               'mes',        coalesce(r.mes, s.mes),
+               'calculado',  to_jsonb(r),
+               'rollup',     to_jsonb(s)
+           )), '[]'::jsonb)
+    FROM calculado r
+    FULL OUTER JOIN rollup s
+      ON s.empresa_id = r.empresa_id
+     AND coalesce(s.vacante_id::text, '') = coalesce(r.vacante_id::text, '')
+     AND s.mes = r.mes
+    WHERE to_jsonb(r) IS DISTINCT FROM to_jsonb(s);
+$$;
+
+-- 6. /reportes ahora lee el rollup (misma forma de respuesta que en 003)
+CREATE OR REPLACE FUNCTION reporte_empresa(p_empresa_id entrevistas.empresa_id%TYPE)
+RETURNS jsonb
+LANGUAGE sql
+STABLE
+AS $$
+    WITH s AS (
+        SELECT * FROM estadisticas_entrevistas
+        WHERE empresa_id = p_empresa_id AND total > 0
+    ),
+    totales AS (
+        SELECT coalesce(sum(total), 0)::bigint AS total_c,
+               coalesce(round(sum(suma_score) / nullif(sum(total), 0), 1), 0) AS score_promedio,
+               coalesce(sum(recomendados), 0)::bigint AS recomendados,
+               coalesce(sum(no_recomendados), 0)::bigint AS no_recomendados,
+               coalesce(sum(a_revisar), 0)::bigint AS a_revisar,
+               coalesce(sum(finalistas), 0)::bigint AS finalistas,
+               coalesce(sum(contratados), 0)::bigint AS contratados,
+               coalesce(sum(descartados), 0)::bigint AS descartados,
+               coalesce(sum(sin_estado), 0)::bigint AS sin_estado,
+               coalesce(sum(entrevistados), 0)::bigint AS entrevistados,
+               round(sum(suma_score_final) / nullif(sum(entrevistados), 0), 1) AS score_final_promedio
+        FROM s
+    ),
+    por_vacante AS (
+        SELECT v.cargo,
+               sum(s.total)::bigint AS total,
+               round(sum(s.suma_score) / sum(s.total), 1) AS score_promedio,
+               round(100.0 * sum(s.recomendados) / sum(s.total))::int AS tasa_aprobacion,
+               sum(s.finalistas)::bigint AS finalistas,
+               sum(s.contratados)::bigint AS contratados
+        FROM s
+        JOIN vacantes v ON v.id = s.vacante_id AND v.empresa_id = p_empresa_id
+        GROUP BY v.id, v.cargo
+    ),
+    por_mes AS (
+        SELECT mes,
+               sum(total)::bigint AS total,
+               round(sum(suma_score) / sum(total), 1) AS score_promedio
+        FROM s
+        WHERE length(mes) = 7
+        GROUP BY mes
+    )
+    SELECT jsonb_build_object(
+        'total_c',              t.total_c,
+        'total_v',              (SELECT count(*) FROM vacantes WHERE empresa_id = p_empresa_id),
+        'score_promedio',       t.score_promedio,
+        'recomendados',         t.recomendados,
+        'no_recomendados',      t.no_recomendados,
+        'a_revisar',            t.a_revisar,
+        'finalistas',           t.finalistas,
+        'contratados',          t.contratados,
+        'descartados',          t.descartados,
+        'sin_estado',           t.sin_estado,
+        'entrevistados',        t.entrevistados,
+        'score_final_promedio', t.score_final_promedio,
+        'por_vacante',          coalesce((SELECT jsonb_agg(to_jsonb(pv) ORDER BY pv.score_promedio DESC) FROM por_vacante pv), '[]'::jsonb),
+        'evolucion',            coalesce((SELECT jsonb_agg(to_jsonb(pm) ORDER BY pm.mes) FROM por_mes pm), '[]'::jsonb)
+    )
+    FROM totales t;
+$$;
+
+-- 7. Carga inicial
+SELECT reconstruir_estadisticas();
@@ -0,0 +1,40 @@
+-- ============================================
+-- dashboard_empresa: todo lo que pinta /dashboard en un solo viaje
+-- ============================================
+-- Retorna un jsonb con las vacantes de la empresa (id, cargo), los totales
+-- del rollup estadisticas_entrevistas (sql/004) y la primera página de
+-- tarjetas en el orden de la paginación por cursor (fecha desc, id desc),
+-- servida por idx_entrevistas_empresa_fecha (sql/003). p_limite se pide con
+-- una fila de más para saber si hay página siguiente. El cargo de cada
+-- tarjeta se resuelve en la app con un índice {vacante_id: cargo}.
+-- Se invoca con supabase.rpc('dashboard_empresa', ...).
+
+CREATE OR REPLACE FUNCTION dashboard_empresa(p_empresa_id entrevistas.empresa_id%TYPE, p_limite integer DEFAULT 11)
+RETURNS jsonb
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT jsonb_build_object(
+        'vacantes', coalesce((
+            SELECT jsonb_agg(jsonb_build_object('id', v.id, 'cargo', v.cargo))
+            FROM vacantes v
+            WHERE v.empresa_id = p_empresa_id
+        ), '[]'::jsonb),
+        'total_c', coalesce((
+            SELECT sum(total)::bigint FROM estadisticas_entrevistas WHERE empresa_id = p_empresa_id
+        ), 0),
+        'total_recomendados', coalesce((
+            SELECT sum(recomendados)::bigint FROM estadisticas_entrevistas WHERE empresa_id = p_empresa_id
+        ), 0),
+        'tarjetas', coalesce((
+            SELECT jsonb_agg(to_jsonb(t) ORDER BY t.fecha DESC NULLS LAST, t.id DESC)
+            FROM (
+                SELECT id, vacante_id, nombre_candidato, score, veredicto, tag, estado, fecha
+                FROM entrevistas
+                WHERE empresa_id = p_empresa_id
+                ORDER BY fecha DESC NULLS LAST, id DESC
+                LIMIT p_limite
+            ) t
+        ), '[]'::jsonb)
+    );
+$$;
@@ -0,0 +1,45 @@
+-- ============================================
+-- actualizar_entrevistas_lote: UPDATE por id de muchas entrevistas en un viaje
+-- ============================================
+-- p_filas es un array jsonb de objetos con "id" y las columnas a cambiar;
+-- todas las filas deben traer las mismas columnas (las de la primera). Es un
+-- UPDATE, no un upsert: no toca el resto de columnas ni necesita las NOT NULL,
+-- y un id inexistente simplemente no cuenta. Las columnas se validan contra
+-- el catálogo y se citan con %I. El trigger de sql/004 mantiene el rollup.
+-- Lo usa el re-scoring masivo (core/bulk_rescoring.py) a través de
+-- RepositorioSupabase.actualizar_entrevistas_lote. Retorna las filas actualizadas.
+
+CREATE OR REPLACE FUNCTION actualizar_entrevistas_lote(p_filas jsonb)
+RETURNS integer
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_asignaciones text;
+    v_actualizadas integer;
+BEGIN
+    IF p_filas IS NULL OR jsonb_array_length(p_filas) = 0 THEN
+        RETURN 0;
+    END IF;
+
+    SELECT string_agg(format('%I = r.%I', c.column_name, c.column_name), ', ')
+    INTO v_asignaciones
+    FROM jsonb_object_keys(p_filas -> 0) AS k(nombre)
+    JOIN information_schema.columns c
+      ON c.table_schema = 'public'
+     AND c.table_name = 'entrevistas'
+     AND c.column_name = k.nombre
+    WHERE k.nombre <> 'id';
+
+    IF v_asignaciones IS NULL THEN
+        RETURN 0;
+    END IF;
+
+    EXECUTE format(
+        'UPDATE entrevistas e SET %s FROM jsonb_populate_recordset(NULL::entrevistas, $1) r WHERE e.id = r.id',
+        v_asignaciones
+    ) USING p_filas;
+
+    GET DIAGNOSTICS v_actualizadas = ROW_COUNT;
+    RETURN v_actualizadas;
+END;
+$$;
@@ -0,0 +1,135 @@
+"""
+storage/cola_envios.py
+Cola local y durable (SQLite) de postulaciones pendientes de procesar
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+COLA_PATH = os.getenv('COLA_ENVIOS_PATH', os.path.join(os.path.dirname(__file__), 'cola_envios.db'))
+
+# Un envío "procesando" más viejo que esto se considera huérfano (worker caído)
+TIMEOUT_PROCESANDO = 300
+# Los envíos hechos se conservan este tiempo para descartar reenvíos duplicados
+RETENCION_HECHOS = 600
+
+_local = threading.local()
+
+
+def _conexion() -> sqlite3.Connection:
+    conn = getattr(_local, 'conn', None)
+    if conn is None or getattr(_local, 'pid', None) != os.getpid():
+        conn = sqlite3.connect(COLA_PATH, timeout=30, isolation_level=None)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=FULL')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS envios (
+                id TEXT PRIMARY KEY,
+                payload TEXT NOT NULL,
+                estado TEXT NOT NULL DEFAULT 'pendiente',
+                intentos INTEGER NOT NULL DEFAULT 0,
+                proximo_intento REAL NOT NULL,
+                tomado_en REAL,
+                creado REAL NOT NULL,
+                error TEXT
+            )
+        ''')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_envios_estado ON envios (estado, proximo_intento)')
+        _local.conn = conn
+        _local.pid = os.getpid()
+    return conn
+
+
+def encolar(payload: dict, envio_id: str = None) -> bool:
+    """
+    Guarda el envío en disco; al volver, ya es durable. Con un envio_id
+    (clave de idempotencia) que ya está pendiente o hecho no hace nada.
+    Retorna True si el envío quedó encolado.
+    """
+    envio_id = envio_id or str(uuid.uuid4())
+    ahora = time.time()
+    cursor = _conexion().execute(
+        'INSERT INTO envios (id, payload, proximo_intento, creado) VALUES (?, ?, ?, ?) '
+        # Un duplicado solo se vuelve a encolar si el anterior terminó en error
+        "ON CONFLICT (id) DO UPDATE SET estado = 'pendiente', intentos = 0, error = NULL, "
+        "payload = excluded.payload, proximo_intento = excluded.proximo_intento "
+        "WHERE envios.estado = 'error'",
+        (envio_id, json.dumps(payload, ensure_ascii=False), ahora, ahora)
+    )
+    return cursor.rowcount == 1
+
+
+def tomar_siguiente(max_intentos: int):
+    """
+    Reclama de forma atómica el siguiente envío listo para procesar.
+    Retorna (id, payload, intentos) o None si no hay trabajo.
+
+    Un envío huérfano cuenta como un intento fallido: si es el que tumba al
+    worker no se reintenta para siempre, queda en 'error' al llegar a
+    `max_intentos`.
+    """
+    conn = _conexion()
+    ahora = time.time()
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        conn.execute(
+            "DELETE FROM envios WHERE estado = 'hecho' AND tomado_en < ?",
+            (ahora - RETENCION_HECHOS,)
+        )
+        # Recuperar envíos que quedaron "procesando" por un worker caído
+        conn.execute(
+            "UPDATE envios SET intentos = intentos + 1, error = ?, "
+            "estado = CASE WHEN intentos + 1 >= ? THEN 'error' ELSE 'pendiente' END "
+            "WHERE estado = 'procesando' AND tomado_en < ?",
+            (f"Sin terminar tras {TIMEOUT_PROCESANDO}s (worker caído)", max_intentos, ahora - TIMEOUT_PROCESANDO)
+        )
+        fila = conn.execute(
+            "SELECT id, payload, intentos FROM envios "
+            "WHERE estado = 'pendiente' AND proximo_intento <= ? "
+            "ORDER BY creado LIMIT 1",
+            (ahora,)
+        ).fetchone()
+        if fila:
+            conn.execute(
+                "UPDATE envios SET estado = 'procesando', tomado_en = ? WHERE id = ?",
+                (ahora, fila[0])
+            )
+        conn.execute('COMMIT')
+    except Exception:
+        conn.execute('ROLLBACK')
+        raise
+    if not fila:
+        return None
+    return fila[0], json.loads(fila[1]), fila[2]
+
+
+def marcar_hecho(envio_id: str):
+    _conexion().execute(
+        "UPDATE envios SET estado = 'hecho', tomado_en = ?, payload = '{}' WHERE id = ?",
+        (time.time(), envio_id)
+    )
+
+
+def reprogramar(envio_id: str, error: str, espera: float):
+    _conexion().execute(
+        "UPDATE envios SET estado = 'pendiente', intentos = intentos + 1, "
+        "proximo_intento = ?, error = ? WHERE id = ?",
+        (time.time() + espera, error, envio_id)
+    )
+
+
+def marcar_fallido(envio_id: str, error: str):
+    """Deja el envío en estado 'error' para revisión manual (no se reintenta)."""
+    _conexion().execute(
+        "UPDATE envios SET estado = 'error', intentos = intentos + 1, error = ? WHERE id = ?",
+        (error, envio_id)
+    )
+
+
+def contar_por_estado() -> dict:
+    filas = _conexion().execute('SELECT estado, COUNT(*) FROM envios GROUP BY estado').fetchall()
+    return dict(filas)
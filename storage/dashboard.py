@@ -0,0 +1,75 @@
+"""
+storage/dashboard.py
+Datos de /dashboard en un solo viaje (dashboard_empresa del repositorio) con caché por empresa
+
+La caché guarda el view-model ya armado (vacantes, tarjetas de la primera
+página, cursor y totales) y se invalida en cada escritura que cambia lo que
+muestra el dashboard. El TTL acota el desfase entre procesos (los workers de
+/procesar corren aparte y solo invalidan su propia copia).
+"""
+
+import os
+
+from core.cache import CacheTTL
+from storage.repositorio import repositorio
+from storage.paginacion import cortar_pagina
+
+TARJETAS_POR_PAGINA = 10
+TTL_DASHBOARD = float(os.getenv('DASHBOARD_CACHE_TTL', '30'))
+MAX_DASHBOARD = int(os.getenv('DASHBOARD_CACHE_MAX', '1024'))
+
+_cache = CacheTTL(max_items=MAX_DASHBOARD, ttl=TTL_DASHBOARD)
+
+
+def tarjeta_candidato(fila: dict, cargos: dict = None) -> dict:
+    """
+    View-model de una tarjeta. El cargo sale del índice {vacante_id: cargo}
+    o, si la fila viene de un select con vacantes(cargo) embebido, de ahí.
+    """
+    cargo = (cargos or {}).get(fila.get('vacante_id')) or (fila.get('vacantes') or {}).get('cargo')
+    return {
+        "id": fila['id'],
+        "nombre": fila['nombre_candidato'],
+        "cargo": cargo or "N/A",
+        "score": fila['score'],
+        "veredicto": fila['veredicto'],
+        "tag": fila['tag'],
+        "fecha": fila['fecha'][:10] if fila.get('fecha') else "N/A",
+        "estado": fila.get('estado', None)
+    }
+
+
+def obtener_dashboard(empresa_id: str) -> dict:
+    """
+    {vacantes, tarjetas, siguiente_cursor, total_c, total_recomendados} de la
+    empresa. El dict es compartido: no modificarlo.
+    """
+    clave = str(empresa_id)
+    datos = _cache.get(clave)
+    if datos is not None:
+        return datos
+
+    crudo = repositorio.dashboard_empresa(empresa_id, TARJETAS_POR_PAGINA + 1) or {}
+
+    vacantes = crudo.get('vacantes') or []
+    cargos = {v['id']: v['cargo'] for v in vacantes}
+    filas, siguiente_cursor = cortar_pagina(crudo.get('tarjetas') or [], 'fecha', TARJETAS_POR_PAGINA)
+
+    datos = {
+        "vacantes": vacantes,
+        "tarjetas": [tarjeta_candidato(f, cargos) for f in filas],
+        "siguiente_cursor": siguiente_cursor,
+        "total_c": crudo.get('total_c') or 0,
+        "total_recomendados": crudo.get('total_recomendados') or 0,
+    }
+    _cache.set(clave, datos)
+    return datos
+
+
+def invalidar_dashboard(empresa_id):
+    if empresa_id:
+        _cache.invalidar(str(empresa_id))
+
+
+def stats() -> dict:
+    return _cache.stats()
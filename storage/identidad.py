@@ -0,0 +1,36 @@
+"""
+storage/identidad.py
+Contexto de identidad del usuario logueado (usuario, empresa y rol de super admin)
+"""
+
+import os
+
+from storage.repositorio import repositorio
+
+# Tiempo que el contexto firmado en la sesión se considera vigente antes de
+# volver a consultarlo. Es también la demora máxima para ver un cambio de rol o
+# de empresa: la copia vive en la cookie de cada usuario y ninguna ruta de la
+# app cambia roles (se hacen en Supabase), así que no hay nada que invalidar
+IDENTIDAD_TTL = int(os.getenv('IDENTIDAD_TTL', '60'))
+
+
+def cargar_identidad(user_id, empresa_id):
+    """
+    Consulta en el repositorio el usuario, su empresa y si es super admin activo.
+    Retorna None si el usuario no existe. Solo guarda los campos que usan
+    las vistas, para que quepa en la cookie de sesión.
+    """
+    usuario = repositorio.usuario(user_id, 'id, email, nombre_completo, empresa_id')
+    if not usuario:
+        return None
+
+    empresa = repositorio.empresa(empresa_id, 'id, nombre_empresa')
+    es_super_admin = bool(usuario.get('email')) and repositorio.es_super_admin(usuario['email'])
+
+    return {
+        "user_id": user_id,
+        "empresa_id": empresa_id,
+        "usuario": usuario,
+        "empresa": empresa,
+        "es_super_admin": es_super_admin
+    }
@@ -1,39 +1,31 @@
-import json
 import os
-from supabase import create_client
+from storage.repositorio import repositorio
+from storage.vacantes_cache import obtener_vacante
 
-# Configuración de conexión (Asegúrate de tener estas variables en tu .env o en Render)
-SUPABASE_URL = os.environ.get("SUPABASE_URL")
-SUPABASE_KEY = os.environ.get("SUPABASE_KEY")
-supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
-
-# --- GESTIÓN DE VACANTES (Sincronizado con Supabase) ---
+# --- GESTIÓN DE VACANTES (a través del repositorio: Supabase o SQLite local) ---
 
 def load_vacantes():
-    """Carga vacantes directamente desde Supabase"""
+    """Carga todas las vacantes del repositorio configurado"""
     try:
-        res = supabase.table('vacantes').select('*').execute()
         # Convertimos a diccionario para mantener compatibilidad con tu código actual
-        return {str(v['id']): v for v in res.data}
+        return {str(v['id']): v for v in repositorio.listar_vacantes()}
     except Exception as e:
         print(f"❌ Error cargando vacantes: {e}")
         return {}
 
 def get_vacante_by_id(vacante_id):
-    """Retorna una vacante específica desde Supabase"""
+    """Retorna una vacante específica"""
     try:
-        res = supabase.table('vacantes').select('*').eq('id', vacante_id).execute()
-        return res.data[0] if res.data else None
+        return obtener_vacante(vacante_id)
     except:
         return None
 
 # --- ENTREVISTAS (EL CAMBIO CLAVE) ---
 
 def load_interviews():
-    """Carga entrevistas desde Supabase para que la consola las vea"""
+    """Carga entrevistas del repositorio para que la consola las vea"""
     try:
-        res = supabase.table('entrevistas').select('*').execute()
-        return res.data
+        return repositorio.listar_entrevistas()
     except Exception as e:
         print(f"❌ Error cargando historial: {e}")
         return []
@@ -55,7 +47,7 @@ def save_interview(data):
             "fecha": data.get('fecha_evaluacion')
         }
         
-        res = supabase.table('entrevistas').insert(payload).execute()
+        res = repositorio.crear_entrevista(payload)
         print("✅ Guardado exitoso con datos de contacto")
         return res
     except Exception as e:
@@ -0,0 +1,79 @@
+"""
+storage/paginacion.py
+Paginación por cursor (keyset) sobre PostgREST: orden (columna, id) descendente
+"""
+
+import base64
+import json
+
+TAMANO_PAGINA = 50
+MAX_TAMANO_PAGINA = 200
+
+
+def tamano_pagina(valor) -> int:
+    """Normaliza el ?limite= del request al rango permitido."""
+    try:
+        limite = int(valor)
+    except (TypeError, ValueError):
+        return TAMANO_PAGINA
+    return max(1, min(limite, MAX_TAMANO_PAGINA))
+
+
+def codificar_cursor(valor, fila_id) -> str:
+    datos = json.dumps([valor, fila_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(datos.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decodificar_cursor(cursor: str):
+    """Retorna (valor, id) o None si el cursor falta o no es válido."""
+    if not cursor:
+        return None
+    try:
+        relleno = '=' * (-len(cursor) % 4)
+        valor, fila_id = json.loads(base64.urlsafe_b64decode(cursor + relleno))
+        return valor, fila_id
+    except (ValueError, TypeError):
+        return None
+
+
+def _literal(valor) -> str:
+    # Entre comillas para que PostgREST no interprete '.', ',' o ':' del valor
+    return '"' + str(valor).replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+
+def pagina_keyset(query, columna: str, cursor: str = None, limite: int = TAMANO_PAGINA):
+    """
+    Aplica orden (columna desc, id desc) y el corte del cursor a `query`
+    (un select de supabase ya filtrado por empresa) y la ejecuta.
+    Retorna (filas, siguiente_cursor); siguiente_cursor es None en la última página.
+    Las filas con la columna en NULL van al final, también ordenadas por id.
+    """
+    query = query.order(columna, desc=True, nullsfirst=False).order('id', desc=True)
+
+    posicion = decodificar_cursor(cursor)
+    if posicion is not None:
+        valor, fila_id = posicion
+        if valor is None:
+            query = query.is_(columna, 'null').lt('id', fila_id)
+        else:
+            query = query.or_(
+                f"{columna}.lt.{_literal(valor)},"
+                f"and({columna}.eq.{_literal(valor)},id.lt.{_literal(fila_id)}),"
+                f"{columna}.is.null"
+            )
+
+    return cortar_pagina(query.limit(limite + 1).execute().data or [], columna, limite)
+
+
+def cortar_pagina(filas: list, columna: str, limite: int):
+    """
+    Recibe hasta limite + 1 filas ya ordenadas por (columna desc, id desc) y
+    retorna (filas[:limite], siguiente_cursor). Sirve también para la primera
+    página que llega embebida en una RPC.
+    """
+    # Una fila de más indica si hay otra página sin contar el total
+    if len(filas) <= limite:
+        return filas, None
+    filas = filas[:limite]
+    ultima = filas[-1]
+    return filas, codificar_cursor(ultima[columna], ultima['id'])
@@ -0,0 +1,180 @@
+"""
+storage/perfil_consultas.py
+Perfil de consultas a Supabase por request (modo debug)
+
+Con PERFIL_CONSULTAS=1 cada request HTTP de la app registra todas sus
+consultas (tabla, operación, filtros, filas, bytes y ms) y responde con un
+resumen en los headers:
+
+    X-Perfil-Consultas: consultas=4; ms=38.2; bytes=5120; filas=27; repetidas=1
+    Server-Timing: supabase;dur=38.2;desc="4 consultas"
+
+Dos consultas tienen la misma forma si van a la misma tabla con la misma
+operación, columnas y operadores, aunque cambien los valores
+(`id=eq.5` y `id=eq.9`). Una forma que se repite UMBRAL_REPETIDAS veces o
+más en el mismo request es casi siempre un N+1 y se loguea como warning.
+
+Fuera de la app (scripts, pruebas) se usa el context manager:
+
+    with perfilar() as perfil:
+        cliente.get('/dashboard')
+    assert perfil.total <= 3 and not perfil.repetidas()
+
+Sin perfil activo el transporte no hace nada más que leer un ContextVar.
+"""
+
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from urllib.parse import parse_qsl
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+ACTIVO = os.getenv('PERFIL_CONSULTAS', '').lower() in ('1', 'true', 'si', 'yes')
+UMBRAL_REPETIDAS = int(os.getenv('PERFIL_UMBRAL_REPETIDAS', '2'))
+
+# Parámetros de PostgREST que no son filtros por columna
+_MODIFICADORES = {'select', 'order', 'limit', 'offset', 'on_conflict', 'columns'}
+
+_actual = contextvars.ContextVar('perfil_consultas', default=None)
+
+
+class Perfil:
+    """Consultas de un request. Thread-safe: el fan-out registra desde el pool."""
+
+    def __init__(self, nombre: str = ''):
+        self.nombre = nombre
+        self.consultas = []
+        self._lock = threading.Lock()
+        self._token = None
+
+    def registrar(self, consulta: dict):
+        with self._lock:
+            self.consultas.append(consulta)
+
+    @property
+    def total(self) -> int:
+        return len(self.consultas)
+
+    @property
+    def ms(self) -> float:
+        return round(sum(c['ms'] for c in self.consultas), 1)
+
+    @property
+    def bytes(self) -> int:
+        return sum(c['bytes'] for c in self.consultas)
+
+    @property
+    def filas(self) -> int:
+        return sum(c['filas'] for c in self.consultas)
+
+    def repetidas(self, umbral: int = None) -> dict:
+        """{forma: veces} de las formas que se repiten al menos `umbral` veces."""
+        umbral = umbral or UMBRAL_REPETIDAS
+        conteo = Counter(c['forma'] for c in self.consultas)
+        return {forma: n for forma, n in conteo.items() if n >= umbral}
+
+    def encabezado(self) -> str:
+        return (f"consultas={self.total}; ms={self.ms}; bytes={self.bytes}; "
+                f"filas={self.filas}; repetidas={len(self.repetidas())}")
+
+    def server_timing(self) -> str:
+        return f'supabase;dur={self.ms};desc="{self.total} consultas"'
+
+
+def actual():
+    """Perfil activo en este contexto, o None."""
+    return _actual.get()
+
+
+def iniciar(nombre: str = '') -> Perfil:
+    perfil = Perfil(nombre)
+    perfil._token = _actual.set(perfil)
+    return perfil
+
+
+def terminar(perfil: Perfil):
+    if perfil._token is not None:
+        _actual.reset(perfil._token)
+        perfil._token = None
+
+
+@contextmanager
+def perfilar(nombre: str = ''):
+    perfil = iniciar(nombre)
+    try:
+        yield perfil
+    finally:
+        terminar(perfil)
+
+
+def forma(tabla: str, operacion: str, params: list) -> str:
+    """Firma de la consulta sin valores: 'vacantes select(id,titulo) empresa_id=eq order'."""
+    partes = [f"{tabla} {operacion}"]
+    for clave, valor in sorted(params):
+        if clave == 'select':
+            partes[0] += f"({valor})"
+        elif clave in _MODIFICADORES or clave in ('or', 'and'):
+            partes.append(clave)
+        else:
+            operador = valor.split('.', 2)
+            # not.eq.x → not.eq
+            partes.append(f"{clave}={'.'.join(operador[:2]) if operador[0] == 'not' else operador[0]}")
+    return ' '.join(partes)
+
+
+def _contar_filas(respuesta: httpx.Response) -> int:
+    if respuesta.status_code >= 400 or not respuesta.content:
+        return 0
+    try:
+        cuerpo = json.loads(respuesta.content)
+    except ValueError:
+        return 0
+    if isinstance(cuerpo, list):
+        return len(cuerpo)
+    return 1 if cuerpo is not None else 0
+
+
+def registrar(request: httpx.Request, respuesta: httpx.Response, tabla: str, operacion: str,
+              inicio: float) -> httpx.Response:
+    """
+    Llamado por el transporte de supabase_client. Si hay perfil activo lee el
+    cuerpo (para bytes y filas) y retorna una respuesta equivalente ya leída.
+    """
+    perfil = _actual.get()
+    if perfil is None:
+        return respuesta
+
+    crudo = b''.join(respuesta.stream)
+    respuesta.close()
+    ms = round((time.perf_counter() - inicio) * 1000, 1)
+    leida = httpx.Response(respuesta.status_code, headers=respuesta.headers, content=crudo,
+                           request=request, extensions=respuesta.extensions)
+    leida.read()
+
+    params = parse_qsl(request.url.query.decode(), keep_blank_values=True)
+    perfil.registrar({
+        'tabla': tabla,
+        'operacion': operacion,
+        'filtros': [(k, v) for k, v in params if k not in _MODIFICADORES],
+        'forma': forma(tabla, operacion, params),
+        'status': respuesta.status_code,
+        'filas': _contar_filas(leida),
+        'bytes': len(crudo),
+        'ms': ms,
+    })
+    return leida
+
+
+def loguear(perfil: Perfil):
+    """Una línea por request; las formas repetidas van aparte como warning."""
+    logger.info(f"🔎 {perfil.nombre}: {perfil.encabezado()}")
+    for consulta_forma, veces in perfil.repetidas().items():
+        logger.warning(f"🔁 Posible N+1 en {perfil.nombre}: {consulta_forma} ×{veces}")
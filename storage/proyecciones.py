@@ -0,0 +1,27 @@
+"""
+storage/proyecciones.py
+Columnas que pide cada vista a Supabase (evita select('*') en los listados)
+
+Los listados solo traen los campos que muestran las tarjetas; los blobs
+pesados (respuestas_detalle, analisis_ia, entity_skill_score) se piden por
+candidato en /api/candidato/<id> cuando se abre el detalle.
+"""
+
+# Tarjetas del dashboard y listados de candidatos por empresa
+ENTREVISTA_TARJETA = "id, vacante_id, nombre_candidato, score, veredicto, tag, estado, fecha, vacantes(cargo)"
+
+# Tabla de /candidatos (incluye los porcentajes por categoría y el cargo)
+ENTREVISTA_LISTA = "id, vacante_id, nombre_candidato, identificacion, telefono, score, estado, fecha, metricas_categorias, vacantes(cargo)"
+
+# Comparador: scores, análisis y evaluación, con la vacante (stack y pesos de fases)
+ENTREVISTA_COMPARAR = (
+    "id, vacante_id, nombre_candidato, identificacion, score, veredicto, analisis_ia, "
+    "entity_skill_score, metricas_categorias, criterios_entrevista, comentario_entrevista, "
+    "score_interview, score_final_combinado, vacantes(cargo, skill_stack, configuracion_modelo)"
+)
+
+# Detalle completo de un candidato
+ENTREVISTA_DETALLE = "*"
+
+# Vacantes usadas solo para nombrar el cargo en listados
+VACANTE_RESUMEN = "id, cargo"
@@ -0,0 +1,241 @@
+"""
+storage/repositorio.py
+Interfaz de acceso a datos (auth, vacantes, entrevistas, usuarios, calculadora, pagos) y selección de backend
+
+REPOSITORIO_BACKEND elige la implementación:
+    supabase  (por defecto) storage/repositorio_supabase.py, la base alojada
+    sqlite    storage/repositorio_sqlite.py, archivo local indexado
+              (REPOSITORIO_SQLITE_PATH) para correr, perfilar y hacer
+              pruebas de carga sin red
+
+Las columnas se piden con las cadenas de storage/proyecciones (sintaxis de
+select de PostgREST; embeds vacantes(...) y calculadora_leads(...)) y ambos
+backends devuelven las filas con la misma forma.
+"""
+
+import os
+import threading
+from abc import ABC, abstractmethod
+
+from storage.paginacion import TAMANO_PAGINA
+
+BACKEND = os.getenv('REPOSITORIO_BACKEND', 'supabase').lower()
+
+
+class Duplicado(Exception):
+    """Un insert violó una clave única (p. ej. el reintento de un envío ya guardado)."""
+
+
+class Repositorio(ABC):
+    """Operaciones que usan las rutas. Todas retornan dicts planos (o listas de dicts)."""
+
+    # ── Autenticación ────────────────────────────────────────
+    @abstractmethod
+    def autenticar(self, email: str, password: str) -> dict:
+        """Usuario {'id', 'email'} si las credenciales son válidas, o None."""
+
+    @abstractmethod
+    def registrar_credenciales(self, email: str, password: str) -> dict:
+        """Alta de credenciales. Retorna {'id', 'email'}; Duplicado si el email ya existe."""
+
+    # ── Vacantes ─────────────────────────────────────────────
+    @abstractmethod
+    def vacante(self, vacante_id) -> dict:
+        """Vacante por id interno, o None."""
+
+    @abstractmethod
+    def vacante_publica(self, id_publico: str) -> dict:
+        """Vacante por id_vacante_publico, o None."""
+
+    @abstractmethod
+    def vacantes_empresa(self, empresa_id, columnas: str = '*') -> list:
+        ...
+
+    @abstractmethod
+    def listar_vacantes(self) -> list:
+        """Todas las vacantes (consola y scripts, no para rutas)."""
+
+    @abstractmethod
+    def crear_vacante(self, datos: dict) -> dict:
+        ...
+
+    @abstractmethod
+    def actualizar_vacante(self, vacante_id, cambios: dict):
+        ...
+
+    # ── Entrevistas ──────────────────────────────────────────
+    @abstractmethod
+    def entrevista(self, entrevista_id, columnas: str = '*') -> dict:
+        """Entrevista por id, o None."""
+
+    @abstractmethod
+    def entrevistas_por_ids(self, empresa_id, ids: list, columnas: str = '*') -> list:
+        """Entrevistas de la empresa con id en `ids` (sin orden garantizado)."""
+
+    @abstractmethod
+    def pagina_entrevistas(self, empresa_id, columnas: str, orden: str,
+                           cursor: str = None, limite: int = TAMANO_PAGINA):
+        """
+        Página keyset (orden desc, id desc, NULL al final) de la empresa.
+        Retorna (filas, siguiente_cursor) con los cursores de storage/paginacion.
+        """
+
+    @abstractmethod
+    def entrevistas_vacante(self, vacante_id, columnas: str = '*') -> list:
+        """Todas las entrevistas de la vacante, ordenadas por id (re-scoring masivo)."""
+
+    @abstractmethod
+    def entrevistas_empresa(self, empresa_id, columnas: str = '*') -> list:
+        """Todas las entrevistas de la empresa, más recientes primero (detalle del panel admin)."""
+
+    @abstractmethod
+    def listar_entrevistas(self, columnas: str = '*') -> list:
+        """Todas las entrevistas (consola y scripts, no para rutas)."""
+
+    @abstractmethod
+    def crear_entrevista(self, datos: dict) -> dict:
+        ...
+
+    @abstractmethod
+    def actualizar_entrevista(self, entrevista_id, cambios: dict):
+        ...
+
+    @abstractmethod
+    def actualizar_entrevistas_lote(self, filas: list) -> int:
+        """
+        UPDATE por id de muchas entrevistas: cada fila trae "id" y las mismas
+        columnas a cambiar. No inserta ni exige las columnas NOT NULL.
+        Retorna cuántas se actualizaron.
+        """
+
+    @abstractmethod
+    def eliminar_entrevista(self, entrevista_id):
+        ...
+
+    @abstractmethod
+    def dashboard_empresa(self, empresa_id, limite: int) -> dict:
+        """Misma forma que la RPC dashboard_empresa (sql/005)."""
+
+    @abstractmethod
+    def reporte_empresa(self, empresa_id) -> dict:
+        """Misma forma que la RPC reporte_empresa (sql/004)."""
+
+    # ── Usuarios y empresas ──────────────────────────────────
+    @abstractmethod
+    def usuario(self, user_id, columnas: str = '*') -> dict:
+        ...
+
+    @abstractmethod
+    def empresa(self, empresa_id, columnas: str = '*') -> dict:
+        ...
+
+    @abstractmethod
+    def usuarios_de_empresa(self, empresa_id) -> list:
+        ...
+
+    @abstractmethod
+    def crear_empresa(self, datos: dict) -> dict:
+        ...
+
+    @abstractmethod
+    def crear_usuario(self, datos: dict) -> dict:
+        ...
+
+    @abstractmethod
+    def es_super_admin(self, email: str) -> bool:
+        ...
+
+    @abstractmethod
+    def metricas_empresas(self) -> list:
+        """Una fila por empresa con la forma de la vista vista_metricas_empresas (panel admin)."""
+
+    @abstractmethod
+    def habilidades(self) -> list:
+        """Catálogo de habilidades para el editor de vacantes."""
+
+    # ── Calculadora: leads y diagnósticos ────────────────────
+    @abstractmethod
+    def diagnostico(self, diagnostico_id, columnas: str = '*') -> dict:
+        ...
+
+    @abstractmethod
+    def crear_diagnostico(self, datos: dict) -> dict:
+        ...
+
+    @abstractmethod
+    def actualizar_diagnostico(self, diagnostico_id, cambios: dict):
+        ...
+
+    @abstractmethod
+    def lead_por_email(self, email: str) -> dict:
+        ...
+
+    @abstractmethod
+    def crear_lead(self, datos: dict) -> dict:
+        ...
+
+    @abstractmethod
+    def actualizar_lead(self, lead_id, cambios: dict):
+        ...
+
+    @abstractmethod
+    def registrar_interaccion(self, datos: dict):
+        ...
+
+    @abstractmethod
+    def crear_demo(self, datos: dict) -> dict:
+        ...
+
+    # ── Calculadora: pagos ePayco ────────────────────────────
+    @abstractmethod
+    def pago_aprobado(self, diagnostico_id) -> dict:
+        """Pago en estado 'aprobado' del diagnóstico, o None."""
+
+    @abstractmethod
+    def pago_por_referencia(self, ref_interna: str, columnas: str = '*') -> dict:
+        ...
+
+    @abstractmethod
+    def crear_pago(self, datos: dict) -> dict:
+        ...
+
+    @abstractmethod
+    def actualizar_pago(self, ref_interna: str, cambios: dict):
+        ...
+
+    # ── Carga masiva ─────────────────────────────────────────
+    @abstractmethod
+    def insertar_filas(self, tabla: str, filas: list) -> int:
+        """Inserta muchas filas de una vez (generadores de datos y fixtures). Retorna cuántas."""
+
+
+_repositorio = None
+_lock = threading.Lock()
+
+
+def get_repositorio() -> Repositorio:
+    """Instancia única del backend configurado en REPOSITORIO_BACKEND."""
+    global _repositorio
+    if _repositorio is not None:
+        return _repositorio
+    with _lock:
+        if _repositorio is None:
+            if BACKEND == 'sqlite':
+                from storage.repositorio_sqlite import RepositorioSQLite
+                _repositorio = RepositorioSQLite()
+            elif BACKEND == 'supabase':
+                from storage.repositorio_supabase import RepositorioSupabase
+                _repositorio = RepositorioSupabase()
+            else:
+                raise ValueError(f"REPOSITORIO_BACKEND desconocido: {BACKEND}")
+    return _repositorio
+
+
+class _RepositorioLazy:
+    """Se importa como `repositorio` y delega en el backend configurado."""
+
+    def __getattr__(self, nombre):
+        return getattr(get_repositorio(), nombre)
+
+
+repositorio = _RepositorioLazy()
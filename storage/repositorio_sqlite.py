@@ -0,0 +1,544 @@
+"""
+storage/repositorio_sqlite.py
+Backend local del repositorio sobre SQLite (REPOSITORIO_BACKEND=sqlite)
+
+Cada tabla guarda la fila completa como JSON en `doc` y copia a columnas
+reales los campos por los que se filtra u ordena, que son los indexados:
+empresa_id, vacante_id, fecha, score, id_vacante_publico (más email y
+lead_id en la calculadora). Así el esquema no se rompe cuando la base
+alojada agrega columnas y los planes de consulta son comparables con los
+índices de sql/003.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import uuid
+from collections import defaultdict
+from datetime import datetime
+from decimal import Decimal, ROUND_HALF_UP
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+from storage.paginacion import cortar_pagina, decodificar_cursor, TAMANO_PAGINA
+from storage.repositorio import Repositorio, Duplicado
+
+SQLITE_PATH = os.getenv('REPOSITORIO_SQLITE_PATH', os.path.join(os.path.dirname(__file__), 'repositorio.db'))
+
+# Tabla -> columnas indexables copiadas desde el doc (además de id)
+TABLAS = {
+    'empresas': (),
+    'usuarios_empresa': ('empresa_id', 'email'),
+    'super_admins': ('email',),
+    'vacantes': ('empresa_id', 'id_vacante_publico'),
+    'entrevistas': ('empresa_id', 'vacante_id', 'fecha', 'score', 'clave_idempotencia'),
+    'calculadora_leads': ('email',),
+    'calculadora_diagnosticos': ('lead_id',),
+    'calculadora_interacciones': ('lead_id', 'diagnostico_id'),
+    'calculadora_demos': ('lead_id', 'diagnostico_id'),
+    'calculadora_pagos': ('diagnostico_id', 'ref_interna'),
+}
+
+# Credenciales locales (las sirve también herramientas/supabase_local como GoTrue).
+# Se crea con _asegurar_tabla y se busca por json_extract(doc, '$.email').
+TABLA_AUTH = 'auth_usuarios'
+
+# Una empresa cuenta como activa si recibió candidatos en estos últimos días
+DIAS_EMPRESA_ACTIVA = 30
+
+ESQUEMA = """
+CREATE INDEX IF NOT EXISTS idx_usuarios_empresa ON usuarios_empresa (empresa_id);
+CREATE INDEX IF NOT EXISTS idx_super_admins_email ON super_admins (email);
+CREATE INDEX IF NOT EXISTS idx_vacantes_empresa ON vacantes (empresa_id);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_vacantes_publico ON vacantes (id_vacante_publico);
+CREATE INDEX IF NOT EXISTS idx_entrevistas_empresa_fecha ON entrevistas (empresa_id, fecha DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_entrevistas_empresa_score ON entrevistas (empresa_id, score DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_entrevistas_vacante ON entrevistas (vacante_id);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_entrevistas_clave ON entrevistas (clave_idempotencia);
+CREATE INDEX IF NOT EXISTS idx_leads_email ON calculadora_leads (email);
+CREATE INDEX IF NOT EXISTS idx_diagnosticos_lead ON calculadora_diagnosticos (lead_id);
+CREATE INDEX IF NOT EXISTS idx_interacciones_diagnostico ON calculadora_interacciones (diagnostico_id);
+CREATE INDEX IF NOT EXISTS idx_pagos_diagnostico ON calculadora_pagos (diagnostico_id);
+CREATE INDEX IF NOT EXISTS idx_pagos_ref ON calculadora_pagos (ref_interna);
+"""
+
+# Embeds soportados en las proyecciones: relación -> (tabla, columna FK en la fila)
+EMBEDS = {
+    'vacantes': ('vacantes', 'vacante_id'),
+    'calculadora_leads': ('calculadora_leads', 'lead_id'),
+}
+
+COLUMNAS_ORDEN = ('fecha', 'score')
+
+CARD_DASHBOARD = "id, vacante_id, nombre_candidato, score, veredicto, tag, estado, fecha"
+
+
+def _parsear_columnas(columnas: str):
+    """'a, b, vacantes(c, d)' -> (['a', 'b'] o None si es '*', {'vacantes': [...] o None})."""
+    planas, embeds = [], {}
+    nivel, actual = 0, ''
+    for ch in (columnas or '*') + ',':
+        if ch == ',' and nivel == 0:
+            campo = actual.strip()
+            actual = ''
+            if not campo:
+                continue
+            if '(' in campo:
+                nombre, internas = campo.split('(', 1)
+                embeds[nombre.strip()] = _parsear_columnas(internas.rstrip(')'))[0]
+            else:
+                planas.append(campo)
+            continue
+        nivel += (ch == '(') - (ch == ')')
+        actual += ch
+    return (None if '*' in planas else planas), embeds
+
+
+def _redondear(valor, decimales=1):
+    # round() de Postgres sobre numeric: mitad hacia arriba
+    if valor is None:
+        return None
+    cuanto = Decimal(1).scaleb(-decimales)
+    return float(Decimal(str(valor)).quantize(cuanto, rounding=ROUND_HALF_UP))
+
+
+class RepositorioSQLite(Repositorio):
+
+    def __init__(self, ruta: str = None):
+        self.ruta = ruta or SQLITE_PATH
+        self._local = threading.local()
+
+    # ── Conexión y utilidades ────────────────────────────────
+    def _conexion(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or getattr(self._local, 'pid', None) != os.getpid():
+            conn = sqlite3.connect(self.ruta, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            for tabla, columnas in TABLAS.items():
+                extra = ''.join(f', {c}' for c in columnas)
+                conn.execute(f'CREATE TABLE IF NOT EXISTS {tabla} (id TEXT PRIMARY KEY{extra}, doc TEXT NOT NULL)')
+            conn.executescript(ESQUEMA)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+            self._local.tablas = set(TABLAS)
+        return conn
+
+    def _asegurar_tabla(self, tabla: str):
+        """Crea al vuelo tablas fuera de TABLAS (solo id + doc, sin índices extra)."""
+        conn = self._conexion()
+        if tabla not in self._local.tablas:
+            if not tabla.isidentifier():
+                raise ValueError(f"Nombre de tabla inválido: {tabla}")
+            conn.execute(f'CREATE TABLE IF NOT EXISTS {tabla} (id TEXT PRIMARY KEY, doc TEXT NOT NULL)')
+            self._local.tablas.add(tabla)
+
+    def _docs(self, sql, params=()) -> list:
+        return [json.loads(fila[0]) for fila in self._conexion().execute(sql, params)]
+
+    def _uno(self, tabla, campo, valor, columnas='*'):
+        filas = self._docs(f'SELECT doc FROM {tabla} WHERE {campo} = ? LIMIT 1', (valor,))
+        return self._proyectar(filas, columnas)[0] if filas else None
+
+    def _proyectar(self, filas: list, columnas: str) -> list:
+        planas, embeds = _parsear_columnas(columnas)
+        for relacion, internas in embeds.items():
+            tabla, fk = EMBEDS[relacion]
+            # Un solo query por relación y un índice {id: fila} para unir
+            ids = sorted({str(f[fk]) for f in filas if f.get(fk) is not None})
+            relacionadas = {}
+            if ids:
+                marcas = ','.join('?' * len(ids))
+                for doc in self._docs(f'SELECT doc FROM {tabla} WHERE id IN ({marcas})', ids):
+                    relacionadas[str(doc['id'])] = doc if internas is None else {c: doc.get(c) for c in internas}
+            for f in filas:
+                f[relacion] = relacionadas.get(str(f.get(fk))) if f.get(fk) is not None else None
+        if planas is None:
+            return filas
+        conservar = set(planas) | set(embeds)
+        return [{k: f.get(k) for k in conservar} for f in filas]
+
+    def _insertar(self, tabla: str, datos: dict) -> dict:
+        fila = dict(datos)
+        fila.setdefault('id', str(uuid.uuid4()))
+        if tabla == 'entrevistas' and not fila.get('fecha'):
+            fila['fecha'] = datetime.now().isoformat()
+        self._asegurar_tabla(tabla)
+        columnas = TABLAS.get(tabla, ())
+        nombres = ', '.join(('id',) + columnas + ('doc',))
+        marcas = ', '.join('?' * (len(columnas) + 2))
+        valores = [str(fila['id'])] + [fila.get(c) for c in columnas] + [json.dumps(fila, ensure_ascii=False, default=str)]
+        try:
+            self._conexion().execute(f'INSERT INTO {tabla} ({nombres}) VALUES ({marcas})', valores)
+        except sqlite3.IntegrityError as e:
+            raise Duplicado(str(e)) from e
+        return fila
+
+    def _fusionar(self, tabla: str, fila_id, cambios: dict):
+        """Mezcla `cambios` en la fila (dentro de la transacción del llamador). None si no existe."""
+        conn = self._conexion()
+        actual = conn.execute(f'SELECT doc FROM {tabla} WHERE id = ?', (str(fila_id),)).fetchone()
+        if not actual:
+            return None
+        fila = {**json.loads(actual[0]), **cambios}
+        columnas = TABLAS.get(tabla, ())
+        asignaciones = ', '.join(f'{c} = ?' for c in columnas + ('doc',))
+        valores = [fila.get(c) for c in columnas] + [json.dumps(fila, ensure_ascii=False, default=str), str(fila_id)]
+        conn.execute(f'UPDATE {tabla} SET {asignaciones} WHERE id = ?', valores)
+        return fila
+
+    def _actualizar_donde(self, tabla: str, campo: str, valor, cambios: dict):
+        """Como _actualizar, para todas las filas con `campo` = `valor` (ids leídos dentro de la transacción)."""
+        conn = self._conexion()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            for (fila_id,) in conn.execute(f'SELECT id FROM {tabla} WHERE {campo} = ?', (valor,)).fetchall():
+                self._fusionar(tabla, fila_id, cambios)
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+    def _actualizar(self, tabla: str, fila_id, cambios: dict):
+        conn = self._conexion()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            self._fusionar(tabla, fila_id, cambios)
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+    def insertar_filas(self, tabla: str, filas: list) -> int:
+        """Carga masiva en una transacción (generadores de datos y fixtures)."""
+        conn = self._conexion()
+        conn.execute('BEGIN')
+        try:
+            for fila in filas:
+                self._insertar(tabla, fila)
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return len(filas)
+
+    # ── Autenticación ────────────────────────────────────────
+    @staticmethod
+    def _cuenta(doc: dict) -> dict:
+        return {'id': doc['id'], 'email': doc['email'], 'created_at': doc.get('created_at')}
+
+    def _cuentas_por_email(self, email) -> list:
+        self._asegurar_tabla(TABLA_AUTH)
+        return self._docs(f"SELECT doc FROM {TABLA_AUTH} WHERE json_extract(doc, '$.email') = ?", (email,))
+
+    def autenticar(self, email, password):
+        for doc in self._cuentas_por_email(email):
+            if check_password_hash(doc.get('password_hash') or '', password or ''):
+                return self._cuenta(doc)
+        return None
+
+    def registrar_credenciales(self, email, password, user_id=None):
+        conn = self._conexion()
+        self._asegurar_tabla(TABLA_AUTH)
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            if self._cuentas_por_email(email):
+                raise Duplicado(f"Email ya registrado: {email}")
+            doc = self._insertar(TABLA_AUTH, {
+                'id': str(user_id or uuid.uuid4()),
+                'email': email,
+                'password_hash': generate_password_hash(password),
+                'created_at': datetime.now().isoformat(),
+            })
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return self._cuenta(doc)
+
+    # ── Vacantes ─────────────────────────────────────────────
+    def vacante(self, vacante_id):
+        return self._uno('vacantes', 'id', str(vacante_id))
+
+    def vacante_publica(self, id_publico):
+        return self._uno('vacantes', 'id_vacante_publico', id_publico)
+
+    def vacantes_empresa(self, empresa_id, columnas='*'):
+        filas = self._docs('SELECT doc FROM vacantes WHERE empresa_id = ?', (empresa_id,))
+        return self._proyectar(filas, columnas)
+
+    def listar_vacantes(self):
+        return self._docs('SELECT doc FROM vacantes')
+
+    def crear_vacante(self, datos):
+        return self._insertar('vacantes', datos)
+
+    def actualizar_vacante(self, vacante_id, cambios):
+        self._actualizar('vacantes', vacante_id, cambios)
+
+    # ── Entrevistas ──────────────────────────────────────────
+    def entrevista(self, entrevista_id, columnas='*'):
+        return self._uno('entrevistas', 'id', str(entrevista_id), columnas)
+
+    def entrevistas_por_ids(self, empresa_id, ids, columnas='*'):
+        ids = [str(i) for i in ids]
+        if not ids:
+            return []
+        marcas = ','.join('?' * len(ids))
+        filas = self._docs(f'SELECT doc FROM entrevistas WHERE empresa_id = ? AND id IN ({marcas})', [empresa_id] + ids)
+        return self._proyectar(filas, columnas)
+
+    def pagina_entrevistas(self, empresa_id, columnas, orden, cursor=None, limite=TAMANO_PAGINA):
+        if orden not in COLUMNAS_ORDEN:
+            raise ValueError(f"Orden no soportado: {orden}")
+        sql = 'SELECT doc FROM entrevistas WHERE empresa_id = ?'
+        params = [empresa_id]
+
+        posicion = decodificar_cursor(cursor)
+        if posicion is not None:
+            valor, fila_id = posicion
+            if valor is None:
+                sql += f' AND {orden} IS NULL AND id < ?'
+                params += [str(fila_id)]
+            else:
+                sql += f' AND ({orden} < ? OR ({orden} = ? AND id < ?) OR {orden} IS NULL)'
+                params += [valor, valor, str(fila_id)]
+
+        sql += f' ORDER BY {orden} DESC NULLS LAST, id DESC LIMIT ?'
+        params.append(limite + 1)
+        filas = self._proyectar(self._docs(sql, params), columnas)
+        return cortar_pagina(filas, orden, limite)
+
+    def entrevistas_vacante(self, vacante_id, columnas='*'):
+        filas = self._docs('SELECT doc FROM entrevistas WHERE vacante_id = ? ORDER BY id', (str(vacante_id),))
+        return self._proyectar(filas, columnas)
+
+    def entrevistas_empresa(self, empresa_id, columnas='*'):
+        filas = self._docs('SELECT doc FROM entrevistas WHERE empresa_id = ? ORDER BY fecha DESC NULLS LAST, id DESC',
+                           (empresa_id,))
+        return self._proyectar(filas, columnas)
+
+    def listar_entrevistas(self, columnas='*'):
+        return self._proyectar(self._docs('SELECT doc FROM entrevistas'), columnas)
+
+    def crear_entrevista(self, datos):
+        return self._insertar('entrevistas', datos)
+
+    def actualizar_entrevista(self, entrevista_id, cambios):
+        self._actualizar('entrevistas', entrevista_id, cambios)
+
+    def actualizar_entrevistas_lote(self, filas):
+        conn = self._conexion()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            actualizadas = sum(
+                self._fusionar('entrevistas', fila['id'], fila) is not None for fila in filas
+            )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return actualizadas
+
+    def eliminar_entrevista(self, entrevista_id):
+        self._conexion().execute('DELETE FROM entrevistas WHERE id = ?', (str(entrevista_id),))
+
+    def dashboard_empresa(self, empresa_id, limite):
+        conn = self._conexion()
+        vacantes = [
+            {'id': fila[0], 'cargo': fila[1]}
+            for fila in conn.execute("SELECT id, json_extract(doc, '$.cargo') FROM vacantes WHERE empresa_id = ?", (empresa_id,))
+        ]
+        total_c, total_recomendados = conn.execute(
+            "SELECT count(*), coalesce(sum(json_extract(doc, '$.veredicto') = 'RECOMENDADO'), 0) "
+            "FROM entrevistas WHERE empresa_id = ?", (empresa_id,)
+        ).fetchone()
+        filas = self._docs(
+            'SELECT doc FROM entrevistas WHERE empresa_id = ? ORDER BY fecha DESC NULLS LAST, id DESC LIMIT ?',
+            (empresa_id, limite)
+        )
+        return {
+            'vacantes': vacantes,
+            'total_c': total_c,
+            'total_recomendados': total_recomendados,
+            'tarjetas': self._proyectar(filas, CARD_DASHBOARD),
+        }
+
+    def reporte_empresa(self, empresa_id):
+        conn = self._conexion()
+        # Mismo agrupamiento que el rollup de sql/004: (vacante, mes)
+        grupos = conn.execute("""
+            SELECT vacante_id,
+                   coalesce(substr(fecha, 1, 7), '') AS mes,
+                   count(*),
+                   sum(coalesce(score, 0)),
+                   sum(json_extract(doc, '$.veredicto') = 'RECOMENDADO'),
+                   sum(json_extract(doc, '$.veredicto') = 'NO RECOMENDADO'),
+                   sum(json_extract(doc, '$.veredicto') = 'REVISAR'),
+                   sum(json_extract(doc, '$.estado') = 'Finalista'),
+                   sum(json_extract(doc, '$.estado') = 'Contratado'),
+                   sum(json_extract(doc, '$.estado') = 'Descartado'),
+                   sum(coalesce(json_extract(doc, '$.estado'), '') = ''),
+                   sum(json_extract(doc, '$.score_final_combinado') IS NOT NULL),
+                   sum(coalesce(json_extract(doc, '$.score_final_combinado'), 0))
+            FROM entrevistas
+            WHERE empresa_id = ?
+            GROUP BY 1, 2
+        """, (empresa_id,)).fetchall()
+
+        claves = ('total', 'suma_score', 'recomendados', 'no_recomendados', 'a_revisar',
+                  'finalistas', 'contratados', 'descartados', 'sin_estado',
+                  'entrevistados', 'suma_score_final')
+        totales = dict.fromkeys(claves, 0)
+        por_vacante = defaultdict(lambda: dict.fromkeys(claves, 0))
+        por_mes = defaultdict(lambda: dict.fromkeys(claves, 0))
+        for vacante_id, mes, *valores in grupos:
+            for destino in (totales, por_vacante[vacante_id], por_mes[mes]):
+                for clave, valor in zip(claves, valores):
+                    destino[clave] += valor or 0
+
+        cargos = dict(conn.execute(
+            "SELECT id, json_extract(doc, '$.cargo') FROM vacantes WHERE empresa_id = ?", (empresa_id,)
+        ).fetchall())
+
+        filas_vacante = [
+            {
+                'cargo': cargos[vid],
+                'total': s['total'],
+                'score_promedio': _redondear(s['suma_score'] / s['total']),
+                'tasa_aprobacion': int(_redondear(100.0 * s['recomendados'] / s['total'], 0)),
+                'finalistas': s['finalistas'],
+                'contratados': s['contratados'],
+            }
+            for vid, s in por_vacante.items() if vid in cargos and s['total']
+        ]
+        filas_vacante.sort(key=lambda r: r['score_promedio'], reverse=True)
+
+        total = totales['total']
+        return {
+            'total_c': total,
+            'total_v': len(cargos),
+            'score_promedio': _redondear(totales['suma_score'] / total) if total else 0,
+            'recomendados': totales['recomendados'],
+            'no_recomendados': totales['no_recomendados'],
+            'a_revisar': totales['a_revisar'],
+            'finalistas': totales['finalistas'],
+            'contratados': totales['contratados'],
+            'descartados': totales['descartados'],
+            'sin_estado': totales['sin_estado'],
+            'entrevistados': totales['entrevistados'],
+            'score_final_promedio': (_redondear(totales['suma_score_final'] / totales['entrevistados'])
+                                     if totales['entrevistados'] else None),
+            'por_vacante': filas_vacante,
+            'evolucion': [
+                {'mes': mes, 'total': s['total'], 'score_promedio': _redondear(s['suma_score'] / s['total'])}
+                for mes, s in sorted(por_mes.items()) if len(mes) == 7
+            ],
+        }
+
+    # ── Usuarios y empresas ──────────────────────────────────
+    def usuario(self, user_id, columnas='*'):
+        return self._uno('usuarios_empresa', 'id', str(user_id), columnas)
+
+    def empresa(self, empresa_id, columnas='*'):
+        return self._uno('empresas', 'id', str(empresa_id), columnas)
+
+    def usuarios_de_empresa(self, empresa_id):
+        return self._docs('SELECT doc FROM usuarios_empresa WHERE empresa_id = ?', (str(empresa_id),))
+
+    def crear_empresa(self, datos):
+        return self._insertar('empresas', datos)
+
+    def crear_usuario(self, datos):
+        return self._insertar('usuarios_empresa', datos)
+
+    def es_super_admin(self, email):
+        filas = self._docs('SELECT doc FROM super_admins WHERE email = ?', (email,))
+        return any(f.get('activo') for f in filas)
+
+    def metricas_empresas(self):
+        conn = self._conexion()
+        usuarios = {}
+        for empresa_id, doc in conn.execute('SELECT empresa_id, doc FROM usuarios_empresa ORDER BY id'):
+            usuarios.setdefault(empresa_id, json.loads(doc))
+        filas = conn.execute("""
+            SELECT e.id,
+                   json_extract(e.doc, '$.nombre_empresa'),
+                   json_extract(e.doc, '$.created_at'),
+                   coalesce(v.total, 0),
+                   julianday(v.primera) - julianday(json_extract(e.doc, '$.created_at')) <= 1,
+                   coalesce(c.total, 0),
+                   coalesce(c.recomendados, 0),
+                   c.ultima,
+                   julianday('now') - julianday(c.ultima) <= ?
+            FROM empresas e
+            LEFT JOIN (SELECT empresa_id, count(*) AS total, min(json_extract(doc, '$.created_at')) AS primera
+                       FROM vacantes GROUP BY empresa_id) v ON v.empresa_id = e.id
+            LEFT JOIN (SELECT empresa_id, count(*) AS total,
+                              sum(json_extract(doc, '$.veredicto') = 'RECOMENDADO') AS recomendados,
+                              max(fecha) AS ultima
+                       FROM entrevistas GROUP BY empresa_id) c ON c.empresa_id = e.id
+            ORDER BY 3 DESC
+        """, (DIAS_EMPRESA_ACTIVA,)).fetchall()
+        return [
+            {
+                'empresa_id': empresa_id,
+                'nombre_empresa': nombre,
+                'nombre_usuario': usuarios.get(empresa_id, {}).get('nombre_completo'),
+                'email_usuario': usuarios.get(empresa_id, {}).get('email'),
+                'fecha_registro': registro,
+                'total_vacantes': total_v,
+                'primera_vacante_24h': bool(en_24h),
+                'total_candidatos': total_c,
+                'candidatos_recomendados': recomendados,
+                'ultima_actividad': ultima,
+                'activo': bool(activa),
+            }
+            for empresa_id, nombre, registro, total_v, en_24h, total_c, recomendados, ultima, activa in filas
+        ]
+
+    def habilidades(self):
+        self._asegurar_tabla('habilidades')
+        return self._docs('SELECT doc FROM habilidades')
+
+    # ── Calculadora ──────────────────────────────────────────
+    def diagnostico(self, diagnostico_id, columnas='*'):
+        return self._uno('calculadora_diagnosticos', 'id', str(diagnostico_id), columnas)
+
+    def crear_diagnostico(self, datos):
+        return self._insertar('calculadora_diagnosticos', datos)
+
+    def actualizar_diagnostico(self, diagnostico_id, cambios):
+        self._actualizar('calculadora_diagnosticos', diagnostico_id, cambios)
+
+    def lead_por_email(self, email):
+        return self._uno('calculadora_leads', 'email', email)
+
+    def crear_lead(self, datos):
+        return self._insertar('calculadora_leads', datos)
+
+    def actualizar_lead(self, lead_id, cambios):
+        self._actualizar('calculadora_leads', lead_id, cambios)
+
+    def registrar_interaccion(self, datos):
+        self._insertar('calculadora_interacciones', datos)
+
+    def crear_demo(self, datos):
+        return self._insertar('calculadora_demos', datos)
+
+    def pago_aprobado(self, diagnostico_id):
+        filas = self._docs(
+            "SELECT doc FROM calculadora_pagos WHERE diagnostico_id = ? AND json_extract(doc, '$.estado') = 'aprobado' LIMIT 1",
+            (str(diagnostico_id),)
+        )
+        return filas[0] if filas else None
+
+    def pago_por_referencia(self, ref_interna, columnas='*'):
+        return self._uno('calculadora_pagos', 'ref_interna', ref_interna, columnas)
+
+    def crear_pago(self, datos):
+        return self._insertar('calculadora_pagos', datos)
+
+    def actualizar_pago(self, ref_interna, cambios):
+        self._actualizar_donde('calculadora_pagos', 'ref_interna', ref_interna, cambios)
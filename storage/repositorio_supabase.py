@@ -0,0 +1,197 @@
+"""
+storage/repositorio_supabase.py
+Backend del repositorio sobre Supabase (PostgREST + RPCs de sql/)
+"""
+
+from postgrest.exceptions import APIError
+from postgrest.types import ReturnMethod
+from supabase_auth.errors import AuthApiError
+
+from storage.supabase_client import supabase, cliente_auth
+from storage.paginacion import pagina_keyset, TAMANO_PAGINA
+from storage.repositorio import Repositorio, Duplicado
+
+# Filas por request en las cargas masivas (PostgREST inserta el array en una sentencia)
+LOTE_INSERT = 500
+# Filas por página al leer todas las entrevistas de una vacante
+LOTE_LECTURA = 1000
+
+
+def _primera(res):
+    return res.data[0] if res.data else None
+
+
+def _insertar(tabla, datos):
+    try:
+        return _primera(supabase.table(tabla).insert(datos).execute())
+    except APIError as e:
+        if e.code == '23505':
+            raise Duplicado(str(e)) from e
+        raise
+
+
+class RepositorioSupabase(Repositorio):
+
+    # ── Autenticación (GoTrue, con un cliente auth por llamada) ──
+    def autenticar(self, email, password):
+        try:
+            res = cliente_auth().sign_in_with_password({"email": email, "password": password})
+        except AuthApiError as e:
+            if e.status == 400:
+                return None
+            raise
+        return {'id': res.user.id, 'email': res.user.email} if res.user else None
+
+    def registrar_credenciales(self, email, password):
+        try:
+            res = cliente_auth().sign_up({"email": email, "password": password})
+        except AuthApiError as e:
+            if e.code in ('user_already_exists', 'email_exists'):
+                raise Duplicado(e.message) from e
+            raise
+        return {'id': res.user.id, 'email': res.user.email} if res.user else None
+
+    # ── Vacantes ─────────────────────────────────────────────
+    def vacante(self, vacante_id):
+        return _primera(supabase.table('vacantes').select('*').eq('id', vacante_id).execute())
+
+    def vacante_publica(self, id_publico):
+        return _primera(supabase.table('vacantes').select('*').eq('id_vacante_publico', id_publico).execute())
+
+    def vacantes_empresa(self, empresa_id, columnas='*'):
+        return supabase.table('vacantes').select(columnas).eq('empresa_id', empresa_id).execute().data or []
+
+    def listar_vacantes(self):
+        return supabase.table('vacantes').select('*').execute().data or []
+
+    def crear_vacante(self, datos):
+        return _insertar('vacantes', datos)
+
+    def actualizar_vacante(self, vacante_id, cambios):
+        supabase.table('vacantes').update(cambios).eq('id', vacante_id).execute()
+
+    # ── Entrevistas ──────────────────────────────────────────
+    def entrevista(self, entrevista_id, columnas='*'):
+        return _primera(supabase.table('entrevistas').select(columnas).eq('id', entrevista_id).execute())
+
+    def entrevistas_por_ids(self, empresa_id, ids, columnas='*'):
+        return supabase.table('entrevistas').select(columnas) \
+            .in_('id', list(ids)).eq('empresa_id', empresa_id).execute().data or []
+
+    def pagina_entrevistas(self, empresa_id, columnas, orden, cursor=None, limite=TAMANO_PAGINA):
+        query = supabase.table('entrevistas').select(columnas).eq('empresa_id', empresa_id)
+        return pagina_keyset(query, orden, cursor, limite)
+
+    def entrevistas_vacante(self, vacante_id, columnas='*'):
+        filas = []
+        desde = 0
+        while True:
+            pagina = supabase.table('entrevistas').select(columnas) \
+                .eq('vacante_id', vacante_id) \
+                .order('id') \
+                .range(desde, desde + LOTE_LECTURA - 1) \
+                .execute().data or []
+            filas.extend(pagina)
+            if len(pagina) < LOTE_LECTURA:
+                return filas
+            desde += LOTE_LECTURA
+
+    def entrevistas_empresa(self, empresa_id, columnas='*'):
+        return supabase.table('entrevistas').select(columnas).eq('empresa_id', empresa_id) \
+            .order('fecha', desc=True).execute().data or []
+
+    def listar_entrevistas(self, columnas='*'):
+        return supabase.table('entrevistas').select(columnas).execute().data or []
+
+    def crear_entrevista(self, datos):
+        return _insertar('entrevistas', datos)
+
+    def actualizar_entrevista(self, entrevista_id, cambios):
+        supabase.table('entrevistas').update(cambios).eq('id', entrevista_id).execute()
+
+    def actualizar_entrevistas_lote(self, filas):
+        # RPC de sql/006: un UPDATE ... FROM jsonb_populate_recordset por lote
+        actualizadas = 0
+        for desde in range(0, len(filas), LOTE_INSERT):
+            lote = filas[desde:desde + LOTE_INSERT]
+            actualizadas += supabase.rpc('actualizar_entrevistas_lote', {'p_filas': lote}).execute().data or 0
+        return actualizadas
+
+    def eliminar_entrevista(self, entrevista_id):
+        supabase.table('entrevistas').delete().eq('id', entrevista_id).execute()
+
+    def dashboard_empresa(self, empresa_id, limite):
+        return supabase.rpc('dashboard_empresa', {'p_empresa_id': empresa_id, 'p_limite': limite}).execute().data or {}
+
+    def reporte_empresa(self, empresa_id):
+        return supabase.rpc('reporte_empresa', {'p_empresa_id': empresa_id}).execute().data or {}
+
+    # ── Usuarios y empresas ──────────────────────────────────
+    def usuario(self, user_id, columnas='*'):
+        return _primera(supabase.table('usuarios_empresa').select(columnas).eq('id', user_id).execute())
+
+    def empresa(self, empresa_id, columnas='*'):
+        return _primera(supabase.table('empresas').select(columnas).eq('id', empresa_id).execute())
+
+    def usuarios_de_empresa(self, empresa_id):
+        return supabase.table('usuarios_empresa').select('*').eq('empresa_id', empresa_id).execute().data or []
+
+    def crear_empresa(self, datos):
+        return _insertar('empresas', datos)
+
+    def crear_usuario(self, datos):
+        return _insertar('usuarios_empresa', datos)
+
+    def es_super_admin(self, email):
+        res = supabase.table('super_admins').select('email').eq('email', email).eq('activo', True).execute()
+        return bool(res.data)
+
+    def metricas_empresas(self):
+        return supabase.table('vista_metricas_empresas').select('*').execute().data or []
+
+    def habilidades(self):
+        return supabase.table('habilidades').select('*').execute().data or []
+
+    # ── Calculadora ──────────────────────────────────────────
+    def diagnostico(self, diagnostico_id, columnas='*'):
+        return _primera(supabase.table('calculadora_diagnosticos').select(columnas).eq('id', diagnostico_id).execute())
+
+    def crear_diagnostico(self, datos):
+        return _insertar('calculadora_diagnosticos', datos)
+
+    def actualizar_diagnostico(self, diagnostico_id, cambios):
+        supabase.table('calculadora_diagnosticos').update(cambios).eq('id', diagnostico_id).execute()
+
+    def lead_por_email(self, email):
+        return _primera(supabase.table('calculadora_leads').select('*').eq('email', email).execute())
+
+    def crear_lead(self, datos):
+        return _insertar('calculadora_leads', datos)
+
+    def actualizar_lead(self, lead_id, cambios):
+        supabase.table('calculadora_leads').update(cambios).eq('id', lead_id).execute()
+
+    def registrar_interaccion(self, datos):
+        _insertar('calculadora_interacciones', datos)
+
+    def crear_demo(self, datos):
+        return _insertar('calculadora_demos', datos)
+
+    def pago_aprobado(self, diagnostico_id):
+        return _primera(supabase.table('calculadora_pagos').select('*')
+                        .eq('diagnostico_id', diagnostico_id).eq('estado', 'aprobado').execute())
+
+    def pago_por_referencia(self, ref_interna, columnas='*'):
+        return _primera(supabase.table('calculadora_pagos').select(columnas).eq('ref_interna', ref_interna).execute())
+
+    def crear_pago(self, datos):
+        return _insertar('calculadora_pagos', datos)
+
+    def actualizar_pago(self, ref_interna, cambios):
+        supabase.table('calculadora_pagos').update(cambios).eq('ref_interna', ref_interna).execute()
+
+    # ── Carga masiva ─────────────────────────────────────────
+    def insertar_filas(self, tabla, filas):
+        for desde in range(0, len(filas), LOTE_INSERT):
+            supabase.table(tabla).insert(filas[desde:desde + LOTE_INSERT], returning=ReturnMethod.minimal).execute()
+        return len(filas)
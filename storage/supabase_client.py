@@ -0,0 +1,161 @@
+"""
+storage/supabase_client.py
+Cliente Supabase único por proceso, con pool HTTP compartido y timeouts explícitos
+"""
+
+import logging
+import os
+import threading
+import time
+
+import httpx
+from supabase import create_client, Client
+from supabase.lib.client_options import SyncClientOptions
+from supabase_auth import SyncGoTrueClient, SyncMemoryStorage
+
+from core import metricas
+from storage import perfil_consultas
+
+logger = logging.getLogger(__name__)
+
+POOL_CONEXIONES = int(os.getenv('SUPABASE_POOL_SIZE', '20'))
+POOL_KEEPALIVE = int(os.getenv('SUPABASE_POOL_KEEPALIVE', '10'))
+KEEPALIVE_EXPIRA = float(os.getenv('SUPABASE_KEEPALIVE_EXPIRY', '60'))
+TIMEOUT_CONEXION = float(os.getenv('SUPABASE_CONNECT_TIMEOUT', '5'))
+TIMEOUT_LECTURA = float(os.getenv('SUPABASE_READ_TIMEOUT', '30'))
+
+_cliente = None
+_pid = None
+_lock = threading.Lock()
+
+
+OPERACIONES = {'GET': 'select', 'HEAD': 'select', 'POST': 'insert', 'PATCH': 'update', 'PUT': 'upsert', 'DELETE': 'delete'}
+
+
+def clasificar(request: httpx.Request):
+    """(tabla, operacion) de un request a Supabase, para etiquetar métricas."""
+    partes = request.url.path.strip('/').split('/')
+    if partes[:2] == ['rest', 'v1'] and len(partes) > 2:
+        if partes[2] == 'rpc' and len(partes) > 3:
+            return f"rpc:{partes[3]}", 'rpc'
+        operacion = OPERACIONES.get(request.method, request.method.lower())
+        if operacion == 'insert' and 'merge-duplicates' in request.headers.get('Prefer', ''):
+            operacion = 'upsert'
+        return partes[2], operacion
+    if partes[:2] == ['auth', 'v1']:
+        return 'auth', '/'.join(partes[2:]) or 'auth'
+    return partes[0] or 'otro', request.method.lower()
+
+
+class _TransporteMedido(httpx.BaseTransport):
+    """
+    Mide cada request (hasta los headers de la respuesta) y cuenta los errores
+    por tabla; con un perfil de consultas activo además lo registra ahí.
+    """
+
+    def __init__(self, interno: httpx.BaseTransport):
+        self._interno = interno
+
+    def handle_request(self, request):
+        tabla, operacion = clasificar(request)
+        inicio = time.perf_counter()
+        try:
+            respuesta = self._interno.handle_request(request)
+        except Exception:
+            metricas.supabase_errores.inc(tabla=tabla, operacion=operacion, tipo='red')
+            raise
+        metricas.supabase_duracion.observar(time.perf_counter() - inicio, tabla=tabla, operacion=operacion)
+        if respuesta.status_code >= 400:
+            metricas.supabase_errores.inc(tabla=tabla, operacion=operacion, tipo=f"{respuesta.status_code // 100}xx")
+        return perfil_consultas.registrar(request, respuesta, tabla, operacion, inicio)
+
+    def close(self):
+        self._interno.close()
+
+
+def _crear_http() -> httpx.Client:
+    # http2 y límites van en el transporte: el Client los ignora cuando recibe uno propio
+    transporte = httpx.HTTPTransport(
+        http2=True,
+        limits=httpx.Limits(
+            max_connections=POOL_CONEXIONES,
+            max_keepalive_connections=POOL_KEEPALIVE,
+            keepalive_expiry=KEEPALIVE_EXPIRA
+        )
+    )
+    return httpx.Client(
+        transport=_TransporteMedido(transporte),
+        follow_redirects=True,
+        timeout=httpx.Timeout(
+            TIMEOUT_LECTURA,
+            connect=TIMEOUT_CONEXION,
+            pool=TIMEOUT_CONEXION
+        )
+    )
+
+
+def get_supabase() -> Client:
+    """
+    Retorna el cliente del proceso, creándolo en el primer uso.
+    Tras un fork (gunicorn --preload) el hijo crea el suyo: los sockets
+    del padre nunca se comparten entre procesos.
+    """
+    global _cliente, _pid
+    pid = os.getpid()
+    if _cliente is not None and _pid == pid:
+        return _cliente
+    with _lock:
+        if _cliente is None or _pid != pid:
+            # El cliente de datos nunca inicia sesión (ver cliente_auth): sin
+            # sesión ni refresco, ningún evento de auth le cambia el Authorization
+            opciones = SyncClientOptions(
+                httpx_client=_crear_http(),
+                postgrest_client_timeout=TIMEOUT_LECTURA,
+                persist_session=False,
+                auto_refresh_token=False
+            )
+            _cliente = create_client(os.getenv('SUPABASE_URL'), os.getenv('SUPABASE_KEY'), options=opciones)
+            _pid = pid
+            logger.info(f"✅ Cliente Supabase creado (pid {pid}, pool {POOL_CONEXIONES})")
+    return _cliente
+
+
+def cliente_auth() -> SyncGoTrueClient:
+    """
+    Cliente GoTrue nuevo para un login o registro. No se debe usar
+    `supabase.auth` para eso: un SIGNED_IN en el cliente compartido le pone
+    el JWT del usuario a todas las consultas del proceso (repositorio,
+    calculadora, workers) y reinicia su postgrest a mitad de otros requests.
+    Comparte el pool HTTP del proceso y la sesión queda solo en este objeto.
+    """
+    clave = os.getenv('SUPABASE_KEY')
+    return SyncGoTrueClient(
+        url=f"{os.getenv('SUPABASE_URL').rstrip('/')}/auth/v1",
+        headers={"apiKey": clave, "Authorization": f"Bearer {clave}"},
+        auto_refresh_token=False,
+        persist_session=False,
+        storage=SyncMemoryStorage(),
+        http_client=get_supabase().options.httpx_client
+    )
+
+
+def _descartar_tras_fork():
+    # El lock pudo quedar tomado por otro hilo del padre en el momento del fork
+    global _cliente, _pid, _lock
+    _cliente = None
+    _pid = None
+    _lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_descartar_tras_fork)
+
+
+class _SupabaseLazy:
+    """Se importa como `supabase` y delega en el cliente del proceso actual."""
+
+    def __getattr__(self, nombre):
+        return getattr(get_supabase(), nombre)
+
+
+supabase = _SupabaseLazy()
@@ -0,0 +1,69 @@
+"""
+storage/vacantes_cache.py
+Caché de lectura de vacantes (por id y por id_vacante_publico) con invalidación explícita
+
+La caché es por proceso. invalidar_vacante solo limpia el worker que hizo
+la edición; los demás workers de gunicorn pueden seguir sirviendo la
+versión anterior hasta VACANTES_CACHE_TTL segundos (60 por defecto). Una
+vacante que no existía se recuerda como inexistente solo durante
+VACANTES_CACHE_TTL_NO_EXISTE segundos (5 por defecto), así que una vacante
+recién creada puede dar 404 en otro worker durante ese tiempo como máximo.
+"""
+
+import os
+
+from core.cache import CacheTTL
+from storage.repositorio import repositorio
+
+TTL_VACANTES = float(os.getenv('VACANTES_CACHE_TTL', '60'))
+MAX_VACANTES = int(os.getenv('VACANTES_CACHE_MAX', '512'))
+TTL_NO_EXISTE = float(os.getenv('VACANTES_CACHE_TTL_NO_EXISTE', '5'))
+
+_FALTA = object()
+
+_cache = CacheTTL(max_items=MAX_VACANTES, ttl=TTL_VACANTES)
+
+
+def _guardar(vacante: dict):
+    _cache.set(('id', str(vacante['id'])), vacante)
+    if vacante.get('id_vacante_publico'):
+        _cache.set(('publico', vacante['id_vacante_publico']), vacante)
+
+
+def _leer(clave, consulta, valor):
+    vacante = _cache.get(clave, _FALTA)
+    if vacante is not _FALTA:
+        return vacante
+    vacante = consulta(valor)
+    if vacante:
+        _guardar(vacante)
+        return vacante
+    # También se recuerda que no existe, pero poco: un link roto no golpea la
+    # base en cada request y una vacante recién creada aparece en segundos
+    _cache.set(clave, None, ttl=TTL_NO_EXISTE)
+    return None
+
+
+def obtener_vacante(vacante_id):
+    """Vacante por id interno, o None. El dict es compartido: no modificarlo."""
+    return _leer(('id', str(vacante_id)), repositorio.vacante, vacante_id)
+
+
+def obtener_vacante_publica(id_publico: str):
+    """Vacante por id_vacante_publico, o None. El dict es compartido: no modificarlo."""
+    return _leer(('publico', id_publico), repositorio.vacante_publica, id_publico)
+
+
+def invalidar_vacante(vacante_id=None, id_publico=None):
+    """Descarta la vacante de la caché por cualquiera de sus dos claves."""
+    for clave in (('id', str(vacante_id)), ('publico', id_publico)):
+        if clave[1] in (None, 'None'):
+            continue
+        vacante = _cache.invalidar(clave)
+        if vacante:
+            _cache.invalidar(('id', str(vacante['id'])))
+            _cache.invalidar(('publico', vacante.get('id_vacante_publico')))
+
+
+def stats() -> dict:
+    return _cache.stats()
@@ -0,0 +1,88 @@
+"""
+tests/test_bulk_rescoring.py
+Re-scoring masivo (NumPy) contra las funciones escalares del scoring en vivo
+"""
+
+import os
+import random
+
+os.environ.setdefault('SUPABASE_URL', 'http://127.0.0.1:9')
+os.environ.setdefault('SUPABASE_KEY', 'sin-red')
+
+import app
+from core import bulk_rescoring
+from core.counters import puntuar_respuesta_abierta
+from core.scoring_plan import compilar_plan, CATEGORIAS, TIPOS_CERRADOS
+from herramientas.datos_sinteticos import GeneradorSintetico
+from storage.repositorio_sqlite import RepositorioSQLite
+
+
+def _score_escalar(fila: dict, plan: dict) -> float:
+    """Mismo recorrido que evaluar_envio sobre las respuestas guardadas."""
+    por_texto = {p['texto']: p for p in plan['preguntas'].values()}
+    categorias = dict.fromkeys(CATEGORIAS, 0)
+    habilidades = dict.fromkeys(plan['max_habilidades'], 0)
+    for item in fila['respuestas_detalle']:
+        p = por_texto.get(item['pregunta'])
+        if p is None:
+            continue
+        respuesta = item['respuesta'].strip()
+        if p['tipo'] in TIPOS_CERRADOS:
+            puntos = p['peso'] if respuesta.lower() == p['ideal'] else 0
+        elif p['palabras_clave']:
+            puntos = round(p['peso'] * puntuar_respuesta_abierta(respuesta, p['palabras_clave']), 2)
+        else:
+            puntos = 0
+        categorias[p['categoria']] += puntos
+        habilidades[p['habilidad']] += puntos
+    base = app.calcular_score_prescreening(categorias, plan['max_categorias'], plan['dist'])
+    return app.aplicar_boost_skill_stack(base, habilidades, plan['max_habilidades'], plan['skill_stack'])
+
+
+def _vacante_con_candidatos(repo, semilla=11, cantidad=150):
+    generador = GeneradorSintetico(semilla)
+    empresa = generador.empresa(0)['empresa']
+    vacante = generador.vacante(empresa, 0, 0)
+    filas = generador.candidatos(vacante, 0, 0, cantidad)
+    rng = random.Random(semilla)
+    for fila in filas:
+        # Candidatos que se saltaron preguntas: el máximo sigue siendo el del plan
+        fila['respuestas_detalle'] = [d for d in fila['respuestas_detalle'] if rng.random() < 0.75]
+    repo.crear_vacante(vacante)
+    repo.insertar_filas('entrevistas', filas)
+    return vacante, rng
+
+
+def test_rescoring_igual_al_scoring_escalar(tmp_path, monkeypatch):
+    repo = RepositorioSQLite(str(tmp_path / 'repo.db'))
+    monkeypatch.setattr(bulk_rescoring, 'repositorio', repo)
+    vacante, rng = _vacante_con_candidatos(repo)
+
+    # Cambio de configuración después de evaluar: pesos y distribución nuevos
+    for p in vacante['preguntas']:
+        p['peso'] = p.get('peso', 0) + rng.randint(0, 4)
+    vacante['configuracion_modelo']['distribucion_categorias'] = {
+        'Técnica': 25, 'Experiencia': 25, 'Blandas': 25, 'Ajuste': 25
+    }
+    plan = compilar_plan(vacante)
+
+    assert bulk_rescoring.recalcular_vacante(vacante, plan) == 150
+
+    guardadas = repo.entrevistas_vacante(vacante['id'])
+    for fila in rng.sample(guardadas, 40):
+        assert fila['score'] == _score_escalar(fila, plan), fila['id']
+        assert fila['veredicto'] == bulk_rescoring._veredicto(fila['score'], fila['veredicto'].startswith('DESCARTADO'))[0]
+
+
+def test_lote_solo_actualiza_las_columnas_enviadas(tmp_path):
+    repo = RepositorioSQLite(str(tmp_path / 'repo.db'))
+    vacante, _ = _vacante_con_candidatos(repo, cantidad=3)
+    antes = repo.entrevistas_vacante(vacante['id'])
+
+    cambios = [{'id': f['id'], 'score': 1.5} for f in antes] + [{'id': 'no-existe', 'score': 2.0}]
+    assert repo.actualizar_entrevistas_lote(cambios) == 3
+
+    for previa, actual in zip(antes, repo.entrevistas_vacante(vacante['id'])):
+        assert actual['score'] == 1.5
+        assert actual['nombre_candidato'] == previa['nombre_candidato']
+        assert actual['respuestas_detalle'] == previa['respuestas_detalle']
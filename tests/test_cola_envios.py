@@ -0,0 +1,73 @@
+"""
+tests/test_cola_envios.py
+Cola SQLite de envíos: reclamo atómico, reintentos y envíos huérfanos
+"""
+
+import threading
+
+import pytest
+
+from storage import cola_envios
+
+
+@pytest.fixture(autouse=True)
+def cola(tmp_path, monkeypatch):
+    monkeypatch.setattr(cola_envios, 'COLA_PATH', str(tmp_path / 'cola.db'))
+    monkeypatch.setattr(cola_envios, '_local', threading.local())
+
+
+def test_encolar_es_idempotente_salvo_tras_error():
+    assert cola_envios.encolar({'n': 1}, 'clave-1')
+    assert not cola_envios.encolar({'n': 1}, 'clave-1')
+
+    envio_id, payload, intentos = cola_envios.tomar_siguiente(max_intentos=3)
+    assert (envio_id, payload, intentos) == ('clave-1', {'n': 1}, 0)
+    cola_envios.marcar_hecho(envio_id)
+    assert not cola_envios.encolar({'n': 1}, 'clave-1')
+
+    cola_envios.encolar({'n': 2}, 'clave-2')
+    cola_envios.tomar_siguiente(max_intentos=3)
+    cola_envios.marcar_fallido('clave-2', 'boom')
+    # Un envío en error sí se acepta de nuevo, con los intentos en cero
+    assert cola_envios.encolar({'n': 2}, 'clave-2')
+    assert cola_envios.tomar_siguiente(max_intentos=3)[2] == 0
+
+
+def test_reclamo_atomico_entre_hilos():
+    for i in range(20):
+        cola_envios.encolar({'n': i}, f'clave-{i}')
+    tomados, lock = [], threading.Lock()
+
+    def worker():
+        # Cada hilo abre su propia conexión (threading.local)
+        while (envio := cola_envios.tomar_siguiente(max_intentos=3)) is not None:
+            with lock:
+                tomados.append(envio[0])
+
+    hilos = [threading.Thread(target=worker) for _ in range(4)]
+    for h in hilos:
+        h.start()
+    for h in hilos:
+        h.join()
+    assert sorted(tomados) == sorted(f'clave-{i}' for i in range(20))
+    assert cola_envios.contar_por_estado() == {'procesando': 20}
+
+
+def test_reprogramar_respeta_la_espera():
+    cola_envios.encolar({}, 'clave-1')
+    cola_envios.tomar_siguiente(max_intentos=3)
+    cola_envios.reprogramar('clave-1', 'timeout', espera=60)
+    assert cola_envios.tomar_siguiente(max_intentos=3) is None
+
+    cola_envios.reprogramar('clave-1', 'timeout', espera=0)
+    assert cola_envios.tomar_siguiente(max_intentos=3)[2] == 2
+
+
+def test_huerfano_cuenta_como_intento(monkeypatch):
+    # Todo envío "procesando" se considera huérfano en el siguiente reclamo
+    monkeypatch.setattr(cola_envios, 'TIMEOUT_PROCESANDO', -1)
+    cola_envios.encolar({}, 'clave-1')
+    intentos = [cola_envios.tomar_siguiente(max_intentos=3)[2] for _ in range(3)]
+    assert intentos == [0, 1, 2]
+    assert cola_envios.tomar_siguiente(max_intentos=3) is None
+    assert cola_envios.contar_por_estado() == {'error': 1}
@@ -0,0 +1,48 @@
+"""
+tests/test_concurrencia.py
+Fan-out: errores y timeouts se propagan después de que terminaron todas las tareas
+"""
+
+import threading
+import time
+
+import pytest
+
+from core.concurrencia import en_paralelo, TiempoAgotado
+
+
+def test_resultados_y_latencias():
+    res = en_paralelo({'a': lambda: 1, 'b': lambda: 2, 'c': lambda: 3})
+    assert dict(res) == {'a': 1, 'b': 2, 'c': 3}
+    assert set(res.latencias) == {'a', 'b', 'c'}
+
+
+def test_falla_la_primera_espera_a_las_demas():
+    terminadas = []
+
+    def lenta():
+        time.sleep(0.2)
+        terminadas.append(threading.current_thread().name)
+
+    def falla():
+        raise ValueError('primera')
+
+    with pytest.raises(ValueError, match='primera'):
+        en_paralelo({'falla': falla, 'lenta_1': lenta, 'lenta_2': lenta})
+    assert len(terminadas) == 2
+
+
+def test_se_relanza_la_primera_en_orden_de_tareas():
+    def falla(mensaje, espera=0):
+        def fn():
+            time.sleep(espera)
+            raise RuntimeError(mensaje)
+        return fn
+
+    with pytest.raises(RuntimeError, match='b'):
+        en_paralelo({'a': lambda: 1, 'b': falla('b', 0.1), 'c': falla('c')})
+
+
+def test_timeout():
+    with pytest.raises(TiempoAgotado):
+        en_paralelo({'a': lambda: 1, 'b': lambda: time.sleep(0.5)}, timeout=0.05)
@@ -0,0 +1,44 @@
+"""
+tests/test_counters.py
+Conteo Aho-Corasick de palabras clave contra str.count y puntaje de respuestas abiertas
+"""
+
+import random
+
+from config.keywords import KEYWORDS_TRANSCRIPCION
+from core.counters import count_keywords, preparar_palabras_clave, puntuar_respuesta_abierta
+from core.text_cleaner import clean_text
+
+
+def _conteo_original(text, keywords):
+    return {word: text.count(clean_text(word)) for word in keywords}
+
+
+def test_igual_a_str_count():
+    rng = random.Random(5)
+    # Patrones que se solapan entre sí y consigo mismos
+    keywords = ('aa', 'aaa', 'ab', 'ba', 'abab', 'b')
+    for _ in range(300):
+        texto = ''.join(rng.choice('ab ') for _ in range(rng.randint(0, 40)))
+        assert count_keywords(texto, keywords) == _conteo_original(texto, keywords), texto
+
+
+def test_palabras_de_transcripcion_por_defecto():
+    texto = clean_text('La fibra tiene más velocidad y estabilidad; la velocidad de la fibra, sin latencia.')
+    esperado = _conteo_original(texto, KEYWORDS_TRANSCRIPCION)
+    assert count_keywords(texto) == esperado
+    assert esperado['fibra'] == 2 and esperado['velocidad'] == 2
+
+
+def test_inicio_de_palabra():
+    texto = clean_text('Ventas y preventa; supervente')
+    conteos = count_keywords(texto, ('vent',), inicio_palabra=True)
+    assert conteos == {'vent': 1}
+
+
+def test_puntuar_respuesta_abierta():
+    palabras = preparar_palabras_clave(['Clientes', 'metas', 'Negociación'])
+    assert puntuar_respuesta_abierta('Atendí a un cliente y superé la meta', palabras) == 2 / 3
+    assert puntuar_respuesta_abierta('Negocié con clientes, cumplí metas; negociacion', palabras) == 1.0
+    assert puntuar_respuesta_abierta('Nada relacionado', palabras) == 0.0
+    assert puntuar_respuesta_abierta('lo que sea', ()) == 0.0
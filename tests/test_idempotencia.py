@@ -0,0 +1,52 @@
+"""
+tests/test_idempotencia.py
+Clave de idempotencia de /procesar e id de entrevista derivado
+"""
+
+import uuid
+
+from core import idempotencia
+from core.idempotencia import clave_envio, entrevista_id_de
+
+PREGUNTAS = ['¿Experiencia en ventas?', 'Describe tu logro']
+RESPUESTAS = ['si', 'Cerré 40 contratos']
+
+
+def test_misma_postulacion_misma_clave():
+    clave = clave_envio('JOB-1', '1020', PREGUNTAS, RESPUESTAS)
+    assert clave == clave_envio('JOB-1', ' 1020 ', tuple(PREGUNTAS), tuple(RESPUESTAS))
+    assert len(clave) == 64
+
+
+def test_cambios_que_generan_otra_clave():
+    base = clave_envio('JOB-1', '1020', PREGUNTAS, RESPUESTAS)
+    assert base != clave_envio('JOB-2', '1020', PREGUNTAS, RESPUESTAS)
+    assert base != clave_envio('JOB-1', '1021', PREGUNTAS, RESPUESTAS)
+    assert base != clave_envio('JOB-1', '1020', PREGUNTAS, ['no', RESPUESTAS[1]])
+    # Sin separador ambiguo: mover texto entre respuestas cambia la clave
+    assert clave_envio('JOB-1', '1020', ['a', 'b'], ['x,y', 'z']) != clave_envio('JOB-1', '1020', ['a', 'b'], ['x', 'y,z'])
+
+
+def test_token_reemplaza_al_contenido():
+    con_token = clave_envio('JOB-1', '1020', PREGUNTAS, RESPUESTAS, token='tok-1')
+    assert con_token == clave_envio('JOB-1', '1020', [], [], token='tok-1')
+    assert con_token != clave_envio('JOB-1', '1020', PREGUNTAS, RESPUESTAS, token='tok-2')
+    assert con_token != clave_envio('JOB-1', '1020', PREGUNTAS, RESPUESTAS)
+
+
+def test_entrevista_id_deterministico():
+    clave = clave_envio('JOB-1', '1020', PREGUNTAS, RESPUESTAS)
+    entrevista_id = entrevista_id_de(clave)
+    assert entrevista_id == entrevista_id_de(clave)
+    assert uuid.UUID(entrevista_id).version == 5
+    assert entrevista_id != entrevista_id_de(clave_envio('JOB-1', '1021', PREGUNTAS, RESPUESTAS))
+
+
+def test_registrar_y_olvidar():
+    clave = clave_envio('JOB-1', 'registro', PREGUNTAS, RESPUESTAS)
+    idempotencia.olvidar(clave)
+    assert idempotencia.registrar(clave)
+    assert not idempotencia.registrar(clave)
+    idempotencia.olvidar(clave)
+    assert idempotencia.registrar(clave)
+    idempotencia.olvidar(clave)
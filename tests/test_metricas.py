@@ -0,0 +1,33 @@
+"""
+tests/test_metricas.py
+/health es público y sin estado interno; /metrics exige METRICS_TOKEN
+"""
+
+import os
+
+os.environ.setdefault('SUPABASE_URL', 'http://127.0.0.1:9')
+os.environ.setdefault('SUPABASE_KEY', 'sin-red')
+
+import app
+
+
+def test_health_solo_liveness():
+    res = app.app.test_client().get('/health')
+    assert res.status_code == 200
+    assert set(res.json) == {'status', 'timestamp'}
+
+
+def test_metrics_con_token(monkeypatch):
+    cliente = app.app.test_client()
+    monkeypatch.delenv('METRICS_TOKEN', raising=False)
+    assert cliente.get('/metrics').status_code == 404
+
+    monkeypatch.setenv('METRICS_TOKEN', 'secreto')
+    assert cliente.get('/metrics').status_code == 401
+    assert cliente.get('/metrics', headers={'Authorization': 'Bearer otro'}).status_code == 401
+
+    res = cliente.get('/metrics', headers={'Authorization': 'Bearer secreto'})
+    assert res.status_code == 200
+    cuerpo = res.get_data(as_text=True)
+    for cache in ('vacantes', 'dashboard', 'idempotencia'):
+        assert f'cache_aciertos_total{{cache="{cache}"}}' in cuerpo
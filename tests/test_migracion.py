@@ -0,0 +1,31 @@
+"""
+tests/test_migracion.py
+Lectura de analisis_ia heredado: jsonb, string JSON y texto libre
+"""
+
+import json
+
+from core.migracion import leer_analisis_ia
+
+
+def test_dict_y_none_pasan_igual():
+    analisis = {'resumen': 'Perfil sólido', 'fortalezas': ['ventas']}
+    assert leer_analisis_ia(analisis) is analisis
+    assert leer_analisis_ia(None) is None
+
+
+def test_string_json():
+    analisis = {'resumen': 'Perfil sólido', 'score': 81.5}
+    assert leer_analisis_ia(json.dumps(analisis, ensure_ascii=False)) == analisis
+
+
+def test_texto_libre_queda_como_resumen():
+    texto = 'Candidato con potencial moderado para Asesor Comercial.'
+    assert leer_analisis_ia(texto) == {'resumen': texto}
+    # Un string JSON que no es objeto se conserva entero, como en sql/001
+    assert leer_analisis_ia('"solo texto"') == {'resumen': '"solo texto"'}
+
+
+def test_json_que_no_es_objeto():
+    assert leer_analisis_ia('[1, 2]') is None
+    assert leer_analisis_ia(42) is None
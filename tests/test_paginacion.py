@@ -0,0 +1,94 @@
+"""
+tests/test_paginacion.py
+Paginación keyset: cursores y recorrido completo con empates y NULL (SQLite y PostgREST local)
+"""
+
+import random
+
+import pytest
+from supabase import create_client
+
+from herramientas.supabase_local import SupabaseLocal, iniciar, CLAVE_ANON
+from storage.paginacion import (codificar_cursor, decodificar_cursor, tamano_pagina,
+                                pagina_keyset, MAX_TAMANO_PAGINA, TAMANO_PAGINA)
+from storage.repositorio_sqlite import RepositorioSQLite
+
+EMPRESA = 'e-1'
+
+
+def _filas(cantidad=40, semilla=3):
+    rng = random.Random(semilla)
+    return [
+        {
+            'id': f'ent-{i:03d}',
+            'empresa_id': EMPRESA if i % 5 else 'e-2',
+            # Pocos valores distintos: muchos empates, y algunos NULL
+            # (una fecha NULL la completa el repositorio al insertar)
+            'score': rng.choice([None, 10.0, 55.5, 55.5, 80.0]),
+            'fecha': rng.choice([None, '2026-01-01T10:00:00', '2026-02-01T10:00:00']),
+            'veredicto': 'REVISAR',
+        }
+        for i in range(cantidad)
+    ]
+
+
+def _esperado(filas, columna):
+    propias = [f for f in filas if f['empresa_id'] == EMPRESA]
+    con_valor = sorted((f for f in propias if f[columna] is not None),
+                       key=lambda f: (f[columna], f['id']), reverse=True)
+    nulas = sorted((f for f in propias if f[columna] is None), key=lambda f: f['id'], reverse=True)
+    return [f['id'] for f in con_valor + nulas]
+
+
+def _recorrer(pagina, limite=7):
+    ids, cursor = [], None
+    while True:
+        filas, cursor = pagina(cursor, limite)
+        assert len(filas) <= limite
+        ids += [f['id'] for f in filas]
+        if cursor is None:
+            return ids
+
+
+def test_cursor_ida_y_vuelta():
+    for valor in (55.5, None, '2026-01-01T10:00:00', 'con "comillas", puntos.y:dos'):
+        assert decodificar_cursor(codificar_cursor(valor, 'ent-001')) == (valor, 'ent-001')
+    assert decodificar_cursor(None) is None
+    assert decodificar_cursor('no-es-un-cursor!!') is None
+
+
+def test_tamano_pagina():
+    assert tamano_pagina(None) == TAMANO_PAGINA
+    assert tamano_pagina('abc') == TAMANO_PAGINA
+    assert tamano_pagina('0') == 1
+    assert tamano_pagina(10 ** 6) == MAX_TAMANO_PAGINA
+
+
+@pytest.mark.parametrize('columna', ['score', 'fecha'])
+def test_recorrido_sqlite(tmp_path, columna):
+    repo = RepositorioSQLite(str(tmp_path / 'repo.db'))
+    repo.insertar_filas('entrevistas', _filas())
+    ids = _recorrer(lambda cursor, limite: repo.pagina_entrevistas(EMPRESA, 'id, score, fecha', columna, cursor, limite))
+    assert ids == _esperado(repo.listar_entrevistas(), columna)
+
+
+@pytest.fixture
+def cliente_local(tmp_path):
+    local = SupabaseLocal(str(tmp_path / 'local.db'))
+    servidor = iniciar(local, puerto=0)
+    try:
+        yield local, create_client(f'http://127.0.0.1:{servidor.server_address[1]}', CLAVE_ANON)
+    finally:
+        servidor.shutdown()
+
+
+@pytest.mark.parametrize('columna', ['score', 'fecha'])
+def test_recorrido_postgrest(cliente_local, columna):
+    local, cliente = cliente_local
+    local.repo.insertar_filas('entrevistas', _filas())
+
+    def pagina(cursor, limite):
+        query = cliente.table('entrevistas').select('id, score, fecha').eq('empresa_id', EMPRESA)
+        return pagina_keyset(query, columna, cursor, limite)
+
+    assert _recorrer(pagina) == _esperado(local.repo.listar_entrevistas(), columna)
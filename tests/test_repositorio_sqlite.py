@@ -0,0 +1,58 @@
+"""
+tests/test_repositorio_sqlite.py
+Login, registro y panel admin sobre REPOSITORIO_BACKEND=sqlite (sin Supabase)
+"""
+
+import os
+
+os.environ.setdefault('SUPABASE_URL', 'http://127.0.0.1:9')
+os.environ.setdefault('SUPABASE_KEY', 'sin-red')
+
+import pytest
+
+import app
+from herramientas.datos_sinteticos import generar
+from storage.repositorio import Duplicado
+from storage.repositorio_sqlite import RepositorioSQLite
+
+
+@pytest.fixture
+def repo(tmp_path, monkeypatch):
+    repo = RepositorioSQLite(str(tmp_path / 'repo.db'))
+    monkeypatch.setattr(app, 'repositorio', repo)
+    return repo
+
+
+def test_credenciales(repo):
+    cuenta = repo.registrar_credenciales('ana@empresa.test', 'clave-1')
+    assert repo.autenticar('ana@empresa.test', 'clave-1')['id'] == cuenta['id']
+    assert repo.autenticar('ana@empresa.test', 'otra') is None
+    assert repo.autenticar('nadie@empresa.test', 'clave-1') is None
+    with pytest.raises(Duplicado):
+        repo.registrar_credenciales('ana@empresa.test', 'clave-2')
+
+
+def test_login_con_datos_sinteticos(repo):
+    resultado = generar(2, 1, 3, repo=repo, password='sintetico123')
+    empresa_id, email = resultado['empresas'][0]
+    cliente = app.app.test_client()
+
+    res = cliente.post('/login', data={'email': email, 'password': 'mala'})
+    assert b'Credenciales incorrectas' in res.data
+
+    res = cliente.post('/login', data={'email': email, 'password': 'sintetico123'})
+    assert res.status_code == 302
+    with cliente.session_transaction() as sesion:
+        assert sesion['empresa_id'] == empresa_id
+        assert sesion['nombre_empresa'] == 'Empresa Sintética 00001'
+
+
+def test_metricas_empresas(repo):
+    generar(2, 2, 3, repo=repo)
+    metricas = {m['empresa_id']: m for m in repo.metricas_empresas()}
+    assert len(metricas) == 2
+    for m in metricas.values():
+        assert m['total_vacantes'] == 2
+        assert m['total_candidatos'] == 6
+        assert m['email_usuario'].endswith('@sintetico.test')
+        assert 0 <= m['candidatos_recomendados'] <= 6
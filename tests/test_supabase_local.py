@@ -0,0 +1,40 @@
+"""
+tests/test_supabase_local.py
+UPDATE y DELETE del servidor local: filtro y escritura en la misma transacción
+"""
+
+import pytest
+
+from herramientas.supabase_local import SupabaseLocal, ErrorPostgrest
+
+
+@pytest.fixture
+def local(tmp_path):
+    local = SupabaseLocal(str(tmp_path / 'local.db'))
+    local.insertar('vacantes', [
+        {'id': 'v-1', 'empresa_id': 'e-1', 'id_vacante_publico': 'JOB-1', 'activa': True},
+        {'id': 'v-2', 'empresa_id': 'e-1', 'id_vacante_publico': 'JOB-2', 'activa': True},
+        {'id': 'v-3', 'empresa_id': 'e-2', 'id_vacante_publico': 'JOB-3', 'activa': True},
+    ])
+    return local
+
+
+def test_actualizar_y_eliminar_por_filtro(local):
+    filas = local.actualizar('vacantes', [('empresa_id', 'eq.e-1')], {'activa': False})
+    assert sorted(f['id'] for f in filas) == ['v-1', 'v-2']
+    assert [f['activa'] for f in local.seleccionar('vacantes', [('order', 'id')])] == [False, False, True]
+
+    borradas = local.eliminar('vacantes', [('id', 'in.(v-1,v-3)')])
+    assert sorted(f['id'] for f in borradas) == ['v-1', 'v-3']
+    assert [f['id'] for f in local.seleccionar('vacantes', [])] == ['v-2']
+    assert local.eliminar('vacantes', [('id', 'eq.no-existe')]) == []
+
+
+def test_filtro_invalido_no_deja_la_transaccion_abierta(local):
+    conn = local.repo._conexion()
+    for operacion in (lambda: local.actualizar('vacantes', [('id', 'xx.1')], {'activa': False}),
+                      lambda: local.eliminar('vacantes', [('id', 'xx.1')])):
+        with pytest.raises(ErrorPostgrest):
+            operacion()
+        assert not conn.in_transaction
+    assert len(local.seleccionar('vacantes', [])) == 3
@@ -0,0 +1,70 @@
+"""
+tests/test_text_cleaner.py
+clean_text (tablas de traducción) contra la versión original sobre Unicode aleatorio
+"""
+
+import random
+import re
+import sys
+import unicodedata
+
+from core import text_cleaner
+from core.text_cleaner import clean_text, clean_many
+
+
+def clean_text_original(text: str) -> str:
+    """La implementación previa a las tablas, tal cual: es la referencia."""
+    text = text.lower()
+    text = ''.join(
+        c for c in unicodedata.normalize('NFD', text)
+        if unicodedata.category(c) != 'Mn'
+    )
+    text = re.sub(r'[^a-z\s]', '', text)
+    return " ".join(text.split())
+
+
+def _codigo(rng: random.Random) -> int:
+    # Mezcla ASCII, latín, puntuación/espacios Unicode y cualquier código válido
+    rango = rng.random()
+    if rango < 0.3:
+        return rng.randrange(128)
+    if rango < 0.55:
+        return rng.randrange(128, 0x370)
+    if rango < 0.65:
+        return rng.randrange(0x2000, 0x2070)
+    while True:
+        codigo = rng.randrange(sys.maxunicode + 1)
+        if not 0xD800 <= codigo <= 0xDFFF:
+            return codigo
+
+
+def _texto(rng: random.Random) -> str:
+    return ''.join(chr(_codigo(rng)) for _ in range(rng.randrange(60)))
+
+
+def test_igual_a_la_version_original_en_unicode_aleatorio():
+    rng = random.Random(20240501)
+    for _ in range(20000):
+        texto = _texto(rng)
+        assert clean_text(texto) == clean_text_original(texto), repr(texto)
+
+
+def test_igual_a_la_version_original_caracter_a_caracter():
+    for codigo in range(sys.maxunicode + 1):
+        if 0xD800 <= codigo <= 0xDFFF:
+            continue
+        texto = f"a{chr(codigo)}b"
+        assert clean_text(texto) == clean_text_original(texto), hex(codigo)
+
+
+def test_casos_en_espanol():
+    assert clean_text("¿Qué tal, Señor Núñez?  Experiencia: 5 años…") == "que tal senor nunez experiencia anos"
+    assert clean_text("Pingüino\xa0— Óptimo") == "pinguino optimo"
+    assert list(clean_many(["Árbol", "  ", "ÇA"])) == ["arbol", "", "ca"]
+
+
+def test_la_tabla_no_crece_con_la_entrada():
+    tamano = len(text_cleaner._TABLA)
+    clean_text(''.join(chr(c) for c in range(0x4E00, 0x9FFF)))
+    assert len(text_cleaner._TABLA) == tamano
+    assert text_cleaner._limpiar_codigo.cache_info().currsize <= text_cleaner._limpiar_codigo.cache_info().maxsize
@@ -0,0 +1,26 @@
+"""
+tests/test_vacantes_cache.py
+Caché de vacantes: la inexistencia se recuerda solo por TTL_NO_EXISTE
+"""
+
+import time
+
+from storage import vacantes_cache
+from storage.repositorio_sqlite import RepositorioSQLite
+
+
+def test_vacante_creada_despues_de_un_miss(tmp_path, monkeypatch):
+    repo = RepositorioSQLite(str(tmp_path / 'repo.db'))
+    monkeypatch.setattr(vacantes_cache, 'repositorio', repo)
+    monkeypatch.setattr(vacantes_cache, 'TTL_NO_EXISTE', 0.05)
+    vacantes_cache._cache.limpiar()
+
+    assert vacantes_cache.obtener_vacante_publica('JOB-NUEVA') is None
+    repo.crear_vacante({'id': 'v-1', 'id_vacante_publico': 'JOB-NUEVA', 'empresa_id': 'e-1', 'cargo': 'Asesor'})
+    # Dentro de la ventana sigue el miss cacheado; pasada, la vacante aparece
+    assert vacantes_cache.obtener_vacante_publica('JOB-NUEVA') is None
+    time.sleep(0.1)
+    assert vacantes_cache.obtener_vacante_publica('JOB-NUEVA')['id'] == 'v-1'
+    # Las vacantes encontradas sí duran el TTL normal
+    assert vacantes_cache._cache.get(('id', 'v-1'))['cargo'] == 'Asesor'
+    vacantes_cache._cache.limpiar()